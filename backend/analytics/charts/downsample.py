@@ -0,0 +1,168 @@
+"""
+Line Chart Downsampling
+
+많은 포인트의 line_chart 데이터를 요청별 포인트 예산으로 줄이는 서버 측 다운샘플링
+
+- LTTB (Largest-Triangle-Three-Buckets): 구간마다 이전 선택점/다음 구간 평균과 만드는
+  삼각형 넓이가 가장 큰 점을 골라 피크/골짜기 등 시계열 모양을 유지
+- min/max envelope: 선택된 점이 대표하는 구간의 최솟값/최댓값을 별도 dataset으로 제공하여
+  다운샘플링으로 사라진 변동 폭을 음영으로 표시
+"""
+import numpy as np
+
+# 다운샘플링 결과에 추가되는 envelope dataset 표시 (프론트엔드에서 범례/툴팁 구분용)
+ENVELOPE_KEY = "envelope"
+
+
+def _numeric_series(values, length: int):
+    """dataset.data를 float 배열로 변환 (숫자 리스트가 아니거나 길이가 다르면 None)"""
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    series = np.empty(length)
+    for i, value in enumerate(values):
+        if value is None:
+            series[i] = np.nan
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            series[i] = value
+        else:
+            return None
+    return series
+
+
+def lttb_indices(series: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    LTTB로 남길 포인트 인덱스 선택
+
+    여러 dataset이 같은 labels를 공유하므로 (dataset × 포인트) 행렬을 받아
+    dataset별로 정규화한 삼각형 넓이의 합이 가장 큰 점을 공통으로 선택
+
+    Args:
+        series (ndarray): (dataset 수, 포인트 수) 값 행렬 (NaN 허용)
+        max_points (int): 남길 최대 포인트 수 (3 이상)
+
+    Returns:
+        ndarray: 오름차순 인덱스 (첫 점과 마지막 점 포함)
+    """
+    count = series.shape[1]
+    if count <= max_points or max_points < 3:
+        return np.arange(count)
+
+    # dataset별 값 범위로 정규화 (큰 값의 dataset이 선택을 독점하지 않도록)
+    low = np.nanmin(series, axis=1, keepdims=True)
+    span = np.nanmax(series, axis=1, keepdims=True) - low
+    span[~np.isfinite(span) | (span == 0)] = 1.0
+    y = np.nan_to_num((series - low) / span)
+    x = np.arange(count, dtype=float)
+
+    every = (count - 2) / (max_points - 2)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # 다음 구간의 평균점
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, count)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[:, next_start:next_end].mean(axis=1, keepdims=True)
+
+        # 이전 선택점(a) - 후보점 - 다음 구간 평균점이 만드는 삼각형 넓이 (dataset 합)
+        areas = np.abs(
+            (x[a] - avg_x) * (y[:, start:end] - y[:, a:a + 1])
+            - (x[a] - x[start:end]) * (avg_y - y[:, a:a + 1])
+        ).sum(axis=0)
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    selected[-1] = count - 1
+    return selected
+
+
+def _bucket_bounds(selected: np.ndarray, count: int) -> np.ndarray:
+    """선택된 각 점이 대표하는 원본 구간의 시작 인덱스 (다음 점의 중간까지)"""
+    midpoints = (selected[:-1] + selected[1:] + 1) // 2
+    return np.concatenate([[0], midpoints, [count]])
+
+
+def downsample_line_chart(chart_data: dict, max_points: int, envelope: bool = True):
+    """
+    line_chart 데이터를 포인트 예산 이하로 다운샘플링
+
+    Args:
+        chart_data (dict): Chart.js 형식 {"labels": [...], "datasets": [{"label", "data": [...], ...}]}
+        max_points (int): 요청별 최대 포인트 수
+        envelope (bool): 구간별 최솟값/최댓값 envelope dataset 추가 여부
+
+    Returns:
+        tuple[dict, dict | None]: (다운샘플링된 chart_data, 다운샘플링 정보)
+            포인트 수가 예산 이하이거나 숫자 시계열이 아니면 (원본, None)
+    """
+    if not isinstance(chart_data, dict):
+        return chart_data, None
+    labels = chart_data.get("labels")
+    datasets = chart_data.get("datasets")
+    if not isinstance(labels, list) or not isinstance(datasets, list) or len(labels) <= max_points:
+        return chart_data, None
+
+    count = len(labels)
+    numeric = [
+        (dataset, _numeric_series(dataset.get("data"), count))
+        for dataset in datasets if isinstance(dataset, dict)
+    ]
+    numeric = [(dataset, series) for dataset, series in numeric if series is not None]
+    if not numeric or len(numeric) != len(datasets):
+        return chart_data, None
+
+    # 모든 dataset이 labels를 공유하므로 남길 인덱스는 공통으로 선택
+    series = np.vstack([values for _, values in numeric])
+    selected = lttb_indices(series, max_points)
+
+    new_datasets = []
+    for dataset, values in numeric:
+        new_datasets.append({**dataset, "data": [_to_json(values[i]) for i in selected]})
+
+    if envelope:
+        bounds = _bucket_bounds(selected, count)
+        with np.errstate(all="ignore"):
+            for dataset, values in numeric:
+                lows = [_to_json(np.nanmin(values[s:e])) if np.any(np.isfinite(values[s:e])) else None
+                        for s, e in zip(bounds[:-1], bounds[1:])]
+                highs = [_to_json(np.nanmax(values[s:e])) if np.any(np.isfinite(values[s:e])) else None
+                         for s, e in zip(bounds[:-1], bounds[1:])]
+                color = dataset.get("borderColor", "rgb(75, 192, 192)")
+                label = dataset.get("label", "")
+                new_datasets.append({
+                    "label": f"{label} 최소", "data": lows, ENVELOPE_KEY: "min",
+                    "borderColor": color, "borderWidth": 0, "pointRadius": 0, "fill": False,
+                })
+                new_datasets.append({
+                    "label": f"{label} 최대", "data": highs, ENVELOPE_KEY: "max",
+                    "borderColor": color, "borderWidth": 0, "pointRadius": 0,
+                    "backgroundColor": _translucent(color), "fill": "-1",
+                })
+
+    downsampled = {**chart_data, "labels": [labels[i] for i in selected], "datasets": new_datasets}
+    info = {
+        "method": "lttb",
+        "original_points": count,
+        "points": int(len(selected)),
+        "envelope": envelope,
+    }
+    return downsampled, info
+
+
+def _to_json(value):
+    """numpy 값 → JSON 숫자 (NaN은 null, 정수 값은 int)"""
+    value = float(value)
+    if not np.isfinite(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _translucent(color: str) -> str:
+    """"rgb(r, g, b)" → "rgba(r, g, b, 0.15)" (그 외 형식은 기본 음영 색)"""
+    if isinstance(color, str) and color.startswith("rgb(") and color.endswith(")"):
+        return f"rgba({color[4:-1]}, 0.15)"
+    return "rgba(75, 192, 192, 0.15)"
@@ -0,0 +1,377 @@
+"""
+Ride Anomaly Detection
+
+구간(노선, 출발시간, 순번, 정류장, 승/하차)별 운행일 인원의 이상치 탐지
+
+- 이력 기반 (승하차 저장소): 구간별 인원의 지수 이동 평균/분산(반감기 ANOMALY_HALFLIFE_DAYS)을
+  적재할 때마다 갱신하므로 갱신 비용은 새 레코드 수(+ 구간 수)에 비례 (과거 파티션을 다시 읽지 않음)
+  - 가장 최근 운행일은 적재될 때마다 인원을 누적하고, 더 새로운 운행일이 들어오면 확정하여 통계에 반영
+  - 확정할 때 이력이 있는 구간 중 그날 기록이 없는 구간은 인원 0으로 판정/갱신 (승객이 사라진 급감도 탐지)
+    확정 전인 가장 최근 운행일은 아직 적재 중일 수 있으므로 기록이 있는 구간만 판정
+  - z = (인원 - 평균) / max(표준편차, ANOMALY_MIN_STD)를 numpy로 모든 구간에 대해 한 번에 계산
+  - 이미 확정된 운행일의 기록이 늦게 들어오면 저장소 집계에서 다시 계산 (RideStore가 처리)
+- 이력이 없을 때 (스냅샷만): 같은 노선/출발시간/승하차 안에서 정류장 인원의 robust z (중앙값/MAD)
+
+상태 파일: <승하차 저장소>/anomalies.npz
+"""
+import json
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from config import (
+    ANOMALY_HALFLIFE_DAYS,
+    ANOMALY_MAX_RESULTS,
+    ANOMALY_MIN_HISTORY_DAYS,
+    ANOMALY_MIN_STD,
+    ANOMALY_RECENT_DAYS,
+    ANOMALY_Z_THRESHOLD,
+)
+
+# 이상 탐지 단위 (차량번호/구분은 합산)
+SEGMENT_COLUMNS = ("노선명", "출발시간", "순번", "정류장명", "승/하차")
+
+STATE_FILE = "anomalies.npz"
+
+# 이상 탐지 질문 키워드 ("이상"만으로는 "10명 이상" 같은 비교 표현과 구분되지 않음)
+_QUESTION_KEYWORDS = (
+    "이상한", "이상치", "이상 패턴", "이상 징후", "이상징후", "특이", "평소와", "평소보다",
+    "급증", "급감", "튀는", "anomal",
+)
+
+# robust z 척도 (MAD → 정규분포 표준편차)
+_MAD_SCALE = 1.4826
+# 노선 내 비교에 필요한 최소 정류장 수
+_MIN_GROUP_SIZE = 4
+# 노선 내 인원 비중이 이 이상인 정류장은 기점/종점으로 보고 비교에서 제외
+_TERMINAL_SHARE = 0.5
+
+_DATASET_STYLES = (
+    ("rgba(239, 68, 68, 0.6)", "rgb(239, 68, 68)"),
+    ("rgba(148, 163, 184, 0.6)", "rgb(148, 163, 184)"),
+)
+
+
+def match_anomaly_question(question: str) -> bool:
+    """이상 패턴을 묻는 질문인지 여부"""
+    question = (question or "").lower()
+    return any(keyword in question for keyword in _QUESTION_KEYWORDS)
+
+
+def segment_key(record: dict) -> tuple:
+    """승하차 레코드 → 구간 키"""
+    return tuple(record.get(column) for column in SEGMENT_COLUMNS)
+
+
+def _alpha() -> float:
+    """지수 이동 평균 가중치 (반감기 → 새 관측의 비중)"""
+    return 1.0 - 0.5 ** (1.0 / max(ANOMALY_HALFLIFE_DAYS, 1e-6))
+
+
+def _since(day: str) -> str:
+    """day를 포함한 최근 ANOMALY_RECENT_DAYS일의 시작 운행일"""
+    return (date.fromisoformat(day) - timedelta(days=ANOMALY_RECENT_DAYS - 1)).isoformat()
+
+
+def _flag(key: tuple, day: str, count: float, expected: float, z: float) -> dict:
+    return {
+        **dict(zip(SEGMENT_COLUMNS, key)),
+        "운행일": day,
+        "인원": int(count),
+        "기대값": round(float(expected), 1),
+        "z": round(float(z), 2),
+    }
+
+
+class AnomalyDetector:
+    """
+    구간별 운행일 인원의 증분 통계
+
+    Attributes:
+        keys (list): 구간 키 (배열 인덱스 순서)
+        n (np.ndarray): 구간별 확정된 운행일 수
+        mean, var (np.ndarray): 구간별 지수 이동 평균/분산 (확정된 운행일 기준)
+        open_day (str): 아직 확정되지 않은 가장 최근 운행일
+        open_counts (np.ndarray): open_day의 구간별 누적 인원
+        recent (list): 확정된 최근 ANOMALY_RECENT_DAYS 운행일의 이상 구간
+        stale (bool): 확정된 운행일의 기록이 늦게 들어와 다시 계산해야 함
+    """
+
+    def __init__(self):
+        self.keys = []
+        self._index = {}
+        self.n = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.var = np.zeros(0)
+        self.open_day = None
+        self.open_counts = np.zeros(0)
+        self.open_seen = np.zeros(0, dtype=bool)
+        self.recent = []
+        self.stale = False
+
+    def history_days(self) -> int:
+        """가장 긴 구간 이력 (확정된 운행일 수)"""
+        return int(self.n.max()) if len(self.n) else 0
+
+    def _positions(self, keys: list) -> np.ndarray:
+        """구간 키 → 배열 인덱스 (처음 보는 구간은 배열 끝에 추가)"""
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self._index]
+        if new_keys:
+            for key in new_keys:
+                self._index[key] = len(self.keys)
+                self.keys.append(key)
+            grow = len(new_keys)
+            self.n = np.concatenate([self.n, np.zeros(grow, dtype=np.int64)])
+            self.mean = np.concatenate([self.mean, np.zeros(grow)])
+            self.var = np.concatenate([self.var, np.zeros(grow)])
+            self.open_counts = np.concatenate([self.open_counts, np.zeros(grow)])
+            self.open_seen = np.concatenate([self.open_seen, np.zeros(grow, dtype=bool)])
+        return np.fromiter((self._index[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def update(self, day_counts: dict):
+        """
+        적재된 기록 반영
+
+        Args:
+            day_counts (dict): 운행일 → {구간 키: 인원 증분}
+                (확정된 운행일보다 이전 기록이 있으면 stale만 표시하고 건너뜀)
+        """
+        for day in sorted(day_counts):
+            if self.open_day is not None and day < self.open_day:
+                self.stale = True
+                continue
+            if self.open_day is not None and day > self.open_day:
+                self._fold()
+            self.open_day = day
+
+            counts = day_counts[day]
+            positions = self._positions(list(counts))
+            np.add.at(self.open_counts, positions, np.fromiter(counts.values(), dtype=float, count=len(counts)))
+            self.open_seen[positions] = True
+
+    def _score(self, counts: np.ndarray, mask: np.ndarray):
+        """확정된 통계 대비 z (이력이 ANOMALY_MIN_HISTORY_DAYS 이상인 구간만)"""
+        index = np.flatnonzero(mask & (self.n >= ANOMALY_MIN_HISTORY_DAYS))
+        std = np.maximum(np.sqrt(self.var[index]), ANOMALY_MIN_STD)
+        z = (counts[index] - self.mean[index]) / std
+        hit = np.abs(z) >= ANOMALY_Z_THRESHOLD
+        return index[hit], z[hit]
+
+    def _open_flags(self, mask: np.ndarray = None) -> list:
+        if self.open_day is None:
+            return []
+        index, z = self._score(self.open_counts, self.open_seen if mask is None else mask)
+        return [
+            _flag(self.keys[i], self.open_day, self.open_counts[i], self.mean[i], score)
+            for i, score in zip(index.tolist(), z.tolist())
+        ]
+
+    def _fold(self):
+        """
+        open_day 확정: 판정 결과를 recent에 남기고 구간 통계 갱신
+
+        이력이 있는 구간은 그날 기록이 없어도 인원 0으로 판정/갱신 (open_counts가 0이므로 그대로 사용)
+        """
+        mask = self.open_seen | (self.n > 0)
+        counts = self.open_counts
+
+        since = _since(self.open_day)
+        self.recent = [flag for flag in self.recent + self._open_flags(mask) if flag["운행일"] >= since]
+
+        first = mask & (self.n == 0)
+        seen = mask & (self.n > 0)
+        alpha = _alpha()
+
+        self.mean[first] = counts[first]
+        self.var[first] = 0.0
+        delta = counts[seen] - self.mean[seen]
+        self.mean[seen] += alpha * delta
+        self.var[seen] = (1.0 - alpha) * (self.var[seen] + alpha * delta ** 2)
+        self.n[mask] += 1
+
+        self.open_counts = np.zeros(len(self.keys))
+        self.open_seen = np.zeros(len(self.keys), dtype=bool)
+
+    def anomalies(self) -> list:
+        """최근 운행일(확정 + 가장 최근 운행일)의 이상 구간 (|z| 내림차순)"""
+        since = _since(self.open_day) if self.open_day else ""
+        flags = [flag for flag in self.recent if flag["운행일"] >= since] + self._open_flags()
+        return sorted(flags, key=lambda flag: abs(flag["z"]), reverse=True)
+
+    def save(self, path: str):
+        """상태 저장 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = f"{path}.tmp"
+        meta = {"open_day": self.open_day, "recent": self.recent}
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                keys=np.array(json.dumps(self.keys, ensure_ascii=False)),
+                meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                n=self.n, mean=self.mean, var=self.var,
+                open_counts=self.open_counts, open_seen=self.open_seen,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "AnomalyDetector":
+        """상태 로드 (파일이 없으면 빈 상태)"""
+        detector = cls()
+        if not os.path.exists(path):
+            return detector
+        with np.load(path, allow_pickle=False) as data:
+            detector.keys = [tuple(key) for key in json.loads(str(data["keys"]))]
+            detector._index = {key: i for i, key in enumerate(detector.keys)}
+            detector.n = data["n"]
+            detector.mean = data["mean"]
+            detector.var = data["var"]
+            detector.open_counts = data["open_counts"]
+            detector.open_seen = data["open_seen"]
+            meta = json.loads(str(data["meta"]))
+        detector.open_day = meta["open_day"]
+        detector.recent = meta["recent"]
+        return detector
+
+
+@lru_cache(maxsize=32)
+def _load_cached(path: str, mtime_ns: int, size: int) -> AnomalyDetector:
+    """조회용 상태 (파일이 바뀌지 않았으면 재사용, 수정하지 않음)"""
+    return AnomalyDetector.load(path)
+
+
+def load_detector(path: str) -> Optional[AnomalyDetector]:
+    """조회용 상태 (파일이 없으면 None)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return _load_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+def score_cross_section(records) -> list:
+    """
+    이력이 없을 때의 이상 구간: 같은 (노선, 출발시간, 승/하차) 안에서 정류장 인원의 robust z
+
+    Args:
+        records: 승하차정보.json 형식 레코드
+
+    Returns:
+        list[dict]: 이상 구간 (|z| 내림차순, 운행일은 None)
+    """
+    totals = {}
+    for record in records:
+        key = segment_key(record)
+        totals[key] = totals.get(key, 0) + (record.get("인원", 0) or 0)
+    if not totals:
+        return []
+
+    keys = list(totals)
+    counts = np.fromiter(totals.values(), dtype=float, count=len(keys))
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault((key[0], key[1], key[4]), []).append(i)
+
+    flags = []
+    for members in groups.values():
+        if len(members) < _MIN_GROUP_SIZE:
+            continue
+        index = np.array(members)
+        # 출근 노선의 종점 하차 / 퇴근 노선의 기점 승차처럼 인원이 한 정류장에 모이는 구간은 구조적이므로 제외
+        index = index[counts[index] < counts[index].sum() * _TERMINAL_SHARE]
+        if len(index) < _MIN_GROUP_SIZE:
+            continue
+        values = counts[index]
+        median = np.median(values)
+        scale = np.maximum(np.median(np.abs(values - median)) * _MAD_SCALE, ANOMALY_MIN_STD)
+        z = (values - median) / scale
+        for i in np.flatnonzero(np.abs(z) >= ANOMALY_Z_THRESHOLD).tolist():
+            flags.append(_flag(keys[index[i]], None, values[i], median, z[i]))
+    return sorted(flags, key=lambda flag: abs(flag["z"]), reverse=True)
+
+
+def _edge_index(snapshot):
+    outgoing, incoming = {}, {}
+    for edge in snapshot.edges_by_id.values():
+        outgoing.setdefault(edge.get("source"), []).append(edge)
+        incoming.setdefault(edge.get("target"), []).append(edge)
+    return outgoing, incoming
+
+
+def find_anomalies(snapshot) -> dict:
+    """
+    스냅샷 테넌트의 이상 구간과 하이라이트할 엣지
+
+    승하차 저장소에 ANOMALY_MIN_HISTORY_DAYS 이상의 이력이 있으면 이력 기반,
+    없으면 스냅샷 승하차 정보의 노선 내 비교
+
+    Returns:
+        dict: {"method": "history" | "cross_section", "history_days", "segments": [...], "edges": [...]}
+            segments 항목: 구간 컬럼 + 운행일, 인원, 기대값, z, edge_ids
+            edges: 하이라이트할 ReactFlow 엣지 {"id", "source", "target", "label"} (중복 제거)
+    """
+    from analytics.data.ride_store import get_ride_store
+
+    detector = get_ride_store(snapshot.tenant).anomaly_detector()
+    if detector is not None and detector.history_days() >= ANOMALY_MIN_HISTORY_DAYS:
+        method, history_days, flags = "history", detector.history_days(), detector.anomalies()
+    else:
+        method, history_days, flags = "cross_section", 0, score_cross_section(snapshot.transport_records)
+
+    # 정류장 노드 ID는 "<노선명>::<순번>", 승차는 정류장에서 나가는 엣지 / 하차는 들어오는 엣지
+    outgoing, incoming = _edge_index(snapshot)
+    edges = {}
+    segments = []
+    for flag in flags[:ANOMALY_MAX_RESULTS]:
+        node_id = f"{flag['노선명']}::{flag['순번']}"
+        primary, secondary = (outgoing, incoming) if flag["승/하차"] == "승차" else (incoming, outgoing)
+        matched = primary.get(node_id) or secondary.get(node_id) or []
+        for edge in matched:
+            edges.setdefault(edge.get("id"), {
+                "id": edge.get("id"),
+                "source": edge.get("source"),
+                "target": edge.get("target"),
+                "label": edge.get("label"),
+            })
+        segments.append({**flag, "edge_ids": [edge.get("id") for edge in matched]})
+
+    return {"method": method, "history_days": history_days, "segments": segments, "edges": list(edges.values())}
+
+
+def to_prompt_text(result: dict) -> str:
+    """프롬프트용 이상 구간 텍스트"""
+    if result["method"] == "history":
+        basis = f"구간별 최근 {result['history_days']}일 이력의 이동 평균 대비 (|z| ≥ {ANOMALY_Z_THRESHOLD:g})"
+    else:
+        basis = f"운행일 이력이 없어 같은 노선/출발시간의 다른 정류장 대비 (|z| ≥ {ANOMALY_Z_THRESHOLD:g})"
+    lines = [f"[판정 기준] {basis}", f"[이상 구간] {len(result['segments'])}개"]
+    if result["segments"]:
+        columns = (*SEGMENT_COLUMNS, "운행일", "인원", "기대값", "z")
+        lines.append(" | ".join(columns))
+        lines.extend(" | ".join(str(segment[column]) for column in columns) for segment in result["segments"])
+    return "\n".join(lines)
+
+
+def anomaly_chart(result: dict, chart_type: str) -> Optional[dict]:
+    """
+    이상 구간 → Chart.js 차트 데이터 (인원 vs 기대값, bar_chart / line_chart)
+
+    Returns:
+        dict: {"labels", "datasets"} (이상 구간이 없거나 차트로 그릴 수 없는 타입이면 None)
+    """
+    if chart_type not in ("bar_chart", "line_chart") or not result["segments"]:
+        return None
+    segments = result["segments"]
+    labels = [
+        f"{segment['노선명']} {segment['순번']}. {segment['정류장명']} {segment['승/하차']}"
+        + (f" ({segment['운행일']})" if segment["운행일"] else "")
+        for segment in segments
+    ]
+    datasets = []
+    for (label, key), (background, border) in zip((("인원", "인원"), ("기대값", "기대값")), _DATASET_STYLES):
+        dataset = {"label": label, "data": [segment[key] for segment in segments], "borderColor": border}
+        if chart_type == "bar_chart":
+            dataset.update({"backgroundColor": background, "borderWidth": 1})
+        else:
+            dataset["tension"] = 0.1
+        datasets.append(dataset)
+    return {"labels": labels, "datasets": datasets}
@@ -0,0 +1,110 @@
+"""
+Live Dashboard View
+
+실시간 대시보드(/api/live)로 보내는 데이터 스냅샷의 뷰와 버전 간 delta
+
+- graph: ReactFlow 원본 노드/엣지 (프론트엔드 reactflow_graph.json과 같은 구조)
+- top_edges: 승차/하차 인원 기준 상위 엣지 (하이라이트 후보)
+- aggregates: 전체 노선 합계와 노선별 승차 인원/좌석 이용률
+
+delta는 ID 기준으로 추가/변경된 노드·엣지(upsert)와 삭제된 ID(remove)만 담음
+"""
+from typing import NamedTuple
+from config import LIVE_TOP_EDGES
+
+
+class LiveView(NamedTuple):
+    """특정 데이터 버전의 대시보드 뷰"""
+    version: str
+    nodes: dict
+    edges: dict
+    top_edges: list
+    aggregates: dict
+
+
+def _top_edges(snapshot) -> list:
+    ranked = sorted(
+        snapshot.edges_by_id.values(),
+        key=lambda edge: (edge.get("data") or {}).get("count", 0),
+        reverse=True,
+    )
+    top_edges = []
+    for edge in ranked[:LIVE_TOP_EDGES]:
+        source = snapshot.nodes_by_id.get(edge.get("source")) or {}
+        top_edges.append({
+            "id": edge.get("id"),
+            "source": edge.get("source"),
+            "target": edge.get("target"),
+            "label": edge.get("label"),
+            "count": (edge.get("data") or {}).get("count", 0),
+            "route": (source.get("data") or {}).get("route"),
+        })
+    return top_edges
+
+
+def _aggregates(snapshot) -> dict:
+    economics = snapshot.economics
+    return {
+        **economics.totals(),
+        "rides": len(snapshot.transport_records),
+        "routes": [
+            {"route": metrics["route"], "riders": metrics["riders"], "utilization": metrics["utilization"]}
+            for metrics in economics.route_metrics()
+        ],
+    }
+
+
+def build_live_view(snapshot) -> LiveView:
+    """
+    스냅샷 → 대시보드 뷰
+
+    Args:
+        snapshot (DataSnapshot): 공유 데이터 스냅샷
+
+    Returns:
+        LiveView: 뷰 (노드/엣지는 스냅샷의 원본 객체를 복사하지 않고 참조)
+    """
+    return LiveView(
+        version=snapshot.version,
+        nodes=dict(snapshot.nodes_by_id),
+        edges=dict(snapshot.edges_by_id),
+        top_edges=_top_edges(snapshot),
+        aggregates=_aggregates(snapshot),
+    )
+
+
+def _diff(previous: dict, current: dict) -> dict:
+    return {
+        "upsert": [item for item_id, item in current.items() if previous.get(item_id) != item],
+        "remove": [item_id for item_id in previous if item_id not in current],
+    }
+
+
+def full_message(view: LiveView) -> dict:
+    """새 구독자 / 재동기화용 전체 뷰 메시지"""
+    return {
+        "type": "snapshot",
+        "version": view.version,
+        "graph": {"nodes": list(view.nodes.values()), "edges": list(view.edges.values())},
+        "top_edges": view.top_edges,
+        "aggregates": view.aggregates,
+    }
+
+
+def delta_message(previous: LiveView, current: LiveView) -> dict:
+    """
+    두 버전 사이의 delta 메시지
+
+    top_edges / aggregates는 크기가 작으므로 바뀌었을 때 전체 값을 보냄 (바뀌지 않았으면 생략)
+    """
+    message = {
+        "type": "delta",
+        "version": current.version,
+        "previous_version": previous.version,
+        "graph": {"nodes": _diff(previous.nodes, current.nodes), "edges": _diff(previous.edges, current.edges)},
+    }
+    if current.top_edges != previous.top_edges:
+        message["top_edges"] = current.top_edges
+    if current.aggregates != previous.aggregates:
+        message["aggregates"] = current.aggregates
+    return message
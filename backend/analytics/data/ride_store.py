@@ -0,0 +1,479 @@
+"""
+Ride Store
+
+운행일이 있는 승하차 기록을 일/월 단위 파티션으로 누적 저장하는 저장소
+
+- 파티션: RIDE_STORE_DIR/<키>.jsonl (원본 레코드, append only)
+          RIDE_STORE_DIR/<키>.agg.json (운행일별 집계: 승하차정보.json과 같은 컬럼 + 인원 합계)
+- manifest.json: 파티션 목록과 행 수 (저장소 버전은 이 파일의 stat으로 판단)
+- 적재 시 영향받는 파티션의 집계만 갱신하므로 이력이 쌓여도 적재 비용은 새 레코드 수에 비례
+- 기간 조회는 기간에 걸친 파티션의 집계만 읽음 (원본 JSONL은 iter_records에서만 읽음)
+- anomalies.npz: 구간별 이상 탐지 통계 (analytics.data.anomalies, 적재할 때 새 레코드로만 갱신)
+
+CLI:
+    python -m analytics.data.ride_store ingest rides.json --date 2026-10-19
+    python -m analytics.data.ride_store partitions
+    python -m analytics.data.ride_store aggregate --start 2026-10-01 --end 2026-10-19
+    python -m analytics.data.ride_store rebuild
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional
+from analytics.data.anomalies import STATE_FILE as ANOMALY_STATE_FILE
+from analytics.data.anomalies import AnomalyDetector, load_detector, segment_key
+from config import RIDE_STORE_DIR, RIDE_STORE_PARTITION
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 프로세스 내 잠금만 사용
+    fcntl = None
+
+# 운행일 컬럼 (YYYY-MM-DD)
+DATE_COLUMN = "운행일"
+
+# 집계 키 컬럼 (승하차정보.json 레코드에서 "인원"을 제외한 컬럼)
+KEY_COLUMNS = ("노선명", "구분", "출발시간", "차량번호", "순번", "정류장명", "승/하차")
+
+PARTITION_UNITS = ("day", "month")
+
+
+def _parse_day(value) -> str:
+    """운행일 검증 ("2026-10-19" 또는 date → "2026-10-19")"""
+    if isinstance(value, date):
+        return value.isoformat()
+    try:
+        return date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid {DATE_COLUMN}: {value!r} (expected YYYY-MM-DD)")
+
+
+def _validate(record, index: int, default_date: Optional[str]) -> dict:
+    if not isinstance(record, dict):
+        raise ValueError(f"Record {index}: expected an object")
+    day = record.get(DATE_COLUMN) or default_date
+    if not day:
+        raise ValueError(f"Record {index}: missing {DATE_COLUMN} (or pass a default date)")
+    if not record.get("노선명") or not record.get("정류장명"):
+        raise ValueError(f"Record {index}: 노선명 and 정류장명 are required")
+    if record.get("승/하차") not in ("승차", "하차"):
+        raise ValueError(f"Record {index}: 승/하차 must be 승차 or 하차")
+    count = record.get("인원", 0)
+    if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+        raise ValueError(f"Record {index}: 인원 must be a non-negative integer")
+    # 순번은 노선 안 정류장 순서 (정렬/최대 재차 계산에 사용되므로 정수로 통일, 누락 시 0)
+    order = record.get("순번")
+    if order is None:
+        order = 0
+    if isinstance(order, bool) or isinstance(order, float) or not str(order).strip().isdigit():
+        raise ValueError(f"Record {index}: 순번 must be a non-negative integer")
+
+    validated = {DATE_COLUMN: _parse_day(day)}
+    validated.update({column: record.get(column) for column in KEY_COLUMNS})
+    validated["순번"] = int(order)
+    validated["인원"] = count
+    return validated
+
+
+@lru_cache(maxsize=256)
+def _load_aggregate(path: str, mtime_ns: int, size: int) -> dict:
+    """파티션 집계 파일 로드 (파일이 바뀌지 않았으면 재사용)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: str, payload):
+    # 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 쓰다 만 파일을 보지 않게 함
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+class RideStore:
+    """
+    운행일별 파티션 승하차 저장소
+
+    Attributes:
+        root (str): 저장 디렉터리
+        partition (str): 파티션 단위 ("day" | "month")
+    """
+
+    def __init__(self, root: str = RIDE_STORE_DIR, partition: str = RIDE_STORE_PARTITION):
+        if partition not in PARTITION_UNITS:
+            raise ValueError(f"Unknown partition unit: {partition} (available: {', '.join(PARTITION_UNITS)})")
+        self.root = root
+        self.partition = partition
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, "manifest.json")
+
+    @property
+    def anomaly_path(self) -> str:
+        return os.path.join(self.root, ANOMALY_STATE_FILE)
+
+    def partition_key(self, day: str) -> str:
+        """운행일 → 파티션 키 ("2026-10-19" 또는 "2026-10")"""
+        return day if self.partition == "day" else day[:7]
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{key}{suffix}")
+
+    @contextmanager
+    def _locked(self):
+        """적재 잠금 (프로세스 내 + 다른 워커/CLI 프로세스 간)"""
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def manifest(self) -> dict:
+        """파티션 목록 {"partitions": {키: {"rows", "days"}}} (저장소가 비어 있으면 빈 목록)"""
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return {"partitions": {}}
+        return _load_aggregate(self.manifest_path, stat.st_mtime_ns, stat.st_size)
+
+    def version(self) -> str:
+        """저장소 버전 (manifest 파일 stat 기반, 적재할 때마다 바뀜)"""
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return "empty"
+        return hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")).hexdigest()[:12]
+
+    def latest_day(self) -> Optional[str]:
+        """저장된 가장 최근 운행일"""
+        days = [day for info in self.manifest()["partitions"].values() for day in info["days"]]
+        return max(days) if days else None
+
+    def _partition_aggregate(self, key: str) -> dict:
+        path = self._path(key, ".agg.json")
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return {"days": {}}
+        return _load_aggregate(path, stat.st_mtime_ns, stat.st_size)
+
+    def ingest(self, records: list, default_date: str = None) -> dict:
+        """
+        승하차 기록 적재
+
+        레코드를 모두 검증한 뒤 파티션별로 JSONL에 추가하고, 영향받은 파티션의 집계와 manifest만 갱신
+
+        Args:
+            records (list): 승하차정보.json 형식 레코드 (+ "운행일")
+            default_date (str): "운행일"이 없는 레코드에 사용할 운행일
+
+        Returns:
+            dict: {"ingested": 건수, "partitions": [갱신된 파티션 키...], "version": 저장소 버전}
+
+        Raises:
+            ValueError: 잘못된 레코드 (아무것도 적재하지 않음)
+        """
+        default_date = _parse_day(default_date) if default_date else None
+        validated = [_validate(record, index, default_date) for index, record in enumerate(records)]
+
+        by_partition = {}
+        for record in validated:
+            by_partition.setdefault(self.partition_key(record[DATE_COLUMN]), []).append(record)
+
+        with self._locked():
+            manifest = {"partitions": dict(self.manifest()["partitions"])}
+            had_history = bool(manifest["partitions"])
+            for key, partition_records in sorted(by_partition.items()):
+                with open(self._path(key, ".jsonl"), "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in partition_records)
+
+                aggregate = self._partition_aggregate(key)
+                days = {day: {tuple(row[:-1]): row[-1] for row in rows} for day, rows in aggregate["days"].items()}
+                _accumulate(days, partition_records)
+                self._write_partition(key, days)
+
+                previous = manifest["partitions"].get(key) or {"rows": 0}
+                manifest["partitions"][key] = {"rows": previous["rows"] + len(partition_records), "days": sorted(days)}
+
+            manifest["partitions"] = dict(sorted(manifest["partitions"].items()))
+            _write_json(self.manifest_path, manifest)
+            self._update_anomalies(validated, replay=had_history and not os.path.exists(self.anomaly_path))
+
+        print(f"📥 승하차 기록 적재: {len(validated)}건, 파티션 {', '.join(sorted(by_partition)) or '-'}")
+        return {"ingested": len(validated), "partitions": sorted(by_partition), "version": self.version()}
+
+    def _update_anomalies(self, records: list, replay: bool = False):
+        """
+        이상 탐지 통계 갱신 (적재 잠금 안에서 호출)
+
+        새 레코드만 반영하고, 이미 확정된 운행일의 기록이 늦게 들어왔거나
+        기존 이력에 상태 파일이 없으면 파티션 집계에서 다시 계산
+        """
+        detector = None
+        if not replay:
+            detector = AnomalyDetector.load(self.anomaly_path)
+            day_counts = {}
+            for record in records:
+                counts = day_counts.setdefault(record[DATE_COLUMN], {})
+                key = segment_key(record)
+                counts[key] = counts.get(key, 0) + record["인원"]
+            detector.update(day_counts)
+            if detector.stale:
+                print("🔁 이전 운행일 기록 적재 → 이상 탐지 통계 재계산")
+        if detector is None or detector.stale:
+            detector = self._replay_anomalies()
+        detector.save(self.anomaly_path)
+
+    def _replay_anomalies(self) -> AnomalyDetector:
+        """모든 파티션 집계로 이상 탐지 통계 재계산 (운행일 순서대로)"""
+        detector = AnomalyDetector()
+        for key in self.manifest()["partitions"]:
+            day_counts = {}
+            for day, rows in self._partition_aggregate(key)["days"].items():
+                counts = day_counts.setdefault(day, {})
+                for row in rows:
+                    segment = segment_key(dict(zip(KEY_COLUMNS, row[:-1])))
+                    counts[segment] = counts.get(segment, 0) + row[-1]
+            detector.update(day_counts)
+        return detector
+
+    def anomaly_detector(self) -> Optional[AnomalyDetector]:
+        """조회용 이상 탐지 통계 (적재된 기록이 없으면 None)"""
+        return load_detector(self.anomaly_path)
+
+    def _write_partition(self, key: str, days: dict):
+        _write_json(self._path(key, ".agg.json"), {
+            "days": {day: [[*row_key, count] for row_key, count in rows.items()] for day, rows in sorted(days.items())},
+        })
+
+    def rebuild(self, keys: list = None) -> list:
+        """
+        파티션 JSONL을 다시 읽어 집계와 manifest 재생성 (적재 도중 중단되었을 때 복구용)
+
+        Args:
+            keys (list): 재생성할 파티션 키 (None이면 디렉터리의 모든 파티션)
+
+        Returns:
+            list: 재생성한 파티션 키
+        """
+        with self._locked():
+            if keys is None:
+                keys = sorted(name[:-len(".jsonl")] for name in os.listdir(self.root) if name.endswith(".jsonl"))
+            manifest = {"partitions": dict(self.manifest()["partitions"])}
+            for key in keys:
+                days = {}
+                rows = 0
+                with open(self._path(key, ".jsonl"), "r", encoding="utf-8") as f:
+                    for chunk in _chunks(json.loads(line) for line in f if line.strip()):
+                        _accumulate(days, chunk)
+                        rows += len(chunk)
+                self._write_partition(key, days)
+                manifest["partitions"][key] = {"rows": rows, "days": sorted(days)}
+            manifest["partitions"] = dict(sorted(manifest["partitions"].items()))
+            _write_json(self.manifest_path, manifest)
+            self._replay_anomalies().save(self.anomaly_path)
+        return keys
+
+    def _window_keys(self, start: Optional[str], end: Optional[str]) -> list:
+        """기간에 걸친 파티션 키 (ISO 날짜 문자열이므로 문자열 비교로 충분)"""
+        start_key = self.partition_key(start) if start else None
+        end_key = self.partition_key(end) if end else None
+        return [
+            key for key in self.manifest()["partitions"]
+            if (start_key is None or key >= start_key) and (end_key is None or key <= end_key)
+        ]
+
+    def aggregate(self, start: str = None, end: str = None, route: str = None) -> list:
+        """
+        기간 집계 (파티션 집계 파일만 읽음)
+
+        Args:
+            start (str): 시작 운행일 (포함, None이면 처음부터)
+            end (str): 종료 운행일 (포함, None이면 끝까지)
+            route (str): 노선명 필터
+
+        Returns:
+            list[dict]: 승하차정보.json과 같은 형식의 레코드 (같은 키의 인원은 기간 합계)
+        """
+        start = _parse_day(start) if start else None
+        end = _parse_day(end) if end else None
+
+        totals = {}
+        for key in self._window_keys(start, end):
+            for day, rows in self._partition_aggregate(key)["days"].items():
+                if (start and day < start) or (end and day > end):
+                    continue
+                for row in rows:
+                    row_key = tuple(row[:-1])
+                    if route is not None and row_key[0] != route:
+                        continue
+                    totals[row_key] = totals.get(row_key, 0) + row[-1]
+
+        return [{**dict(zip(KEY_COLUMNS, row_key)), "인원": count} for row_key, count in totals.items()]
+
+    def daily_totals(self, start: str = None, end: str = None) -> list:
+        """운행일별 승차/하차 합계 [{"운행일", "승차", "하차"}, ...]"""
+        start = _parse_day(start) if start else None
+        end = _parse_day(end) if end else None
+
+        daily = []
+        for key in self._window_keys(start, end):
+            for day, rows in self._partition_aggregate(key)["days"].items():
+                if (start and day < start) or (end and day > end):
+                    continue
+                totals = {"운행일": day, "승차": 0, "하차": 0}
+                for row in rows:
+                    totals[row[KEY_COLUMNS.index("승/하차")]] += row[-1]
+                daily.append(totals)
+        return sorted(daily, key=lambda row: row["운행일"])
+
+    def iter_daily_aggregates(self, start: str = None, end: str = None):
+        """
+        기간의 운행일별 집계 행 (파티션 집계 파일만 읽음)
+
+        Yields:
+            tuple: (운행일, *KEY_COLUMNS 값, 인원)
+        """
+        start = _parse_day(start) if start else None
+        end = _parse_day(end) if end else None
+        for key in self._window_keys(start, end):
+            for day, rows in self._partition_aggregate(key)["days"].items():
+                if (start and day < start) or (end and day > end):
+                    continue
+                for row in rows:
+                    yield (day, *row)
+
+    def iter_records(self, start: str = None, end: str = None, route: str = None):
+        """
+        기간의 원본 레코드 (기간에 걸친 파티션 JSONL만 한 줄씩 읽음)
+
+        Yields:
+            dict: "운행일"이 포함된 승하차 레코드
+        """
+        start = _parse_day(start) if start else None
+        end = _parse_day(end) if end else None
+        for key in self._window_keys(start, end):
+            with open(self._path(key, ".jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    day = record[DATE_COLUMN]
+                    if (start and day < start) or (end and day > end):
+                        continue
+                    if route is not None and record.get("노선명") != route:
+                        continue
+                    yield record
+
+    def recent_records(self, days: int) -> list:
+        """가장 최근 운행일부터 N일간의 기간 집계 (스냅샷용, 저장소가 비어 있으면 빈 목록)"""
+        latest = self.latest_day()
+        if latest is None:
+            return []
+        start = (date.fromisoformat(latest) - timedelta(days=days - 1)).isoformat()
+        return self.aggregate(start=start, end=latest)
+
+
+def _accumulate(days: dict, records):
+    """운행일별 {집계 키: 인원} 에 레코드를 더함"""
+    for record in records:
+        rows = days.setdefault(record[DATE_COLUMN], {})
+        row_key = tuple(record.get(column) for column in KEY_COLUMNS)
+        rows[row_key] = rows.get(row_key, 0) + record.get("인원", 0)
+
+
+def _chunks(iterable, size: int = 10000):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_stores = {}
+
+
+def get_ride_store(tenant: str = None) -> RideStore:
+    """
+    테넌트의 공유 저장소 (기본 테넌트는 RIDE_STORE_DIR, 그 외는 TENANTS_DIR/<tenant_id>/rides)
+
+    Raises:
+        ValueError, UnknownTenant: 잘못된 테넌트 (analytics.data.sources.tenant_sources)
+    """
+    from analytics.data.sources import tenant_sources
+
+    sources = tenant_sources(tenant)
+    store = _stores.get(sources.tenant)
+    if store is None:
+        store = _stores.setdefault(sources.tenant, RideStore(sources.ride_store_dir))
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partitioned ride store (ingest / query)")
+    parser.add_argument("--root", default=RIDE_STORE_DIR)
+    parser.add_argument("--tenant", default=None, help="테넌트 ID (지정하면 TENANTS_DIR/<tenant_id>/rides 사용, --root 무시)")
+    parser.add_argument("--partition", default=RIDE_STORE_PARTITION, choices=PARTITION_UNITS)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="JSON 배열 또는 JSONL 파일 적재")
+    ingest.add_argument("path")
+    ingest.add_argument("--date", default=None, help="운행일이 없는 레코드의 운행일 (YYYY-MM-DD)")
+
+    commands.add_parser("partitions", help="파티션 목록")
+
+    aggregate = commands.add_parser("aggregate", help="기간 집계 출력 (JSON)")
+    aggregate.add_argument("--start", default=None)
+    aggregate.add_argument("--end", default=None)
+    aggregate.add_argument("--route", default=None)
+
+    rebuild = commands.add_parser("rebuild", help="JSONL에서 집계 재생성")
+    rebuild.add_argument("keys", nargs="*")
+    args = parser.parse_args(argv)
+
+    if args.tenant:
+        from analytics.data.sources import tenant_sources
+        store = RideStore(tenant_sources(args.tenant).ride_store_dir, args.partition)
+    else:
+        store = RideStore(args.root, args.partition)
+    if args.command == "ingest":
+        with open(args.path, "r", encoding="utf-8") as f:
+            if args.path.endswith(".jsonl"):
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = json.load(f)
+        try:
+            result = store.ingest(records, default_date=args.date)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        print(json.dumps(result, ensure_ascii=False))
+    elif args.command == "partitions":
+        for key, info in store.manifest()["partitions"].items():
+            print(f"{key}\t{info['rows']} rows\t{len(info['days'])} days")
+    elif args.command == "aggregate":
+        print(json.dumps(store.aggregate(args.start, args.end, args.route), ensure_ascii=False, indent=2))
+    elif args.command == "rebuild":
+        keys = store.rebuild(args.keys or None)
+        print(f"🔁 집계 재생성: {', '.join(keys) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
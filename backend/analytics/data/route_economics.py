@@ -0,0 +1,337 @@
+"""
+Route Economics
+
+통근 수당(운행단가, 지급수당, 야간수당, 운행거리)과 승하차 인원을 노선명으로 조인하여
+노선별 1인당 비용, km당 비용, 좌석 이용률을 계산하는 로컬 엔진
+
+What-if 시나리오(노선 통합, 운행단가 변경, 저이용 정류장 폐지)는
+시나리오 × 노선 행렬로 한 번에 계산 (시나리오 수가 늘어도 Python 루프 없이 벡터 연산)
+"""
+import re
+import numpy as np
+from config import BUS_CAPACITY, NIGHT_ALLOWANCE_HOURS
+
+# 한 번에 평가할 수 있는 최대 시나리오 수
+MAX_SCENARIOS = 1000
+
+_DISTANCE_PATTERN = re.compile(r"([\d.]+)")
+
+
+def _parse_distance_km(value) -> float:
+    """운행거리 ("10KM", 10 등) → km"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _DISTANCE_PATTERN.search(str(value or ""))
+    return float(match.group(1)) if match else float("nan")
+
+
+def _is_night(depart_time: str) -> bool:
+    """출발 시각이 야간수당 적용 시간대인지 여부"""
+    try:
+        hour = int(str(depart_time).split(":")[0])
+    except ValueError:
+        return False
+    return hour in NIGHT_ALLOWANCE_HOURS
+
+
+def _short_name(route: str) -> str:
+    """노선 번호 부분 (예: "출근1호-한국대서문" → "출근1호", "퇴근1호(전자-...)" → "퇴근1호")"""
+    return re.split(r"[-(]", route, maxsplit=1)[0].strip()
+
+
+def _num(value, digits: int = 1):
+    """JSON 응답용 숫자 변환 (0으로 나눈 결과 등 유한하지 않은 값은 None)"""
+    value = float(value)
+    if not np.isfinite(value):
+        return None
+    return round(value, digits)
+
+
+def _stop_order(value) -> int:
+    """순번 정렬 키 (누락/잘못된 값은 0)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class RouteEconomics:
+    """
+    노선별 비용/이용 지표 계산기 (데이터 스냅샷마다 한 번 생성, 읽기 전용)
+
+    Attributes:
+        routes (tuple): 노선명 (통근 수당 데이터 순서)
+        index (dict): 노선명/노선 번호 → 노선 인덱스 (해시 인덱스)
+        cost_per_run (ndarray): 노선별 1회 운행 비용 (운행단가 + 지급수당 + 야간수당)
+        riders (ndarray): 노선별 승차 인원
+        peak_load (ndarray): 노선별 최대 재차 인원
+    """
+
+    def __init__(self, transport: list, commute: list):
+        self.routes = tuple(record.get("노선명") for record in commute)
+        self.index = {}
+        for i, route in enumerate(self.routes):
+            self.index[route] = i
+            self.index.setdefault(_short_name(route), i)
+
+        route_count = len(self.routes)
+        self.unit_price = np.array([record.get("운행단가", 0) for record in commute], dtype=float)
+        self.allowance = np.array([record.get("지급수당", 0) for record in commute], dtype=float)
+        self.night_allowance = np.array(
+            [record.get("야간수당", 0) if _is_night(record.get("출발시간", "")) else 0 for record in commute],
+            dtype=float,
+        )
+        self.distance_km = np.array([_parse_distance_km(record.get("운행거리")) for record in commute], dtype=float)
+        self.cost_per_run = self.unit_price + self.allowance + self.night_allowance
+
+        # 정류장 단위 행 (노선 인덱스, 순번 순으로 정렬) - 노선명이 통근 수당에 없는 행은 제외
+        # 같은 노선/순번 행(차량이 여러 대인 운행일 등)은 입력 순서 유지 (레코드 dict는 비교하지 않음)
+        rows = sorted(
+            (
+                (self.index[record["노선명"]], _stop_order(record.get("순번")), record)
+                for record in transport
+                if record.get("노선명") in self.index
+            ),
+            key=lambda row: (row[0], row[1]),
+        )
+        self.unmatched_records = len(transport) - len(rows)
+        self.stop_route = np.array([route_idx for route_idx, _, _ in rows], dtype=np.int64)
+        self.stop_names = tuple(record.get("정류장명") for _, _, record in rows)
+        self.boarded = np.array(
+            [record.get("인원", 0) if record.get("승/하차") == "승차" else 0 for _, _, record in rows],
+            dtype=float,
+        )
+        self.alighted = np.array(
+            [record.get("인원", 0) if record.get("승/하차") == "하차" else 0 for _, _, record in rows],
+            dtype=float,
+        )
+        self.stop_activity = self.boarded + self.alighted
+
+        # 노선별 첫 정류장 행 위치 (정류장 행은 노선 인덱스 순으로 정렬되어 있음)
+        self._route_start = np.searchsorted(self.stop_route, np.arange(route_count))
+
+        self.riders = np.bincount(self.stop_route, weights=self.boarded, minlength=route_count)
+        self.peak_load = self._peak_load((self.boarded - self.alighted)[None, :])[0]
+
+    def resolve_route(self, name: str) -> int:
+        """
+        노선명 또는 노선 번호("출근1호")로 노선 인덱스 조회
+
+        Raises:
+            ValueError: 알 수 없는 노선
+        """
+        route_idx = self.index.get(str(name).strip())
+        if route_idx is None:
+            raise ValueError(f"Unknown route: {name}")
+        return route_idx
+
+    def route_metrics(self) -> list:
+        """
+        현재 데이터 기준 노선별 지표
+
+        Returns:
+            list[dict]: 노선별 {"route", "riders", "peak_load", "cost_per_run",
+                "cost_per_rider", "cost_per_km", "utilization"}
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost_per_rider = self.cost_per_run / self.riders
+            cost_per_km = self.cost_per_run / self.distance_km
+        utilization = self.peak_load / BUS_CAPACITY
+
+        return [
+            {
+                "route": route,
+                "riders": int(self.riders[i]),
+                "peak_load": int(self.peak_load[i]),
+                "cost_per_run": int(self.cost_per_run[i]),
+                "cost_per_rider": _num(cost_per_rider[i]),
+                "cost_per_km": _num(cost_per_km[i]),
+                "utilization": _num(utilization[i], 3),
+            }
+            for i, route in enumerate(self.routes)
+        ]
+
+    def totals(self) -> dict:
+        """전체 노선 합계 (총 비용, 총 승차 인원, 1인당 비용)"""
+        total_cost = float(self.cost_per_run.sum())
+        total_riders = float(self.riders.sum())
+        return {
+            "total_cost": int(total_cost),
+            "total_riders": int(total_riders),
+            "cost_per_rider": _num(total_cost / total_riders) if total_riders else None,
+            "active_routes": len(self.routes),
+        }
+
+    def _route_index(self, scenario_count: int) -> np.ndarray:
+        """(S × 정류장) 행렬의 각 칸 → (S × 노선) 행렬의 평탄화 인덱스"""
+        route_count = len(self.routes)
+        return (np.arange(scenario_count)[:, None] * route_count + self.stop_route[None, :]).ravel()
+
+    def _route_sum(self, by_stop: np.ndarray) -> np.ndarray:
+        """(S × 정류장) 값을 노선별로 합산 → (S × 노선)"""
+        scenario_count, route_count = len(by_stop), len(self.routes)
+        return np.bincount(
+            self._route_index(scenario_count), weights=by_stop.ravel(), minlength=scenario_count * route_count
+        ).reshape(scenario_count, route_count)
+
+    def _peak_load(self, net: np.ndarray) -> np.ndarray:
+        """
+        최대 재차 인원: 노선 안에서 순번 순 (승차 - 하차) 누적합의 최댓값
+
+        Args:
+            net (ndarray): (S × 정류장) 정류장별 승차 - 하차 인원
+
+        Returns:
+            ndarray: (S × 노선) 최대 재차 인원 (0 이상)
+        """
+        scenario_count, route_count = len(net), len(self.routes)
+        onboard = np.cumsum(net, axis=1)
+        before_route = np.concatenate([np.zeros((scenario_count, 1)), onboard], axis=1)[:, self._route_start]
+        peak = np.zeros(scenario_count * route_count)
+        if net.shape[1]:
+            np.maximum.at(peak, self._route_index(scenario_count), (onboard - before_route[:, self.stop_route]).ravel())
+        return peak.reshape(scenario_count, route_count)
+
+    def _scenario_inputs(self, scenarios: list):
+        """시나리오 정의를 (S × 노선) 입력 행렬로 변환"""
+        scenario_count, route_count = len(scenarios), len(self.routes)
+        unit_price = np.tile(self.unit_price, (scenario_count, 1))
+        target = np.tile(np.arange(route_count), (scenario_count, 1))
+        threshold = np.zeros(scenario_count)
+        retention = np.zeros(scenario_count)
+
+        for s, scenario in enumerate(scenarios):
+            for route, pct in (scenario.get("unit_price_pct") or {}).items():
+                columns = slice(None) if route == "*" else self.resolve_route(route)
+                unit_price[s, columns] *= 1 + float(pct) / 100
+            for route, price in (scenario.get("unit_price") or {}).items():
+                unit_price[s, self.resolve_route(route)] = float(price)
+            absorbed_mask = np.zeros(route_count, dtype=bool)
+            for group in scenario.get("merge") or []:
+                if not group:
+                    raise ValueError(f"Empty merge group in scenario: {scenario.get('name') or s + 1}")
+                keep, *absorbed = [self.resolve_route(route) for route in group]
+                target[s, absorbed] = keep
+                absorbed_mask[absorbed] = True
+            # 연쇄 통합 (A←B, B←C)은 최종 유지 노선으로 연결
+            for _ in range(route_count):
+                target[s] = target[s][target[s]]
+            unresolved = np.any(target[s][target[s]] != target[s])
+            self_absorbed = np.any(target[s][absorbed_mask] == np.flatnonzero(absorbed_mask))
+            if unresolved or self_absorbed:
+                raise ValueError(f"Circular merge in scenario: {scenario.get('name') or s + 1}")
+            threshold[s] = float(scenario.get("drop_stops_below") or 0)
+            retention[s] = min(max(float(scenario.get("dropped_rider_retention") or 0), 0.0), 1.0)
+
+        return unit_price, target, threshold, retention
+
+    def evaluate(self, scenarios: list) -> list:
+        """
+        What-if 시나리오 일괄 평가
+
+        시나리오 정의 (모든 키는 선택):
+        - name: 시나리오 이름
+        - unit_price: {노선: 운행단가} 절대값 변경
+        - unit_price_pct: {노선 | "*": 변경률(%)} 상대 변경 (unit_price보다 먼저 적용)
+        - merge: [[유지 노선, 흡수 노선, ...], ...] 흡수 노선의 승객은 유지 노선으로 이동하고 운행 비용은 사라짐
+        - drop_stops_below: 승차+하차 인원이 이 값보다 적은 정류장 폐지
+        - dropped_rider_retention: 폐지된 정류장 승객 중 다른 정류장으로 옮겨 계속 타는 비율 (0~1, 기본 0)
+
+        노선 통합 시 운행 비용은 유지 노선의 비용을 그대로 사용 (정류장 폐지로 인한 운행거리 변화는 반영하지 않음)
+        좌석 이용률/좌석 초과는 기준 지표(route_metrics)와 같이 최대 재차 인원 기준
+        - 폐지된 정류장의 승차/하차 인원은 같은 비율(dropped_rider_retention)만 남김
+        - 통합 노선의 최대 재차 인원은 통합된 노선들의 최대 재차 인원 합 (정류장 순서를 알 수 없어 보수적으로 추정)
+
+        Args:
+            scenarios (list[dict]): 시나리오 목록 (최대 MAX_SCENARIOS개)
+
+        Returns:
+            list[dict]: 시나리오별 합계, 기준 대비 변화량, 좌석 초과 노선, 노선별 지표
+
+        Raises:
+            ValueError: 시나리오 수 초과, 알 수 없는 노선, 빈/순환 노선 통합
+        """
+        if len(scenarios) > MAX_SCENARIOS:
+            raise ValueError(f"Too many scenarios: {len(scenarios)} > {MAX_SCENARIOS}")
+        if not scenarios:
+            return []
+
+        scenario_count, route_count = len(scenarios), len(self.routes)
+        unit_price, target, threshold, retention = self._scenario_inputs(scenarios)
+
+        # 정류장 폐지 (S × 정류장) → 노선별 승차 인원 / 최대 재차 인원 (S × 노선)
+        kept = self.stop_activity[None, :] >= threshold[:, None]
+        stop_factor = np.where(kept, 1.0, retention[:, None])
+        boarded = self.boarded[None, :] * stop_factor
+        alighted = self.alighted[None, :] * stop_factor
+        riders_by_route = self._route_sum(boarded)
+        peak_by_route = self._peak_load(boarded - alighted)
+
+        # 노선 통합: 흡수 노선의 승객을 유지 노선으로 합산
+        flat_target = (np.arange(scenario_count)[:, None] * route_count + target).ravel()
+        riders, peak_load = (
+            np.bincount(
+                flat_target, weights=by_route.ravel(), minlength=scenario_count * route_count
+            ).reshape(scenario_count, route_count)
+            for by_route in (riders_by_route, peak_by_route)
+        )
+
+        active = target == np.arange(route_count)[None, :]
+        cost = np.where(active, unit_price + self.allowance + self.night_allowance, 0.0)
+        total_cost = cost.sum(axis=1)
+        total_riders = riders.sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost_per_rider = total_cost / total_riders
+            route_cost_per_rider = cost / riders
+            route_cost_per_km = cost / self.distance_km[None, :]
+        utilization = peak_load / BUS_CAPACITY
+        overloaded = active & (peak_load > BUS_CAPACITY)
+        dropped_stops = (~kept).sum(axis=1)
+
+        baseline = self.totals()
+        results = []
+        for s, scenario in enumerate(scenarios):
+            results.append({
+                "name": scenario.get("name") or f"scenario_{s + 1}",
+                "total_cost": int(total_cost[s]),
+                "total_riders": _num(total_riders[s]),
+                "cost_per_rider": _num(cost_per_rider[s]),
+                "active_routes": int(active[s].sum()),
+                "dropped_stops": int(dropped_stops[s]),
+                "delta_cost": int(total_cost[s] - baseline["total_cost"]),
+                "delta_riders": _num(total_riders[s] - baseline["total_riders"]),
+                "delta_cost_per_rider": (
+                    _num(cost_per_rider[s] - baseline["cost_per_rider"])
+                    if baseline["cost_per_rider"] is not None else None
+                ),
+                "overloaded_routes": [self.routes[i] for i in np.flatnonzero(overloaded[s])],
+                "routes": [
+                    {
+                        "route": self.routes[i],
+                        "riders": _num(riders[s, i]),
+                        "peak_load": _num(peak_load[s, i]),
+                        "cost_per_run": int(cost[s, i]),
+                        "cost_per_rider": _num(route_cost_per_rider[s, i]),
+                        "cost_per_km": _num(route_cost_per_km[s, i]),
+                        "utilization": _num(utilization[s, i], 3),
+                    }
+                    for i in np.flatnonzero(active[s])
+                ],
+            })
+        return results
+
+    def to_prompt_text(self) -> str:
+        """분석 프롬프트에 넣을 노선별 지표 요약 (LLM이 직접 계산하지 않도록 정확한 값 제공)"""
+        lines = [
+            f"- {m['route']}: 승차 {m['riders']}명, 최대 재차 {m['peak_load']}명, "
+            f"1회 운행비 {m['cost_per_run']}원, 1인당 {m['cost_per_rider']}원, "
+            f"km당 {m['cost_per_km']}원, 좌석 이용률 {m['utilization']}"
+            for m in self.route_metrics()
+        ]
+        totals = self.totals()
+        lines.append(
+            f"- 전체: 총 운행비 {totals['total_cost']}원, 총 승차 {totals['total_riders']}명, "
+            f"1인당 {totals['cost_per_rider']}원 (좌석 {BUS_CAPACITY}석 기준)"
+        )
+        return "\n".join(lines)
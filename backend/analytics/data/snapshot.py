@@ -0,0 +1,387 @@
+"""
+Data Snapshot
+
+데이터 파일과 인덱스를 한 번만 로드하여 모든 요청이 공유하는 읽기 전용 스냅샷
+
+- 단일 프로세스: 데이터 버전이 바뀌면 새 스냅샷을 만들어 참조를 원자적으로 교체
+- 멀티 워커 (gunicorn preload_app): 마스터에서 기본 테넌트 스냅샷을 만든 뒤 fork하여
+  워커들이 copy-on-write로 같은 메모리를 공유 (gunicorn.conf.py 참고)
+- 멀티 테넌트: 테넌트별 스냅샷을 처음 요청될 때 로드하고, 추정 메모리 합계가 SNAPSHOT_CACHE_MAX_MB를
+  넘거나 테넌트 수가 SNAPSHOT_CACHE_MAX_TENANTS를 넘으면 가장 오래 사용되지 않은 테넌트부터 해제 (LRU)
+"""
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+import numpy as np
+from analytics.data.route_economics import RouteEconomics
+from analytics.data.ride_store import get_ride_store
+from analytics.data.sources import data_version, tenant_sources, use_ride_store
+from analytics.data.stats import StatsViews
+from config import DEFAULT_TENANT, RIDE_STORE_SNAPSHOT_DAYS, SNAPSHOT_CACHE_MAX_MB, SNAPSHOT_CACHE_MAX_TENANTS
+
+# 데이터 버전 확인 주기 (초)
+SNAPSHOT_CHECK_INTERVAL_SECONDS = 5.0
+
+
+class DataSnapshot:
+    """
+    특정 데이터 버전의 읽기 전용 스냅샷
+
+    Attributes:
+        version (str): 데이터 버전 (테넌트 간에도 겹치지 않음)
+        tenant (str): 테넌트 ID
+        approx_bytes (int): 스냅샷이 점유하는 추정 메모리 (LRU 메모리 예산 계산용)
+        graph (dict): LLM용으로 구조화된 그래프 데이터 (summary, nodes, edges)
+        nodes_by_id (Mapping): 노드 ID → 원본 노드 (data.route, data.stopName 등)
+        edges_by_id (Mapping): 엣지 ID → 원본 엣지
+        nodes_json (str): 프롬프트용 노드 JSON
+        edges_json (str): 프롬프트용 엣지 JSON
+        transport_records (tuple): 승하차 정보 레코드
+        commute_records (tuple): 통근 수당 레코드
+        commute_by_route (Mapping): 노선명 → 통근 수당 레코드
+        transport_json (str): 프롬프트용 승하차 정보 JSON
+        commute_json (str): 프롬프트용 통근 수당 JSON
+        economics (RouteEconomics): 노선별 비용/이용 지표 및 시나리오 엔진
+        stats (StatsViews): 노선/정류장/출발시간/비용 집계 뷰 (/api/stats, 분석 경로에서 재사용)
+        table_cache (OrderedDict): 테이블 조건 → 필터/정렬된 행 (tables 모듈이 관리, 스냅샷과 함께 해제)
+        table_cache_lock (Lock): table_cache 보호
+    """
+
+    __slots__ = (
+        "version", "tenant", "approx_bytes", "loaded_at", "graph", "nodes_by_id", "edges_by_id", "nodes_json", "edges_json",
+        "transport_records", "commute_records", "commute_by_route",
+        "transport_json", "commute_json", "economics", "stats", "table_cache", "table_cache_lock",
+    )
+
+    def __init__(self, version: str, raw_graph: dict, transport: list, commute: list, tenant: str = DEFAULT_TENANT):
+        self.version = version
+        self.tenant = tenant
+        self.loaded_at = time.time()
+        self.graph = _structure_graph(raw_graph)
+        self.nodes_by_id = MappingProxyType({node.get("id"): node for node in raw_graph.get("nodes", [])})
+        self.edges_by_id = MappingProxyType({edge.get("id"): edge for edge in raw_graph.get("edges", [])})
+        self.nodes_json = json.dumps(self.graph["nodes"], ensure_ascii=False, indent=2)
+        self.edges_json = json.dumps(self.graph["edges"], ensure_ascii=False, indent=2)
+
+        self.transport_records = tuple(transport)
+        self.commute_records = tuple(commute)
+        self.commute_by_route = MappingProxyType({record.get("노선명"): record for record in commute})
+
+        # 프롬프트에 넣을 JSON 문자열은 요청마다 만들지 않고 한 번만 직렬화
+        self.transport_json = json.dumps(transport, ensure_ascii=False)
+        self.commute_json = json.dumps(commute, ensure_ascii=False)
+
+        # 노선명 조인 및 지표 계산도 스냅샷마다 한 번만 수행
+        self.economics = RouteEconomics(transport, commute)
+        self.stats = StatsViews(version, self.transport_records, self.commute_by_route, self.economics)
+
+        # 요청에서 계산한 테이블 행 (TABLE_CACHE_MAX_ROWS로 제한, approx_bytes에는 포함하지 않음)
+        self.table_cache = OrderedDict()
+        self.table_cache_lock = threading.Lock()
+
+        self.approx_bytes = _approx_size(
+            (raw_graph, transport, commute, self.graph, self.nodes_json, self.edges_json,
+             self.transport_json, self.commute_json, self.stats.views, self.stats.encoded, self.economics)
+        )
+
+
+def _approx_size(obj, _seen=None) -> int:
+    """중첩 객체를 포함한 추정 메모리 크기 (바이트, 같은 객체는 한 번만 계산)"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # 다른 배열의 뷰는 getsizeof에 데이터 버퍼가 포함되지 않으므로 nbytes 기준
+        return max(sys.getsizeof(obj), obj.nbytes)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_size(key, _seen) + _approx_size(value, _seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_approx_size(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        # RouteEconomics 등 (numpy 배열 속성 포함)
+        size += _approx_size(vars(obj), _seen)
+    return size
+
+
+def _structure_graph(raw_data: dict) -> dict:
+    """ReactFlow 원본 데이터를 LLM이 이해하기 쉬운 형태로 구조화"""
+    # 노드 정보 추출 및 정리
+    nodes = []
+    for node in raw_data.get("nodes", []):
+        node_info = {
+            "id": node.get("id"),
+            "type": node.get("type"),
+            "label": node.get("data", {}).get("label", "")
+        }
+        # 추가 데이터가 있으면 포함
+        if "position" in node:
+            node_info["position"] = node["position"]
+        if "parentId" in node:
+            node_info["parentId"] = node["parentId"]
+        nodes.append(node_info)
+
+    # 엣지 정보 추출 및 정리
+    edges = []
+    for edge in raw_data.get("edges", []):
+        edges.append({
+            "id": edge.get("id"),
+            "source": edge.get("source"),
+            "target": edge.get("target"),
+            "label": edge.get("label", "")
+        })
+
+    # 그래프 요약 정보 생성
+    summary = {
+        "total_nodes": len(nodes),
+        "total_edges": len(edges),
+        "node_types": list(set(node.get("type") for node in nodes if node.get("type"))),
+        "description": "버스 노선과 정류장 정보를 담은 ReactFlow 그래프 데이터"
+    }
+
+    # 원본 노드/엣지는 nodes_by_id/edges_by_id로만 보관 (그래프를 두 번 들고 있지 않도록 raw_data는 저장하지 않음)
+    return {
+        "summary": summary,
+        "nodes": nodes,
+        "edges": edges
+    }
+
+
+def build_snapshot(tenant: str = None) -> DataSnapshot:
+    """
+    테넌트 데이터 파일을 읽어 새 스냅샷 생성
+
+    Args:
+        tenant (str): 테넌트 ID (None이면 DEFAULT_TENANT)
+
+    Returns:
+        DataSnapshot: 현재 데이터 버전의 스냅샷
+
+    Raises:
+        FileNotFoundError, json.JSONDecodeError: 데이터 파일 오류
+        ValueError, UnknownTenant: 잘못된 테넌트
+    """
+    sources = tenant_sources(tenant)
+    version = data_version(sources.tenant)
+
+    print(f"📂 Loading graph data from: {sources.graph_path}")
+    with open(sources.graph_path, 'r', encoding='utf-8') as f:
+        raw_graph = json.load(f)
+
+    if use_ride_store():
+        # 이력 전체가 아니라 최근 N일의 (노선, 정류장, 승/하차)별 합계만 로드하므로 이력이 쌓여도 크기가 일정
+        store = get_ride_store(sources.tenant)
+        print(f"📂 Loading transport data from ride store: {store.root} (최근 {RIDE_STORE_SNAPSHOT_DAYS}일)")
+        transport = store.recent_records(RIDE_STORE_SNAPSHOT_DAYS)
+    else:
+        print(f"📂 Loading transport data from: {sources.transport_path}")
+        with open(sources.transport_path, 'r', encoding='utf-8') as f:
+            transport = json.load(f)
+
+    print(f"📂 Loading commute data from: {sources.commute_path}")
+    with open(sources.commute_path, 'r', encoding='utf-8') as f:
+        commute = json.load(f)
+
+    snapshot = DataSnapshot(version, raw_graph, transport, commute, tenant=sources.tenant)
+    print(f"✅ 데이터 스냅샷 로드 완료 (tenant={sources.tenant}, version={version}): "
+          f"엣지 {len(snapshot.edges_by_id)}개, 승하차 {len(transport)}건, 통근 수당 {len(commute)}건, "
+          f"약 {snapshot.approx_bytes / 1024 / 1024:.1f}MB")
+    return snapshot
+
+
+class _TenantEntry:
+    """테넌트별 현재/직전 스냅샷"""
+
+    __slots__ = ("current", "previous", "checked_at", "last_used", "lock")
+
+    def __init__(self):
+        self.current = None
+        # 교체 직전 스냅샷 (교체 시점에 진행 중이던 요청이 같은 버전을 계속 보도록 보관)
+        self.previous = None
+        self.checked_at = 0.0
+        self.last_used = 0.0
+        self.lock = threading.Lock()
+
+    def approx_bytes(self) -> int:
+        return sum(snapshot.approx_bytes for snapshot in (self.current, self.previous) if snapshot is not None)
+
+
+# 테넌트 → 스냅샷 (가장 최근에 사용된 테넌트가 뒤쪽)
+_entries = OrderedDict()
+# 데이터 버전 → 스냅샷 (현재/직전 스냅샷, 요청이 처음 본 버전으로 바로 조회)
+_by_version = {}
+_cache_lock = threading.Lock()
+_auto_reload = True
+_metrics = {"hits": 0, "misses": 0, "loads": 0, "reloads": 0, "evictions": 0, "load_ms": 0.0}
+
+
+def _entry(tenant: str) -> _TenantEntry:
+    with _cache_lock:
+        entry = _entries.get(tenant)
+        if entry is None:
+            entry = _entries[tenant] = _TenantEntry()
+        return entry
+
+
+def _touch(snapshot: DataSnapshot) -> DataSnapshot:
+    entry = _entries.get(snapshot.tenant)
+    if entry is not None:
+        entry.last_used = time.time()
+        with _cache_lock:
+            if snapshot.tenant in _entries:
+                _entries.move_to_end(snapshot.tenant)
+    return snapshot
+
+
+def get_snapshot(version: str = None, tenant: str = None) -> DataSnapshot:
+    """
+    테넌트의 현재 데이터 스냅샷 반환
+
+    SNAPSHOT_CHECK_INTERVAL_SECONDS마다 데이터 버전을 확인하여
+    바뀌었으면 새 스냅샷으로 교체 (자동 리로드가 꺼진 워커에서는 기본 테넌트를 교체하지 않음)
+
+    Args:
+        version (str): 요청이 처음 본 데이터 버전 (state["data_version"])
+            메모리에 있는 현재/직전 스냅샷과 일치하면 그 스냅샷을 반환하여 요청 도중 데이터가 바뀌지 않게 함
+        tenant (str): 테넌트 ID (None이면 DEFAULT_TENANT, 스냅샷이 메모리에 없으면 로드)
+
+    Returns:
+        DataSnapshot: 공유 스냅샷 (읽기 전용으로 사용할 것)
+
+    Raises:
+        ValueError, UnknownTenant: 잘못된 테넌트
+    """
+    if version is not None:
+        snapshot = _by_version.get(version)
+        if snapshot is not None:
+            _metrics["hits"] += 1
+            return _touch(snapshot)
+
+    tenant = tenant or DEFAULT_TENANT
+    entry = _entries.get(tenant)
+    snapshot = entry.current if entry is not None else None
+    if snapshot is None:
+        _metrics["misses"] += 1
+        return reload_snapshot(tenant=tenant)
+    _metrics["hits"] += 1
+    _touch(snapshot)
+
+    # 기본 테넌트는 gunicorn 마스터가 교체 (set_auto_reload), 요청 중 로드된 테넌트는 워커가 직접 교체
+    now = time.time()
+    if (_auto_reload or tenant != DEFAULT_TENANT) and now - entry.checked_at >= SNAPSHOT_CHECK_INTERVAL_SECONDS:
+        entry.checked_at = now
+        if data_version(tenant) != snapshot.version:
+            return reload_snapshot(tenant=tenant)
+
+    return snapshot
+
+
+def reload_snapshot(force: bool = False, tenant: str = None) -> DataSnapshot:
+    """
+    데이터 버전이 바뀌었으면 새 스냅샷을 만들어 원자적으로 교체
+
+    새 스냅샷은 테넌트 락 안에서 한 번만 만들어지고, 완성된 뒤에 참조만 바꾸므로
+    진행 중인 요청은 기존 스냅샷을 그대로 사용 (다른 테넌트의 로드는 막지 않음)
+
+    Args:
+        force (bool): 버전이 같아도 다시 로드
+        tenant (str): 테넌트 ID (None이면 DEFAULT_TENANT)
+
+    Returns:
+        DataSnapshot: 현재 스냅샷
+    """
+    tenant = tenant_sources(tenant).tenant
+    entry = _entry(tenant)
+
+    with entry.lock:
+        current = entry.current
+        if current is not None and not force and current.version == data_version(tenant):
+            return _touch(current)
+
+        started = time.perf_counter()
+        snapshot = build_snapshot(tenant)
+        _metrics["reloads" if current is not None else "loads"] += 1
+        _metrics["load_ms"] += (time.perf_counter() - started) * 1000
+
+        with _cache_lock:
+            if entry.previous is not None and entry.previous.version not in (snapshot.version, getattr(current, "version", None)):
+                _by_version.pop(entry.previous.version, None)
+            entry.previous = current
+            entry.current = snapshot
+            _by_version[snapshot.version] = snapshot
+            _entries[tenant] = entry
+            _entries.move_to_end(tenant)
+        entry.checked_at = time.time()
+        entry.last_used = entry.checked_at
+
+    _evict(keep=tenant)
+    return snapshot
+
+
+def _evict(keep: str):
+    """메모리 예산 / 테넌트 수를 넘으면 가장 오래 사용되지 않은 테넌트부터 해제 (기본 테넌트와 keep은 유지)"""
+    budget = SNAPSHOT_CACHE_MAX_MB * 1024 * 1024
+    with _cache_lock:
+        used = sum(entry.approx_bytes() for entry in _entries.values())
+        for tenant in list(_entries):
+            if used <= budget and len(_entries) <= SNAPSHOT_CACHE_MAX_TENANTS:
+                break
+            if tenant in (keep, DEFAULT_TENANT):
+                continue
+            entry = _entries.pop(tenant)
+            for snapshot in (entry.current, entry.previous):
+                if snapshot is not None and _by_version.get(snapshot.version) is snapshot:
+                    del _by_version[snapshot.version]
+            used -= entry.approx_bytes()
+            _metrics["evictions"] += 1
+            print(f"🧹 스냅샷 해제 (tenant={tenant}, 약 {entry.approx_bytes() / 1024 / 1024:.1f}MB), "
+                  f"사용 중 {used / 1024 / 1024:.1f}MB / {SNAPSHOT_CACHE_MAX_MB:g}MB")
+
+
+def snapshot_cache_stats() -> dict:
+    """
+    스냅샷 LRU 상태와 로드/해제 지표
+
+    Returns:
+        dict: {"budget_mb", "max_tenants", "used_mb", "hits", "misses", "loads", "reloads", "evictions",
+               "load_ms", "tenants": [{"tenant", "version", "approx_mb", "loaded_at", "last_used"}, ...]}
+    """
+    with _cache_lock:
+        entries = list(_entries.items())
+    tenants = [
+        {
+            "tenant": tenant,
+            "version": entry.current.version if entry.current is not None else None,
+            "approx_mb": round(entry.approx_bytes() / 1024 / 1024, 2),
+            "loaded_at": entry.current.loaded_at if entry.current is not None else None,
+            "last_used": entry.last_used,
+        }
+        for tenant, entry in reversed(entries)
+    ]
+    return {
+        "budget_mb": SNAPSHOT_CACHE_MAX_MB,
+        "max_tenants": SNAPSHOT_CACHE_MAX_TENANTS,
+        "used_mb": round(sum(tenant["approx_mb"] for tenant in tenants), 2),
+        **_metrics,
+        "load_ms": round(_metrics["load_ms"], 1),
+        "tenants": tenants,
+    }
+
+
+def set_auto_reload(enabled: bool):
+    """
+    요청 중 기본 테넌트 자동 리로드 여부 설정
+
+    gunicorn 워커에서는 False로 두고 마스터가 새 스냅샷을 만든 뒤
+    워커를 교체하도록 하여 워커마다 복사본이 생기지 않게 함
+    (요청 중에 로드된 다른 테넌트 스냅샷은 워커가 직접 교체)
+    """
+    global _auto_reload
+    _auto_reload = enabled
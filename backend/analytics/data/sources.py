@@ -0,0 +1,109 @@
+"""
+Data Sources
+
+분석에 사용하는 데이터 파일 경로와 데이터 버전
+
+- 기본 테넌트(DEFAULT_TENANT): data/, frontend/public/ 아래 파일
+- 그 외 테넌트: TENANTS_DIR/<tenant_id>/ 아래 같은 이름의 파일 (승하차 저장소는 <tenant_id>/rides)
+"""
+import hashlib
+import os
+import re
+from typing import NamedTuple
+from config import DEFAULT_TENANT, RIDE_STORE_DIR, RIDE_STORE_SNAPSHOT_DAYS, TENANTS_DIR
+
+# 프로젝트 루트 (backend/analytics/data 기준 세 단계 위)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# ReactFlow 그래프 (Find/Highlight Path)
+GRAPH_PATH = os.path.join(PROJECT_ROOT, "frontend", "public", "reactflow_graph.json")
+
+# 승하차 정보 / 통근 수당 (Analysis Path)
+# RIDE_STORE_SNAPSHOT_DAYS > 0이면 승하차 정보는 승하차 저장소(ride_store)의 최근 N일 집계를 사용
+TRANSPORT_PATH = os.path.join(PROJECT_ROOT, "data", "승하차정보.json")
+COMMUTE_PATH = os.path.join(PROJECT_ROOT, "data", "통근수당.json")
+
+DATA_PATHS = (GRAPH_PATH, TRANSPORT_PATH, COMMUTE_PATH)
+
+# 테넌트 ID 형식 (디렉터리 이름으로 쓰이므로 경로 문자 금지)
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+class UnknownTenant(LookupError):
+    """데이터 디렉터리가 없는 테넌트 (404)"""
+
+
+class TenantSources(NamedTuple):
+    """테넌트의 데이터 파일 경로"""
+    tenant: str
+    graph_path: str
+    transport_path: str
+    commute_path: str
+    ride_store_dir: str
+
+
+def tenant_sources(tenant: str = None) -> TenantSources:
+    """
+    테넌트 → 데이터 파일 경로
+
+    Args:
+        tenant (str): 테넌트 ID (None이면 DEFAULT_TENANT)
+
+    Returns:
+        TenantSources: 데이터 파일 경로
+
+    Raises:
+        ValueError: 잘못된 테넌트 ID 형식
+        UnknownTenant: TENANTS_DIR 아래에 테넌트 디렉터리가 없음
+    """
+    tenant = tenant or DEFAULT_TENANT
+    if tenant == DEFAULT_TENANT:
+        return TenantSources(tenant, GRAPH_PATH, TRANSPORT_PATH, COMMUTE_PATH, RIDE_STORE_DIR)
+
+    if not _TENANT_ID.match(tenant):
+        raise ValueError(f"Invalid tenant id: {tenant!r}")
+    root = os.path.join(TENANTS_DIR, tenant) if TENANTS_DIR else None
+    if root is None or not os.path.isdir(root):
+        raise UnknownTenant(f"Unknown tenant: {tenant}")
+    return TenantSources(
+        tenant,
+        os.path.join(root, "reactflow_graph.json"),
+        os.path.join(root, "승하차정보.json"),
+        os.path.join(root, "통근수당.json"),
+        os.path.join(root, "rides"),
+    )
+
+
+def use_ride_store() -> bool:
+    """스냅샷의 승하차 정보를 승하차 저장소에서 가져오는지 여부"""
+    return RIDE_STORE_SNAPSHOT_DAYS > 0
+
+
+def data_version(tenant: str = None) -> str:
+    """
+    테넌트 데이터 파일들의 버전 (경로, 수정 시각, 크기 기반 해시)
+
+    파일 내용을 읽지 않고 stat만 사용하므로 요청마다 호출해도 저렴함
+    (승하차 저장소를 사용하면 승하차정보.json 대신 저장소 manifest의 stat을 사용)
+    경로가 해시에 포함되므로 버전은 테넌트 간에도 겹치지 않음
+
+    Args:
+        tenant (str): 테넌트 ID (None이면 DEFAULT_TENANT)
+
+    Returns:
+        str: 12자리 버전 문자열 (파일이 바뀌면 달라짐)
+    """
+    from analytics.data.ride_store import get_ride_store
+
+    sources = tenant_sources(tenant)
+    digest = hashlib.sha1()
+    for path in (sources.graph_path, sources.transport_path, sources.commute_path):
+        if path == sources.transport_path and use_ride_store():
+            digest.update(f"ride_store:{sources.ride_store_dir}:{get_ride_store(sources.tenant).version()};".encode("utf-8"))
+            continue
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode("utf-8"))
+        except FileNotFoundError:
+            digest.update(f"{path}:missing;".encode("utf-8"))
+    return digest.hexdigest()[:12]
@@ -0,0 +1,294 @@
+"""
+SQL Store
+
+분석 경로(query_data 노드)에서 LLM이 만든 SQL을 실행하는 읽기 전용 SQLite 저장소
+
+- 데이터 버전마다 SQL_STORE_DIR/<테넌트>.<버전>.sqlite3 파일을 한 번만 만들고 (워커 간 공유) 인덱스 생성
+- 승하차 저장소(RIDE_STORE_SNAPSHOT_DAYS > 0)를 사용하면 rides 테이블에 전체 기간의 운행일별 집계를 적재
+- 실행은 읽기 전용 연결(mode=ro + query_only) + authorizer(SELECT / 허용 테이블 읽기만 허용)로 제한하고
+  제한 시간(SQL_TIMEOUT_SECONDS)과 최대 행 수(SQL_MAX_ROWS)를 적용
+"""
+import glob
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from analytics.data.ride_store import get_ride_store
+from analytics.data.sources import use_ride_store
+from analytics.data.stats import normalize_time
+from config import SNAPSHOT_CACHE_MAX_TENANTS, SQL_MAX_ROWS, SQL_STORE_DIR, SQL_TIMEOUT_SECONDS
+
+_SCHEMA = """
+CREATE TABLE rides (
+    ride_date TEXT,
+    route TEXT NOT NULL,
+    category TEXT,
+    depart_time TEXT,
+    vehicle TEXT,
+    seq INTEGER,
+    stop TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    riders INTEGER NOT NULL
+);
+CREATE TABLE allowances (
+    route TEXT PRIMARY KEY,
+    category TEXT,
+    depart_time TEXT,
+    distance_km REAL,
+    unit_price INTEGER,
+    allowance INTEGER,
+    night_allowance INTEGER
+);
+"""
+
+_INDEXES = """
+CREATE INDEX idx_rides_route_seq ON rides (route, seq);
+CREATE INDEX idx_rides_stop ON rides (stop);
+CREATE INDEX idx_rides_depart_time ON rides (depart_time);
+CREATE INDEX idx_rides_date_route ON rides (ride_date, route);
+ANALYZE;
+"""
+
+# 프롬프트에 넣을 스키마 설명
+SCHEMA_DESCRIPTION = """
+rides: 승하차 기록 (정류장별 승차/하차 인원)
+- ride_date TEXT: 운행일 'YYYY-MM-DD' (운행일 없는 스냅샷 데이터면 NULL)
+- route TEXT: 노선명 (예: '출근1호-한국대서문')
+- category TEXT: 구분 (예: '업스테이지 출근', '업스테이지 퇴근')
+- depart_time TEXT: 출발시간 'HH:MM'
+- vehicle TEXT: 차량번호
+- seq INTEGER: 정류장 순번 (노선 내 1부터)
+- stop TEXT: 정류장명
+- direction TEXT: '승차' | '하차'
+- riders INTEGER: 인원
+
+allowances: 노선별 통근 수당 / 운행 비용 (rides.route = allowances.route)
+- route TEXT: 노선명
+- category TEXT: 구분
+- depart_time TEXT: 출발시간 'HH:MM'
+- distance_km REAL: 운행거리 (km)
+- unit_price INTEGER: 1회 운행단가 (원)
+- allowance INTEGER: 지급수당 (원)
+- night_allowance INTEGER: 야간수당 (원)
+"""
+
+ALLOWED_TABLES = frozenset({"rides", "allowances"})
+
+# authorizer가 허용하는 동작 (SELECT, 컬럼 읽기, 함수 호출, 재귀 CTE)
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+}
+_DENIED_FUNCTIONS = frozenset({"load_extension", "readfile", "writefile"})
+
+_STATEMENT_START = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+# 컬럼을 읽지 않는 참조(count(*) 등)는 authorizer의 READ 검사를 거치지 않으므로 시스템 테이블 이름은 미리 거부
+_SYSTEM_NAMES = re.compile(r"\b(sqlite_\w*|pragma_\w*)", re.IGNORECASE)
+_FENCE = re.compile(r"^```(?:sql)?\s*|\s*```$", re.IGNORECASE)
+
+
+def _distance_km(value):
+    """운행거리 표기 ("10KM", "12.5 km") → 숫자"""
+    match = re.search(r"[\d.]+", str(value or ""))
+    return float(match.group()) if match else None
+
+
+def validate_sql(sql: str) -> str:
+    """
+    LLM이 만든 SQL 검증 (단일 SELECT / WITH 문만 허용)
+
+    실제 권한 제한은 실행 시 authorizer와 읽기 전용 연결이 담당하고,
+    여기서는 명백히 잘못된 출력을 일찍 걸러 상위 티어로 승격시키는 용도
+
+    Raises:
+        ValueError: 빈 쿼리, 여러 문장, SELECT/WITH가 아닌 문장, 시스템 테이블 참조
+    """
+    sql = _FENCE.sub("", (sql or "").strip()).strip().rstrip(";").strip()
+    if not sql:
+        raise ValueError("Empty SQL")
+    if ";" in sql:
+        raise ValueError("Only a single SQL statement is allowed")
+    if not _STATEMENT_START.match(sql):
+        raise ValueError("Only SELECT / WITH queries are allowed")
+    if _SYSTEM_NAMES.search(sql):
+        raise ValueError(f"System tables are not allowed (tables: {', '.join(sorted(ALLOWED_TABLES))})")
+    if not sqlite3.complete_statement(sql + ";"):
+        raise ValueError("Incomplete SQL statement")
+    return sql
+
+
+def _authorize(action, arg1, arg2, db_name, trigger):
+    if action not in _ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_DENY
+    # db_name이 없는 읽기는 CTE / 서브쿼리 결과 (실제 테이블은 허용 목록만)
+    if action == sqlite3.SQLITE_READ and db_name is not None and arg1 not in ALLOWED_TABLES:
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_FUNCTION and (arg2 or "").lower() in _DENIED_FUNCTIONS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+class SqlStore:
+    """
+    특정 데이터 버전의 SQLite 저장소 (읽기 전용, 스레드별 연결)
+
+    Attributes:
+        version (str): 데이터 버전
+        path (str): SQLite 파일 경로
+    """
+
+    def __init__(self, version: str, path: str):
+        self.version = version
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            connection.execute("PRAGMA query_only = ON")
+            connection.set_authorizer(_authorize)
+            self._local.connection = connection
+        return connection
+
+    def execute(self, sql: str, max_rows: int = SQL_MAX_ROWS, timeout: float = SQL_TIMEOUT_SECONDS) -> dict:
+        """
+        읽기 전용 쿼리 실행
+
+        Args:
+            sql (str): SELECT / WITH 쿼리
+            max_rows (int): 최대 행 수 (초과분은 잘림)
+            timeout (float): 제한 시간 (초)
+
+        Returns:
+            dict: {"sql", "columns", "rows", "row_count", "truncated"}
+
+        Raises:
+            ValueError: 검증 실패, 권한 없는 동작, 문법 오류, 제한 시간 초과
+        """
+        sql = validate_sql(sql)
+        connection = self._connection()
+        deadline = time.monotonic() + timeout
+        connection.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, 10000)
+        try:
+            cursor = connection.execute(sql)
+            rows = cursor.fetchmany(max_rows + 1)
+            columns = [column[0] for column in cursor.description or ()]
+            cursor.close()
+        except sqlite3.DatabaseError as e:
+            if time.monotonic() > deadline:
+                raise ValueError(f"SQL timed out after {timeout}s")
+            raise ValueError(f"SQL error: {str(e)}")
+        finally:
+            connection.set_progress_handler(None, 0)
+
+        truncated = len(rows) > max_rows
+        rows = [list(row) for row in rows[:max_rows]]
+        return {"sql": sql, "columns": columns, "rows": rows, "row_count": len(rows), "truncated": truncated}
+
+
+def _ride_rows(snapshot):
+    if use_ride_store():
+        # 스냅샷에는 최근 N일 합계만 있으므로 SQL 저장소에는 전체 기간의 운행일별 집계를 적재
+        for day, route, category, depart, vehicle, seq, stop, direction, riders in (
+            get_ride_store(snapshot.tenant).iter_daily_aggregates()
+        ):
+            yield (day, route, category, normalize_time(depart), vehicle, seq, stop, direction, riders)
+        return
+    for record in snapshot.transport_records:
+        yield (
+            record.get("운행일"), record.get("노선명"), record.get("구분"), normalize_time(record.get("출발시간")),
+            record.get("차량번호"), record.get("순번"), record.get("정류장명"), record.get("승/하차"),
+            record.get("인원", 0) or 0,
+        )
+
+
+def _build(path: str, snapshot):
+    """스냅샷 → SQLite 파일 (임시 파일에 만든 뒤 교체하여 다른 워커가 만들다 만 파일을 열지 않게 함)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(_SCHEMA)
+        connection.executemany("INSERT INTO rides VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", _ride_rows(snapshot))
+        connection.executemany("INSERT OR REPLACE INTO allowances VALUES (?, ?, ?, ?, ?, ?, ?)", (
+            (
+                record.get("노선명"), record.get("구분"), normalize_time(record.get("출발시간")),
+                _distance_km(record.get("운행거리")), record.get("운행단가"), record.get("지급수당"),
+                record.get("야간수당"),
+            )
+            for record in snapshot.commute_records
+        ))
+        connection.executescript(_INDEXES)
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+
+# 테넌트 → {데이터 버전: 저장소} (테넌트마다 현재/직전 버전만 유지, 테넌트 수는 스냅샷 LRU와 같은 상한)
+_stores = OrderedDict()
+_build_lock = threading.Lock()
+
+
+def get_sql_store(snapshot) -> SqlStore:
+    """
+    스냅샷 버전의 SQL 저장소 (없으면 생성, 다른 워커가 이미 만든 파일은 재사용)
+
+    테넌트마다 현재/직전 버전만 유지하고 같은 테넌트의 나머지 버전 파일은 삭제
+
+    Args:
+        snapshot (DataSnapshot): 데이터 스냅샷
+
+    Returns:
+        SqlStore: 읽기 전용 저장소
+    """
+    versions = _stores.get(snapshot.tenant) or {}
+    store = versions.get(snapshot.version)
+    if store is not None:
+        return store
+
+    with _build_lock:
+        versions = _stores.setdefault(snapshot.tenant, {})
+        _stores.move_to_end(snapshot.tenant)
+        store = versions.get(snapshot.version)
+        if store is not None:
+            return store
+
+        # 오래 사용되지 않은 테넌트의 저장소(스레드별 연결)는 해제 (파일은 남겨 두고 다음 요청에서 재사용)
+        while len(_stores) > SNAPSHOT_CACHE_MAX_TENANTS:
+            _stores.popitem(last=False)
+
+        os.makedirs(SQL_STORE_DIR, exist_ok=True)
+        path = os.path.join(SQL_STORE_DIR, f"{snapshot.tenant}.{snapshot.version}.sqlite3")
+        if not os.path.exists(path):
+            started = time.perf_counter()
+            _build(path, snapshot)
+            print(f"🗄️  SQL 저장소 생성 (tenant={snapshot.tenant}, version={snapshot.version}): "
+                  f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+        store = SqlStore(snapshot.version, path)
+        for version in list(versions)[:-1]:
+            del versions[version]
+        versions[snapshot.version] = store
+
+        keep = {os.path.join(SQL_STORE_DIR, f"{snapshot.tenant}.{version}.sqlite3") for version in versions}
+        for stale in glob.glob(os.path.join(SQL_STORE_DIR, f"{glob.escape(snapshot.tenant)}.*.sqlite3")):
+            if stale not in keep:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        return store
+
+
+def format_result(result: dict) -> str:
+    """프롬프트용 쿼리 결과 텍스트 ("컬럼 | 컬럼" 행)"""
+    lines = [f"SQL: {result['sql']}", " | ".join(result["columns"])]
+    lines.extend(" | ".join("" if value is None else str(value) for value in row) for row in result["rows"])
+    if result["truncated"]:
+        lines.append(f"(상위 {result['row_count']}행까지만 표시)")
+    return "\n".join(lines)
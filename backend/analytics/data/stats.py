@@ -0,0 +1,221 @@
+"""
+Materialized Statistics
+
+데이터 스냅샷마다 한 번만 계산하는 표준 집계 뷰
+
+- overview: 전체 합계 (노선/정류장 수, 승차/하차 인원, 총 운행비, 최다 노선/정류장/출발시간)
+- routes: 노선별 승차/하차 인원과 운행비
+- stops: 정류장별 승차/하차 인원
+- departures: 출발시간별 승차/하차 인원
+- costs: 통근수당.json의 노선별 비용 항목
+
+/api/stats/* 엔드포인트는 직렬화된 JSON을 그대로 내려주고 (LangGraph를 거치지 않음),
+분석 경로는 표준 통계 질문에 이 뷰로 차트 데이터를 만들고 LLM에는 인사이트만 요청
+"""
+import json
+import re
+from collections import OrderedDict
+from typing import Optional
+
+STATS_VIEWS = ("overview", "routes", "stops", "departures", "costs")
+
+# 질문 → 통계 뷰 (앞에서부터 먼저 일치하는 뷰)
+_QUESTION_VIEWS = (
+    ("stops", ("정류장",)),
+    ("departures", ("시간대", "시간별", "출발시간", "출발 시간", "시각별")),
+    ("costs", ("비용", "단가", "수당")),
+    ("routes", ("노선별", "전체 노선", "노선 통계", "통계", "현황", "승차 인원", "이용 인원")),
+)
+
+# 뷰 일부만 묻는 질문의 필터 표현 (방향 / 시각) - 뷰 전체를 재사용하면 필터가 무시되므로 SQL/LLM 경로로 보냄
+_FILTER_KEYWORDS = ("출근", "퇴근", "오전", "오후", "아침", "저녁", "야간")
+_TIME_PATTERN = re.compile(r"\d{1,2}\s*(:\s*\d{2}|시)")
+
+_DATASET_STYLES = (
+    ("rgba(59, 130, 246, 0.6)", "rgb(59, 130, 246)"),
+    ("rgba(239, 68, 68, 0.6)", "rgb(239, 68, 68)"),
+    ("rgba(34, 197, 94, 0.6)", "rgb(34, 197, 94)"),
+)
+
+# 뷰별 차트 구성: (라벨 함수, [(dataset 라벨, 값 키), ...])
+_CHARTS = {
+    "routes": (lambda row: row["노선명"], (("승차 인원", "승차"), ("하차 인원", "하차"))),
+    "stops": (lambda row: f"{row['노선명']} {row['순번']}. {row['정류장명']}", (("승차 인원", "승차"), ("하차 인원", "하차"))),
+    "departures": (lambda row: row["출발시간"], (("승차 인원", "승차"), ("하차 인원", "하차"))),
+    "costs": (lambda row: row["노선명"], (("운행단가", "운행단가"), ("지급수당", "지급수당"), ("야간수당", "야간수당"))),
+}
+
+
+def normalize_time(value) -> str:
+    """출발시간 표기 통일 ("7:00", "07:00:00" → "07:00")"""
+    parts = str(value or "").split(":")
+    if len(parts) < 2 or not parts[0].strip().isdigit():
+        return str(value or "")
+    return f"{int(parts[0]):02d}:{parts[1][:2]}"
+
+
+def _has_filter(question: str, snapshot=None) -> bool:
+    """질문이 특정 노선/정류장/방향/시각으로 범위를 좁히는지 여부"""
+    if any(keyword in question for keyword in _FILTER_KEYWORDS) or _TIME_PATTERN.search(question):
+        return True
+    if snapshot is None:
+        return False
+    economics = snapshot.economics
+    names = set(economics.index) | set(economics.stop_names)
+    return any(name and len(str(name)) >= 2 and str(name) in question for name in names)
+
+
+def match_stats_view(question: str, snapshot=None) -> Optional[str]:
+    """
+    표준 통계 질문이면 대응하는 뷰 이름
+
+    노선/정류장 이름(snapshot이 있을 때), 출근/퇴근, 시각으로 범위를 좁힌 질문은
+    뷰 전체와 답이 다르므로 None (query_data의 SQL 조회 또는 LLM 분석으로 처리)
+
+    Args:
+        question (str): 사용자 질문
+        snapshot (DataSnapshot): 노선/정류장 이름 확인용 스냅샷 (None이면 방향/시각 표현만 확인)
+
+    Returns:
+        str: 뷰 이름 (표준 통계 질문이 아니면 None)
+    """
+    if _has_filter(question, snapshot):
+        return None
+    for view, keywords in _QUESTION_VIEWS:
+        if any(keyword in question for keyword in keywords):
+            return view
+    return None
+
+
+class StatsViews:
+    """
+    스냅샷 하나의 집계 뷰 (읽기 전용)
+
+    Attributes:
+        version (str): 데이터 버전
+        views (dict): 뷰 이름 → 행 목록 (overview는 dict)
+        encoded (dict): 뷰 이름 → 직렬화된 응답 본문 (bytes)
+    """
+
+    def __init__(self, version: str, transport_records: tuple, commute_by_route, economics):
+        self.version = version
+
+        stops = OrderedDict()
+        routes = OrderedDict()
+        departures = {}
+        for record in transport_records:
+            route = record.get("노선명")
+            count = record.get("인원", 0) or 0
+            column = "승차" if record.get("승/하차") == "승차" else "하차"
+
+            stop = stops.setdefault(
+                (route, record.get("순번"), record.get("정류장명")),
+                {"노선명": route, "순번": record.get("순번"), "정류장명": record.get("정류장명"), "승차": 0, "하차": 0},
+            )
+            stop[column] += count
+
+            route_row = routes.setdefault(route, {
+                "노선명": route,
+                "구분": record.get("구분"),
+                "출발시간": normalize_time(record.get("출발시간")),
+                "정류장수": 0,
+                "승차": 0,
+                "하차": 0,
+            })
+            route_row[column] += count
+
+            depart = normalize_time(record.get("출발시간"))
+            departure = departures.setdefault(depart, {"출발시간": depart, "노선": set(), "승차": 0, "하차": 0})
+            departure["노선"].add(route)
+            departure[column] += count
+
+        for route, _, _ in stops:
+            routes[route]["정류장수"] += 1
+
+        metrics = {row["route"]: row for row in economics.route_metrics()}
+        for route, row in routes.items():
+            route_metrics = metrics.get(route) or {}
+            row["1회운행비"] = route_metrics.get("cost_per_run")
+            row["1인당비용"] = route_metrics.get("cost_per_rider")
+
+        costs = []
+        for route, record in commute_by_route.items():
+            route_metrics = metrics.get(route) or {}
+            costs.append({
+                "노선명": route,
+                "구분": record.get("구분"),
+                "출발시간": normalize_time(record.get("출발시간")),
+                "운행거리": record.get("운행거리"),
+                "운행단가": record.get("운행단가", 0),
+                "지급수당": record.get("지급수당", 0),
+                "야간수당": record.get("야간수당", 0),
+                "1회운행비": route_metrics.get("cost_per_run"),
+                "km당비용": route_metrics.get("cost_per_km"),
+            })
+
+        departure_rows = [
+            {"출발시간": row["출발시간"], "노선수": len(row["노선"]), "승차": row["승차"], "하차": row["하차"]}
+            for _, row in sorted(departures.items())
+        ]
+        route_rows = list(routes.values())
+        stop_rows = list(stops.values())
+
+        totals = economics.totals()
+        self.views = {
+            "overview": {
+                "routes": len(route_rows),
+                "stops": len(stop_rows),
+                "records": len(transport_records),
+                "boarded": sum(row["승차"] for row in route_rows),
+                "alighted": sum(row["하차"] for row in route_rows),
+                "total_cost": totals["total_cost"],
+                "cost_per_rider": totals["cost_per_rider"],
+                "busiest_route": max(route_rows, key=lambda row: row["승차"])["노선명"] if route_rows else None,
+                "busiest_stop": max(stop_rows, key=lambda row: row["승차"])["정류장명"] if stop_rows else None,
+                "busiest_departure": max(departure_rows, key=lambda row: row["승차"])["출발시간"] if departure_rows else None,
+            },
+            "routes": route_rows,
+            "stops": stop_rows,
+            "departures": departure_rows,
+            "costs": costs,
+        }
+        self.encoded = {
+            view: json.dumps({"view": view, "version": version, "data": data},
+                             ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            for view, data in self.views.items()
+        }
+
+    def chart(self, view: str, chart_type: str) -> Optional[dict]:
+        """
+        뷰 → Chart.js 차트 데이터 (bar_chart / line_chart, overview는 routes 차트)
+
+        Returns:
+            dict: {"labels", "datasets"} (차트로 그릴 수 없는 타입이면 None)
+        """
+        if chart_type not in ("bar_chart", "line_chart"):
+            return None
+        view = "routes" if view == "overview" else view
+        label_of, series = _CHARTS[view]
+        rows = self.views[view]
+
+        datasets = []
+        for (label, key), (background, border) in zip(series, _DATASET_STYLES):
+            dataset = {"label": label, "data": [row[key] for row in rows], "borderColor": border}
+            if chart_type == "bar_chart":
+                dataset.update({"backgroundColor": background, "borderWidth": 1})
+            else:
+                dataset["tension"] = 0.1
+            datasets.append(dataset)
+        return {"labels": [label_of(row) for row in rows], "datasets": datasets}
+
+    def to_prompt_text(self, view: str) -> str:
+        """프롬프트용 뷰 텍스트 (overview + 해당 뷰를 "컬럼 | 컬럼" 행으로)"""
+        overview = ", ".join(f"{key}={value}" for key, value in self.views["overview"].items())
+        lines = [f"[전체 요약] {overview}"]
+        if view != "overview":
+            rows = self.views[view]
+            if rows:
+                columns = list(rows[0].keys())
+                lines.append(f"[{view}] " + " | ".join(columns))
+                lines.extend(" | ".join(str(row[column]) for column in columns) for row in rows)
+        return "\n".join(lines)
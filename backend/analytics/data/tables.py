@@ -0,0 +1,270 @@
+"""
+Table Handles
+
+table 차트 응답을 LLM이 모든 행을 쓰지 않고 로컬 데이터로 계산하기 위한 테이블 핸들
+
+- 테이블 ID는 조회 조건(소스, 노선 필터, 정렬)과 데이터 버전, 테넌트를 담은 불투명 문자열
+  → 서버에 상태를 저장하지 않으므로 어느 워커에서든 같은 결과를 페이지 단위로 제공
+- 행은 공유 스냅샷에서 계산하고, 같은 조건의 정렬 결과는 스냅샷에 붙은 LRU로 재사용
+  (행 수 합계 TABLE_CACHE_MAX_ROWS로 제한, 스냅샷이 해제되면 함께 해제되어 이전 버전의 행을 붙잡지 않음)
+- CSV export는 청크 단위로 스트리밍 (전체 CSV를 메모리에 만들지 않음)
+"""
+import base64
+import csv
+import io
+import json
+from typing import NamedTuple, Optional
+from analytics.data.snapshot import get_snapshot
+from config import DEFAULT_TENANT, TABLE_CACHE_MAX_ROWS, TABLE_MAX_PAGE_SIZE, TABLE_PAGE_SIZE
+
+# CSV 스트리밍 청크당 행 수
+CSV_CHUNK_ROWS = 500
+
+
+class TableExpired(Exception):
+    """테이블을 만든 데이터 버전이 더 이상 제공되지 않음 (410)"""
+
+
+class TableSpec(NamedTuple):
+    """테이블 조회 조건"""
+    version: str
+    source: str
+    route: Optional[str] = None
+    sort_by: Optional[str] = None
+    descending: bool = False
+    tenant: str = DEFAULT_TENANT
+
+
+def _ride_rows(snapshot) -> list:
+    columns = TABLE_SOURCES["rides"]["columns"]
+    return [tuple(record.get(column) for column in columns) for record in snapshot.transport_records]
+
+
+def _stop_rows(snapshot) -> list:
+    # 정류장별 합계는 스냅샷의 집계 뷰를 그대로 사용
+    columns = TABLE_SOURCES["stops"]["columns"]
+    return [tuple(row[column] for column in columns) for row in snapshot.stats.views["stops"]]
+
+
+def _route_rows(snapshot) -> list:
+    return [
+        (
+            metrics["route"],
+            (snapshot.commute_by_route.get(metrics["route"]) or {}).get("구분"),
+            metrics["riders"],
+            metrics["peak_load"],
+            metrics["cost_per_run"],
+            metrics["cost_per_rider"],
+            metrics["cost_per_km"],
+            metrics["utilization"],
+        )
+        for metrics in snapshot.economics.route_metrics()
+    ]
+
+
+# 테이블 소스: 컬럼 정의와 스냅샷 → 행 변환 함수
+TABLE_SOURCES = {
+    "rides": {
+        "description": "승하차 기록 원본 (정류장별 승차/하차 1건씩)",
+        "columns": ("노선명", "구분", "출발시간", "차량번호", "순번", "정류장명", "승/하차", "인원"),
+        "rows": _ride_rows,
+    },
+    "stops": {
+        "description": "정류장별 승차/하차 인원 합계",
+        "columns": ("노선명", "순번", "정류장명", "승차", "하차"),
+        "rows": _stop_rows,
+    },
+    "routes": {
+        "description": "노선별 승차 인원과 비용 지표",
+        "columns": ("노선명", "구분", "승차인원", "최대재차", "1회운행비", "1인당비용", "km당비용", "좌석이용률"),
+        "rows": _route_rows,
+    },
+}
+
+
+def describe_sources() -> str:
+    """프롬프트에 넣을 테이블 소스 설명"""
+    return "\n".join(
+        f"- {name}: {source['description']} (컬럼: {', '.join(source['columns'])})"
+        for name, source in TABLE_SOURCES.items()
+    )
+
+
+def _encode(payload) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(token: str):
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+
+
+def decode_table_id(table_id: str) -> TableSpec:
+    """
+    테이블 ID → 조회 조건
+
+    Raises:
+        ValueError: 잘못된 테이블 ID
+    """
+    try:
+        spec = TableSpec(*_decode(table_id))
+    except Exception:
+        raise ValueError(f"Invalid table id: {table_id}")
+    # 조작된 ID의 필드 타입 검증 (리스트 등은 캐시 키로 쓸 수 없고 필터/정렬에서도 오류)
+    if not all(isinstance(value, str) for value in (spec.version, spec.source, spec.tenant)):
+        raise ValueError(f"Invalid table id: {table_id}")
+    if not all(value is None or isinstance(value, str) for value in (spec.route, spec.sort_by)):
+        raise ValueError(f"Invalid table id: {table_id}")
+    if not isinstance(spec.descending, bool):
+        raise ValueError(f"Invalid table id: {table_id}")
+    if spec.source not in TABLE_SOURCES:
+        raise ValueError(f"Unknown table source: {spec.source}")
+    if spec.sort_by is not None and spec.sort_by not in TABLE_SOURCES[spec.source]["columns"]:
+        raise ValueError(f"Unknown sort column: {spec.sort_by}")
+    return spec
+
+
+def create_table(snapshot, query: dict = None) -> TableSpec:
+    """
+    LLM/로컬이 고른 조회 조건으로 테이블 조건 생성 (잘못된 값은 기본값으로 대체)
+
+    Args:
+        snapshot (DataSnapshot): 테이블을 계산할 스냅샷
+        query (dict): {"source": "rides" | "stops" | "routes", "route": 노선, "sort_by": 컬럼, "descending": bool}
+
+    Returns:
+        TableSpec: 테이블 조회 조건
+    """
+    query = query if isinstance(query, dict) else {}
+    source = query.get("source") if query.get("source") in TABLE_SOURCES else "routes"
+
+    route = None
+    if query.get("route"):
+        try:
+            route = snapshot.economics.routes[snapshot.economics.resolve_route(query["route"])]
+        except ValueError:
+            route = None
+
+    sort_by = query.get("sort_by")
+    if sort_by not in TABLE_SOURCES[source]["columns"]:
+        sort_by = None
+
+    return TableSpec(snapshot.version, source, route, sort_by, bool(query.get("descending")), snapshot.tenant)
+
+
+def _sort_key(value):
+    # 숫자와 문자열이 섞여도 비교 가능하도록 타입별로 분리 (None은 _materialize에서 따로 뒤에 붙임)
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    return (1, 0, str(value))
+
+
+def _filter_sort(snapshot, spec: TableSpec) -> tuple:
+    """조건에 맞는 전체 행 계산 (필터 + 정렬)"""
+    source = TABLE_SOURCES[spec.source]
+    rows = source["rows"](snapshot)
+    if spec.route is not None:
+        route_column = source["columns"].index("노선명")
+        rows = [row for row in rows if row[route_column] == spec.route]
+    if spec.sort_by is not None:
+        sort_column = source["columns"].index(spec.sort_by)
+        # None은 정렬 방향과 관계없이 항상 마지막
+        missing = [row for row in rows if row[sort_column] is None]
+        rows = sorted(
+            (row for row in rows if row[sort_column] is not None),
+            key=lambda row: _sort_key(row[sort_column]),
+            reverse=spec.descending,
+        ) + missing
+    return tuple(rows)
+
+
+def _materialize(spec: TableSpec) -> tuple:
+    """조건에 맞는 전체 행 (같은 스냅샷의 같은 조건은 재사용)"""
+    snapshot = get_snapshot(spec.version, spec.tenant)
+    if snapshot.version != spec.version:
+        raise TableExpired(f"Data version {spec.version} is no longer available")
+
+    cache = snapshot.table_cache
+    with snapshot.table_cache_lock:
+        rows = cache.get(spec)
+        if rows is not None:
+            cache.move_to_end(spec)
+            return rows
+
+    rows = _filter_sort(snapshot, spec)
+    if len(rows) > TABLE_CACHE_MAX_ROWS:
+        # 캐시 예산보다 큰 테이블은 요청마다 다시 계산
+        return rows
+
+    with snapshot.table_cache_lock:
+        cache[spec] = rows
+        cached_rows = sum(len(cached) for cached in cache.values())
+        # 오래 쓰지 않은 테이블부터 버림 (방금 넣은 테이블은 예산 이하이므로 남음)
+        while cached_rows > TABLE_CACHE_MAX_ROWS:
+            _, evicted = cache.popitem(last=False)
+            cached_rows -= len(evicted)
+    return rows
+
+
+def read_page(spec: TableSpec, cursor: str = None, limit: int = None) -> dict:
+    """
+    커서 기반 페이지 조회
+
+    Args:
+        spec (TableSpec): 테이블 조회 조건
+        cursor (str): 이전 페이지의 next_cursor (None이면 첫 페이지)
+        limit (int): 페이지 크기 (최대 TABLE_MAX_PAGE_SIZE)
+
+    Returns:
+        dict: {"table_id", "columns", "rows", "total_count", "next_cursor"}
+
+    Raises:
+        ValueError: 잘못된 커서
+        TableExpired: 데이터 버전이 바뀌어 테이블을 다시 계산할 수 없음
+    """
+    limit = min(max(int(limit or TABLE_PAGE_SIZE), 1), TABLE_MAX_PAGE_SIZE)
+    offset = 0
+    if cursor:
+        try:
+            offset = int(_decode(cursor)["offset"])
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        if offset < 0:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    rows = _materialize(spec)
+    page = rows[offset:offset + limit]
+    next_offset = offset + len(page)
+
+    return {
+        "table_id": _encode(list(spec)),
+        "source": spec.source,
+        "columns": list(TABLE_SOURCES[spec.source]["columns"]),
+        "rows": [list(row) for row in page],
+        "total_count": len(rows),
+        "next_cursor": _encode({"offset": next_offset}) if next_offset < len(rows) else None,
+    }
+
+
+def iter_csv(spec: TableSpec):
+    """
+    CSV export 스트리밍 (CSV_CHUNK_ROWS 행씩 문자열 청크 생성)
+
+    Excel에서 한글이 깨지지 않도록 UTF-8 BOM으로 시작
+    """
+    rows = _materialize(spec)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write("\ufeff")
+    writer.writerow(TABLE_SOURCES[spec.source]["columns"])
+    for start in range(0, len(rows), CSV_CHUNK_ROWS):
+        writer.writerows(rows[start:start + CSV_CHUNK_ROWS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining
@@ -4,30 +4,60 @@ Analytics Agent LangGraph 구성
 Graph Flow:
     START
       ↓
+    manage_history
+      ↓ (entry_router: intent 힌트가 있으면 바로 해당 경로로)
     intent_analyzer
       ↓ (conditional_router)
     ┌─────────────┬──────────────┐
     ↓             ↓              ↓
 get_graph_data  get_bus_data  fallback_response
     ↓             ↓              ↓
-select_edge   chart_type_selector  END
-    ↓             ↓
-   END      generate_analytic
+select_edge   detect_anomalies   │
+    ↓             ↓ (chart_router: 차트 타입 힌트가 있으면 건너뜀)
+    │       chart_type_selector  │
+    ↓             ↓              │
+    │         query_data         │
+    ↓         ┌───┴────┐         │
+    │  generate_chart  generate_insights (병렬)
+    ↓         └───┬────┘         │
+    │       merge_analytic       │
+    ↓             ↓              ↓
+    └────────→ record_turn ←─────┘
                   ↓
                  END
+
+analysis 경로의 차트 생성(저비용 티어 또는 로컬)과 인사이트 작성(고성능 티어)은
+병렬 분기로 실행되고, 한 분기가 실패해도 merge_analytic이 나머지 결과로 부분 응답을 만듦
+
+클라이언트가 intent / chart_type 힌트를 보내면(new_turn_input에 미리 채움)
+intent_analyzer / chart_type_selector를 건너뛰어 LLM 왕복이 1~2회 줄어듦
+
+세션 요청(thread_id)은 체크포인터가 붙은 그래프(get_session_graph)로 실행되어
+턴 사이에 messages / history_summary / last_turn이 유지됨
+
+모든 노드는 instrument_node로 감싸져 프로파일링 중인 요청(state["profile_id"])에서
+노드별 소요 시간/메모리와 노드 이름이 붙은 스택 샘플을 기록함
 """
 from langgraph.graph import StateGraph, START, END
 from analytics.types.state_types import AnalyticsState
-from analytics.nodes.router import intent_analyzer, conditional_router
+from analytics.nodes.router import intent_analyzer, entry_router, conditional_router
 from analytics.nodes.find_highlight import get_graph_data, select_edge
-from analytics.nodes.analysis import get_bus_data, chart_type_selector, generate_analytic
+from analytics.nodes.analysis import (
+    get_bus_data, detect_anomalies, chart_router, chart_type_selector, query_data,
+    generate_chart, generate_insights, merge_analytic
+)
 from analytics.nodes.fallback import fallback_response
+from analytics.nodes.session import manage_history, record_turn
+from analytics.profiling.profiler import instrument_node
 
 
-def build_analytics_graph():
+def build_analytics_graph(checkpointer=None):
     """
     Analytics Agent LangGraph 구축
 
+    Args:
+        checkpointer: 세션 체크포인트 저장소 (None이면 요청마다 독립 실행)
+
     Returns:
         CompiledGraph: 실행 가능한 LangGraph 인스턴스
     """
@@ -37,26 +67,44 @@ def build_analytics_graph():
     # ============================================================
     # Nodes 추가
     # ============================================================
-    workflow.add_node("intent_analyzer", intent_analyzer)
+    workflow.add_node("manage_history", instrument_node("manage_history", manage_history))
+    workflow.add_node("intent_analyzer", instrument_node("intent_analyzer", intent_analyzer))
 
     # Find/Highlight path nodes
-    workflow.add_node("get_graph_data", get_graph_data)
-    workflow.add_node("select_edge", select_edge)
+    workflow.add_node("get_graph_data", instrument_node("get_graph_data", get_graph_data))
+    workflow.add_node("select_edge", instrument_node("select_edge", select_edge))
 
     # Analysis path nodes
-    workflow.add_node("get_bus_data", get_bus_data)
-    workflow.add_node("chart_type_selector", chart_type_selector)
-    workflow.add_node("generate_analytic", generate_analytic)
+    workflow.add_node("get_bus_data", instrument_node("get_bus_data", get_bus_data))
+    workflow.add_node("detect_anomalies", instrument_node("detect_anomalies", detect_anomalies))
+    workflow.add_node("chart_type_selector", instrument_node("chart_type_selector", chart_type_selector))
+    workflow.add_node("query_data", instrument_node("query_data", query_data))
+    workflow.add_node("generate_chart", instrument_node("generate_chart", generate_chart))
+    workflow.add_node("generate_insights", instrument_node("generate_insights", generate_insights))
+    workflow.add_node("merge_analytic", instrument_node("merge_analytic", merge_analytic))
 
     # Fallback node
-    workflow.add_node("fallback_response", fallback_response)
+    workflow.add_node("fallback_response", instrument_node("fallback_response", fallback_response))
+
+    # Session node
+    workflow.add_node("record_turn", instrument_node("record_turn", record_turn))
 
     # ============================================================
     # Edges 구성
     # ============================================================
 
-    # Entry point
-    workflow.set_entry_point("intent_analyzer")
+    # Entry point (대화 기록 윈도우 정리 후 intent 분석, intent 힌트가 있으면 해당 경로로 바로 진입)
+    workflow.set_entry_point("manage_history")
+    workflow.add_conditional_edges(
+        "manage_history",
+        entry_router,
+        {
+            "intent_analyzer": "intent_analyzer",
+            "get_graph_data": "get_graph_data",
+            "get_bus_data": "get_bus_data",
+            "fallback_response": "fallback_response"
+        }
+    )
 
     # Conditional routing (intent에 따라 분기)
     workflow.add_conditional_edges(
@@ -69,22 +117,37 @@ def build_analytics_graph():
         }
     )
 
-    # Find/Highlight path: get_graph_data → select_edge → END
+    # Find/Highlight path: get_graph_data → select_edge → record_turn
     workflow.add_edge("get_graph_data", "select_edge")
-    workflow.add_edge("select_edge", END)
+    workflow.add_edge("select_edge", "record_turn")
 
-    # Analysis path: get_bus_data → chart_type_selector → generate_analytic → END
-    workflow.add_edge("get_bus_data", "chart_type_selector")
-    workflow.add_edge("chart_type_selector", "generate_analytic")
-    workflow.add_edge("generate_analytic", END)
+    # Analysis path: get_bus_data → detect_anomalies → (chart_type_selector) → query_data
+    #                → (generate_chart ∥ generate_insights) → merge_analytic → record_turn
+    workflow.add_edge("get_bus_data", "detect_anomalies")
+    workflow.add_conditional_edges(
+        "detect_anomalies",
+        chart_router,
+        {
+            "chart_type_selector": "chart_type_selector",
+            "query_data": "query_data"
+        }
+    )
+    workflow.add_edge("chart_type_selector", "query_data")
+    workflow.add_edge("query_data", "generate_chart")
+    workflow.add_edge("query_data", "generate_insights")
+    workflow.add_edge(["generate_chart", "generate_insights"], "merge_analytic")
+    workflow.add_edge("merge_analytic", "record_turn")
 
-    # Fallback: fallback_response → END
-    workflow.add_edge("fallback_response", END)
+    # Fallback: fallback_response → record_turn
+    workflow.add_edge("fallback_response", "record_turn")
+
+    # 이번 턴 결과 기록 → END
+    workflow.add_edge("record_turn", END)
 
     # ============================================================
     # Compile and return
     # ============================================================
-    compiled_graph = workflow.compile()
+    compiled_graph = workflow.compile(checkpointer=checkpointer)
 
     print("✅ Analytics Agent LangGraph 구축 완료")
 
@@ -106,3 +169,22 @@ def get_analytics_graph():
     if _analytics_graph is None:
         _analytics_graph = build_analytics_graph()
     return _analytics_graph
+
+
+_session_graph = None
+
+
+def get_session_graph():
+    """
+    세션(thread_id) 요청용 Analytics Graph 싱글톤 인스턴스 반환
+
+    invoke 시 config={"configurable": {"thread_id": ...}}를 함께 전달해야 함
+
+    Returns:
+        CompiledGraph: 체크포인터가 붙은 Analytics Agent 그래프
+    """
+    global _session_graph
+    if _session_graph is None:
+        from analytics.graph.checkpointer import get_checkpointer
+        _session_graph = build_analytics_graph(checkpointer=get_checkpointer())
+    return _session_graph
@@ -0,0 +1,136 @@
+"""
+Session Checkpointer
+
+thread_id별 대화 상태를 저장하는 LangGraph 체크포인트 저장소
+
+- sqlite (기본): SESSION_DB_PATH 파일에 저장 → 재시작 후에도 유지되고 gunicorn 워커 간 공유
+- memory: 프로세스 메모리에 저장 (langgraph-checkpoint-sqlite가 없을 때도 사용)
+
+세션 lease: sqlite 저장소는 여러 gunicorn 워커가 공유하므로, 같은 thread_id의 턴이 워커 간에
+섞이지 않도록 같은 DB 파일의 session_leases 행으로 턴 하나만 실행되게 함
+(워커가 죽어도 lease는 만료 시각 이후 다른 워커가 가져감)
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+from config import SESSION_DB_PATH, SESSION_STORE
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+# 워커 간 공유되는 저장소(SqliteSaver)인지 여부 (세션 lease 필요 여부)
+_shared_store = False
+
+# 다른 워커가 가진 lease를 다시 확인하는 간격 (초)
+_LEASE_POLL_SECONDS = 0.1
+_lease_conn = None
+_lease_lock = threading.Lock()
+
+
+def _build_checkpointer():
+    global _shared_store
+    from langgraph.checkpoint.memory import MemorySaver
+
+    if SESSION_STORE != "sqlite":
+        print("💾 Session store: memory")
+        return MemorySaver()
+
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        print("⚠️  langgraph-checkpoint-sqlite not installed, using in-memory session store")
+        return MemorySaver()
+
+    # 요청은 스레드풀에서 실행되므로 연결을 스레드 간에 공유 (SqliteSaver가 내부 락으로 직렬화)
+    conn = sqlite3.connect(SESSION_DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    print(f"💾 Session store: sqlite ({SESSION_DB_PATH})")
+    _shared_store = True
+    return SqliteSaver(conn)
+
+
+def get_checkpointer():
+    """
+    세션 체크포인트 저장소 싱글톤
+
+    gunicorn 마스터에서 만들지 않고 워커에서 처음 사용할 때 생성
+    (sqlite 연결은 fork 후에 열어야 함)
+
+    Returns:
+        BaseCheckpointSaver: SqliteSaver 또는 MemorySaver
+    """
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                _checkpointer = _build_checkpointer()
+    return _checkpointer
+
+
+# ============================================================
+# Session lease (워커 간 thread_id 턴 직렬화)
+# ============================================================
+def _lease_connection() -> sqlite3.Connection:
+    global _lease_conn
+    if _lease_conn is None:
+        # autocommit: lease 획득/해제는 각각 단일 문장으로 원자적으로 실행
+        conn = sqlite3.connect(SESSION_DB_PATH, check_same_thread=False, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_leases ("
+            "thread_id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        _lease_conn = conn
+    return _lease_conn
+
+
+def _try_acquire(thread_id: str, owner: str, ttl: float) -> bool:
+    now = time.time()
+    with _lease_lock:
+        cursor = _lease_connection().execute(
+            "INSERT INTO session_leases (thread_id, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE session_leases.expires_at <= ?",
+            (thread_id, owner, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+
+def acquire_session_lease(thread_id: str, ttl: float, wait_seconds: float) -> Optional[str]:
+    """
+    세션 턴 실행 권한 획득 (다른 워커가 같은 thread_id 턴을 실행 중이면 끝날 때까지 대기)
+
+    프로세스 안의 순서는 API의 세션 락이 보장하고, 이 lease는 워커 간 순서만 담당
+    메모리 저장소는 워커 간에 공유되지 않으므로 lease 없이 바로 반환
+
+    Args:
+        thread_id (str): 세션 체크포인트 키
+        ttl (float): lease 유지 시간 (초, 턴이 이 시간 안에 끝나야 함 → 워커가 죽어도 만료 후 해제)
+        wait_seconds (float): 최대 대기 시간 (초)
+
+    Returns:
+        Optional[str]: lease 소유자 토큰 (release_session_lease에 전달), 대기 시간 초과 시 None
+    """
+    get_checkpointer()
+    if not _shared_store:
+        return ""
+
+    owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+    give_up_at = time.time() + wait_seconds
+    while not _try_acquire(thread_id, owner, ttl):
+        if time.time() >= give_up_at:
+            return None
+        time.sleep(_LEASE_POLL_SECONDS)
+    return owner
+
+
+def release_session_lease(thread_id: str, owner: str):
+    """세션 턴 실행 권한 반환 (자기 lease만 삭제)"""
+    if not owner:
+        return
+    with _lease_lock:
+        _lease_connection().execute(
+            "DELETE FROM session_leases WHERE thread_id = ? AND owner = ?", (thread_id, owner)
+        )
@@ -0,0 +1,170 @@
+"""
+Upstream Admission Control
+
+모델별 token bucket + 동시 호출 제한 + 우선순위 대기열
+
+- 대기열이 가득 차면 즉시 AdmissionRejected(429) 발생
+- 데드라인 안에 슬롯을 얻지 못하면 AdmissionRejected(503) 발생
+- interactive 요청이 batch 요청보다 먼저 슬롯을 얻음
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Optional
+from config import BATCH_QUEUE_SHARE, MODEL_RATE_LIMITS, REQUEST_PRIORITIES
+
+
+class AdmissionRejected(Exception):
+    """업스트림 호출 슬롯을 얻지 못한 경우 (API에서 429/503 + Retry-After로 변환)"""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 token bucket"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self) -> float:
+        """
+        토큰 1개 사용 시도
+
+        Returns:
+            float: 0이면 사용 성공, 아니면 다음 토큰까지 대기 시간 (초)
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ModelLimiter:
+    """모델 하나에 대한 rate limit / 동시성 제한 / 우선순위 대기열"""
+
+    def __init__(self, model: str, requests_per_second: float, burst: int,
+                 max_concurrency: int, max_queue: int):
+        self.model = model
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def retry_after(self) -> int:
+        """현재 대기열이 비워질 때까지의 예상 시간 (초, 최소 1)"""
+        return max(1, math.ceil((len(self._waiters) + 1) / self.bucket.rate))
+
+    def is_saturated(self, priority: str = "interactive") -> bool:
+        """해당 우선순위의 요청이 대기열에 들어갈 수 없는지 여부"""
+        with self._cond:
+            return len(self._waiters) >= self._queue_limit(priority)
+
+    def acquire(self, priority: str = "interactive", deadline_at: Optional[float] = None):
+        """
+        호출 슬롯 획득 (대기열에서 우선순위 순서대로 대기)
+
+        Args:
+            priority (str): "interactive" | "batch"
+            deadline_at (float): 절대 마감 시각 (time.time() 기준)
+
+        Raises:
+            AdmissionRejected: 대기열 초과(429) 또는 데드라인 내 슬롯 획득 실패(503)
+        """
+        with self._cond:
+            if len(self._waiters) >= self._queue_limit(priority):
+                raise AdmissionRejected(
+                    f"{self.model}: upstream queue full",
+                    status_code=429,
+                    retry_after=self.retry_after(),
+                )
+
+            waiter = (REQUEST_PRIORITIES.get(priority, 0), next(self._sequence))
+            heapq.heappush(self._waiters, waiter)
+
+            try:
+                while True:
+                    wait_for = None
+                    if self._waiters[0] == waiter and self.in_flight < self.max_concurrency:
+                        wait_for = self.bucket.try_take()
+                        if wait_for == 0:
+                            heapq.heappop(self._waiters)
+                            self.in_flight += 1
+                            self._cond.notify_all()
+                            return
+
+                    if deadline_at is not None:
+                        remaining = deadline_at - time.time()
+                        if remaining <= 0:
+                            raise AdmissionRejected(
+                                f"{self.model}: no upstream slot before deadline",
+                                status_code=503,
+                                retry_after=self.retry_after(),
+                            )
+                        wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+                    self._cond.wait(timeout=wait_for)
+            except BaseException:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def try_acquire(self) -> bool:
+        """대기 없이 즉시 슬롯을 얻을 수 있을 때만 획득 (hedged 호출용)"""
+        with self._cond:
+            if self._waiters or self.in_flight >= self.max_concurrency:
+                return False
+            if self.bucket.try_take() > 0:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        """호출 슬롯 반환"""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _queue_limit(self, priority: str) -> int:
+        if priority == "batch":
+            return int(self.max_queue * BATCH_QUEUE_SHARE)
+        return self.max_queue
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_model_limiter(model: str) -> ModelLimiter:
+    """
+    모델별 limiter 싱글톤
+
+    Args:
+        model (str): 모델 이름
+
+    Returns:
+        ModelLimiter: MODEL_RATE_LIMITS 설정으로 생성된 limiter
+    """
+    with _limiters_lock:
+        if model not in _limiters:
+            limits = MODEL_RATE_LIMITS.get(model, MODEL_RATE_LIMITS["solar-pro"])
+            _limiters[model] = ModelLimiter(model, **limits)
+        return _limiters[model]
@@ -0,0 +1,408 @@
+"""
+LLM Call Resilience
+
+요청 데드라인, hedged 호출, circuit breaker
+
+- Deadline: 요청마다 절대 마감 시각(deadline_at)을 state로 전달하고 노드별로 분할
+- Hedging: 첫 호출이 최근 지연시간 백분위수를 넘기면 동일한 호출을 한 번 더 보내 먼저 끝난 결과 사용
+- Circuit Breaker: 모델별 오류율이 임계값을 넘으면 호출을 차단하고 노드가 로컬 계산 응답으로 전환
+- Cancellation: 비동기 작업(job_id)이 취소되면 진행 중인 호출을 중단하고 그래프 실행을 끝냄
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+from analytics.llm.admission import get_model_limiter
+from config import (
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_ERROR_RATE_THRESHOLD,
+    CIRCUIT_MIN_CALLS,
+    CIRCUIT_WINDOW_SECONDS,
+    HEDGE_ENABLED,
+    HEDGE_MIN_DELAY_SECONDS,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    NODE_DEADLINE_SHARES,
+)
+
+
+class UpstreamUnavailable(Exception):
+    """업스트림 LLM 응답을 데드라인 안에 받을 수 없는 경우 (노드는 degraded 응답으로 전환)"""
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    """요청/노드 데드라인 초과"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Circuit breaker가 열려 호출이 차단된 경우"""
+
+
+class CallCancelled(Exception):
+    """hedged 호출 중 패배한 호출이 취소된 경우"""
+
+
+class RequestCancelled(Exception):
+    """요청(비동기 작업)이 취소된 경우 (노드는 degraded 응답으로 전환하지 않고 그래프 실행 중단)"""
+
+
+# 취소 여부를 확인하는 간격 (초, 업스트림 응답 대기 중)
+_CANCEL_POLL_SECONDS = 0.2
+
+
+# ============================================================
+# Deadline
+# ============================================================
+def remaining_seconds(deadline_at: Optional[float]) -> Optional[float]:
+    """
+    데드라인까지 남은 시간 (초)
+
+    Args:
+        deadline_at (float): 절대 마감 시각 (time.time() 기준, None이면 무제한)
+
+    Returns:
+        Optional[float]: 남은 시간 (None이면 무제한)
+    """
+    if deadline_at is None:
+        return None
+    return deadline_at - time.time()
+
+
+def node_deadline(state: dict, node_name: str) -> Optional[float]:
+    """
+    요청 데드라인을 노드 몫으로 분할한 절대 마감 시각
+
+    남은 시간 × NODE_DEADLINE_SHARES[node_name] 만큼만 사용하여
+    뒤에 실행될 노드의 시간을 남겨둠
+
+    Args:
+        state (dict): 현재 그래프 상태 (deadline_at 포함)
+        node_name (str): 노드 이름
+
+    Returns:
+        Optional[float]: 노드 마감 시각 (None이면 무제한)
+    """
+    deadline_at = state.get("deadline_at")
+    remaining = remaining_seconds(deadline_at)
+    if remaining is None:
+        return None
+
+    share = NODE_DEADLINE_SHARES.get(node_name, 1.0)
+    return time.time() + max(remaining, 0.0) * share
+
+
+# ============================================================
+# Cancellation (비동기 작업)
+# ============================================================
+_cancel_lock = threading.Lock()
+_cancel_events = {}
+
+
+def register_cancel(job_id: str) -> threading.Event:
+    """작업의 취소 이벤트 등록 (작업 실행 전에 호출)"""
+    with _cancel_lock:
+        return _cancel_events.setdefault(job_id, threading.Event())
+
+
+def unregister_cancel(job_id: str):
+    """작업이 끝나면 취소 이벤트 제거"""
+    with _cancel_lock:
+        _cancel_events.pop(job_id, None)
+
+
+def cancel_request(job_id: str) -> bool:
+    """
+    이 프로세스에서 실행 중인 작업 취소
+
+    Returns:
+        bool: 이 프로세스에 등록된 작업이면 True
+    """
+    with _cancel_lock:
+        event = _cancel_events.get(job_id)
+    if event is None:
+        return False
+    event.set()
+    return True
+
+
+def get_cancel_event(job_id: Optional[str]) -> Optional[threading.Event]:
+    """작업의 취소 이벤트 (job_id가 없거나 등록되지 않았으면 None)"""
+    if not job_id:
+        return None
+    with _cancel_lock:
+        return _cancel_events.get(job_id)
+
+
+# ============================================================
+# Latency tracking (hedging 기준)
+# ============================================================
+class LatencyTracker:
+    """모델별 최근 호출 지연시간 기록"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """샘플이 충분하지 않으면 None"""
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(len(ordered) * p), len(ordered) - 1)
+        return ordered[index]
+
+
+# ============================================================
+# Circuit Breaker
+# ============================================================
+class CircuitBreaker:
+    """
+    오류율 기반 circuit breaker
+
+    - closed: 정상 호출, 윈도우 내 오류율이 임계값을 넘으면 open
+    - open: 모든 호출 차단, cooldown 이후 half_open
+    - half_open: 시험 호출 1건만 허용, 성공 시 closed / 실패 시 다시 open
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self._outcomes = deque()
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.time() - self._opened_at < CIRCUIT_COOLDOWN_SECONDS:
+                    return False
+                self.state = "half_open"
+                self._trial_in_flight = False
+
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state == "half_open":
+                print(f"🟢 Circuit closed: {self.name}")
+                self.state = "closed"
+                self._outcomes.clear()
+            self._record(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == "half_open":
+                self._open()
+                return
+            self._record(False)
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                len(self._outcomes) >= CIRCUIT_MIN_CALLS
+                and failures / len(self._outcomes) >= CIRCUIT_ERROR_RATE_THRESHOLD
+            ):
+                self._open()
+
+    def release_trial(self):
+        """결과를 기록하지 못한 시험 호출(취소 등)의 슬롯 반환 (상태는 그대로, 다음 호출이 다시 시험)"""
+        with self._lock:
+            if self.state == "half_open":
+                self._trial_in_flight = False
+
+    def _record(self, ok: bool):
+        now = time.time()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > CIRCUIT_WINDOW_SECONDS:
+            self._outcomes.popleft()
+
+    def _open(self):
+        print(f"🔴 Circuit opened: {self.name}")
+        self.state = "open"
+        self._opened_at = time.time()
+        self._trial_in_flight = False
+
+
+_registry_lock = threading.Lock()
+_breakers = {}
+_latencies = {}
+
+# hedged 호출 실행용 스레드 풀
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-call")
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """모델별 circuit breaker 싱글톤"""
+    with _registry_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(model)
+        return _breakers[model]
+
+
+def get_latency_tracker(model: str) -> LatencyTracker:
+    """모델별 지연시간 기록 싱글톤"""
+    with _registry_lock:
+        if model not in _latencies:
+            _latencies[model] = LatencyTracker()
+        return _latencies[model]
+
+
+# ============================================================
+# Guarded call
+# ============================================================
+def call_with_resilience(
+    model: str,
+    fn: Callable[[threading.Event], object],
+    deadline_at: Optional[float] = None,
+    priority: str = "interactive",
+    abort: Optional[threading.Event] = None,
+):
+    """
+    admission control, 데드라인, hedging, circuit breaker를 적용하여 LLM 호출
+
+    Args:
+        model (str): 모델 이름 (circuit breaker / 지연시간 기록 / rate limit 단위)
+        fn (Callable): 실제 호출 함수, cancel 이벤트를 받아 취소 시 중단
+        deadline_at (float): 절대 마감 시각 (None이면 무제한)
+        priority (str): 대기열 우선순위 ("interactive" | "batch")
+        abort (threading.Event): 설정되면 진행 중인 호출을 모두 중단 (비동기 작업 취소)
+
+    Returns:
+        fn의 반환값 (먼저 성공한 호출)
+
+    Raises:
+        AdmissionRejected: 대기열 초과 또는 데드라인 내 호출 슬롯 획득 실패
+        CircuitOpenError: 회로가 열려 있는 경우
+        DeadlineExceeded: 데드라인 안에 응답이 없는 경우
+        UpstreamUnavailable: 업스트림 호출 실패
+        ValueError: 응답 파싱 실패 (업스트림은 정상으로 간주)
+        RequestCancelled: abort 이벤트로 중단된 경우
+    """
+    if abort is not None and abort.is_set():
+        raise RequestCancelled(f"{model}: request cancelled")
+
+    breaker = get_circuit_breaker(model)
+    tracker = get_latency_tracker(model)
+    limiter = get_model_limiter(model)
+
+    remaining = remaining_seconds(deadline_at)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"{model}: no time budget left")
+    # 업스트림 호출 슬롯 확보 (hedged 호출은 여유가 있을 때만 추가 슬롯 사용)
+    limiter.acquire(priority, deadline_at)
+    if not breaker.allow():
+        limiter.release()
+        raise CircuitOpenError(f"{model}: circuit open")
+
+    hedge_delay = tracker.percentile(HEDGE_PERCENTILE) if HEDGE_ENABLED else None
+    if hedge_delay is not None:
+        hedge_delay = max(hedge_delay, HEDGE_MIN_DELAY_SECONDS)
+    # hedge가 남은 시간 안에 끝날 수 있는지 판단하는 기준 (최근 지연시간 중앙값)
+    expected_latency = tracker.percentile(0.5) or 0.0
+
+    cancels = []
+    pending = set()
+    started = time.time()
+
+    def run(cancel):
+        try:
+            return fn(cancel)
+        finally:
+            limiter.release()
+
+    def submit():
+        cancel = threading.Event()
+        cancels.append(cancel)
+        pending.add(_executor.submit(run, cancel))
+
+    submit()
+    hedged = False
+    last_error = None
+    # 결과(성공/실패)를 circuit breaker에 기록했는지 여부 (기록하지 않고 끝나면 시험 호출 슬롯 반환)
+    recorded = False
+
+    try:
+        while pending:
+            remaining = remaining_seconds(deadline_at)
+            if remaining is not None and remaining <= 0:
+                break
+
+            timeout = remaining
+            if not hedged and hedge_delay is not None:
+                until_hedge = hedge_delay - (time.time() - started)
+                timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+
+            # 취소될 수 있는 호출은 짧은 간격으로 깨어나 취소 여부 확인
+            polling = abort is not None and (timeout is None or timeout > _CANCEL_POLL_SECONDS)
+            if polling:
+                timeout = _CANCEL_POLL_SECONDS
+
+            done, pending = wait(pending, timeout=max(timeout, 0.0) if timeout is not None else None,
+                                 return_when=FIRST_COMPLETED)
+            if abort is not None and abort.is_set():
+                # 취소는 업스트림 장애가 아니므로 circuit breaker에 기록하지 않음
+                raise RequestCancelled(f"{model}: request cancelled")
+            if polling and not done:
+                continue
+
+            failed = False
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    tracker.record(time.time() - started)
+                    breaker.record_success()
+                    recorded = True
+                    return future.result()
+                if isinstance(error, ValueError):
+                    # 파싱 오류는 업스트림 장애가 아님
+                    tracker.record(time.time() - started)
+                    breaker.record_success()
+                    recorded = True
+                    raise error
+                if not isinstance(error, CallCancelled):
+                    last_error = error
+                    failed = True
+
+            # 첫 호출이 느리거나 실패하면 한 번만 추가 호출
+            if not hedged and (failed or (not done and hedge_delay is not None)):
+                hedged = True
+                remaining = remaining_seconds(deadline_at)
+                if remaining is not None and remaining <= expected_latency:
+                    # 데드라인 안에 끝나지 못할 hedge로 대기열 슬롯/업스트림 호출을 낭비하지 않음
+                    print(f"⏭️  Skipping {model} hedge: {max(remaining, 0.0):.2f}s left "
+                          f"(expected {expected_latency:.2f}s)")
+                    if not pending:
+                        break
+                elif limiter.try_acquire():
+                    reason = "failure" if failed else f"{hedge_delay:.2f}s"
+                    print(f"🪃 Hedging {model} call after {reason}")
+                    submit()
+                elif not pending:
+                    break
+            elif not done:
+                break
+
+        breaker.record_failure()
+        recorded = True
+        if last_error is not None and not pending:
+            raise UpstreamUnavailable(f"{model}: {str(last_error)}") from last_error
+        raise DeadlineExceeded(f"{model}: deadline exceeded")
+    finally:
+        # 패배했거나 시간 초과/취소된 호출 중단
+        for cancel in cancels:
+            cancel.set()
+        # 취소는 업스트림 장애가 아니므로 기록하지 않지만, half_open 시험 호출이었다면
+        # 슬롯을 반환하지 않으면 회로가 영구히 막힘
+        if not recorded:
+            breaker.release_trial()
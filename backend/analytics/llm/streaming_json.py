@@ -0,0 +1,198 @@
+"""
+Streaming JSON Parser
+
+스트리밍되는 LLM 토큰을 받아 JSON 객체를 점진적으로 파싱
+- 최상위 필드가 완성되는 즉시 (key, value) 반환 (예: chart_data → insights → reason)
+- 잘못된 출력은 생성 도중에 감지하여 호출을 조기에 중단/재시도할 수 있도록 함
+"""
+import json
+import re
+
+_CLOSERS = {"{": "}", "[": "]"}
+_FENCE = "```"
+# 펜스 뒤 언어 태그 (```json)
+_FENCE_LANG = re.compile(r"[A-Za-z0-9_+-]*")
+_VALUE_STARTS = set('"{[-0123456789tfn')
+
+
+class MalformedJSONError(ValueError):
+    """스트리밍 도중 JSON 형식 오류가 감지된 경우"""
+
+
+class StreamingJSONParser:
+    """
+    최상위 JSON 객체를 토큰 단위로 파싱하는 파서
+
+    Usage:
+        parser = StreamingJSONParser()
+        for chunk in llm.stream(messages):
+            for key, value in parser.feed(chunk.content):
+                ...  # 완성된 필드를 즉시 사용
+            if parser.done:
+                break
+        result = parser.close()
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._value_start = 0
+        self._started = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self._expect_key = False
+        self._expect_value = False
+
+    def feed(self, chunk: str) -> list:
+        """
+        토큰 청크 추가
+
+        Args:
+            chunk (str): 새로 수신한 텍스트
+
+        Returns:
+            list[tuple[str, Any]]: 이번 청크로 완성된 최상위 필드 목록
+
+        Raises:
+            MalformedJSONError: JSON 형식 오류가 감지된 경우
+        """
+        if self.done or not chunk:
+            return []
+
+        self.buffer += chunk
+        completed = []
+
+        if not self._started and not self._skip_preamble():
+            return completed
+
+        buf = self.buffer
+        while self._pos < len(buf):
+            char = buf[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                self._pos += 1
+                continue
+
+            if len(self._stack) == 1 and self._stack[0] == "{" and not char.isspace():
+                self._check_member_token(char)
+
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(char)
+                if len(self._stack) == 1:
+                    self._member_start = self._pos + 1
+                    self._expect_key = char == "{"
+            elif char in ("}", "]"):
+                if not self._stack or _CLOSERS[self._stack[-1]] != char:
+                    raise MalformedJSONError(f"Unexpected '{char}' at position {self._pos}")
+                if len(self._stack) == 1:
+                    completed.extend(self._complete_member(self._pos))
+                self._stack.pop()
+                if not self._stack:
+                    self._pos += 1
+                    self.done = True
+                    break
+            elif char == "," and len(self._stack) == 1:
+                completed.extend(self._complete_member(self._pos))
+                self._member_start = self._pos + 1
+                self._expect_key = True
+
+            self._pos += 1
+
+        return completed
+
+    def close(self):
+        """
+        스트림 종료 후 전체 JSON 값 반환
+
+        Returns:
+            Any: 파싱된 JSON 값
+
+        Raises:
+            MalformedJSONError: JSON이 완성되지 않은 경우
+        """
+        if not self.done:
+            raise MalformedJSONError("Stream ended before JSON value was complete")
+
+        try:
+            return json.loads(self.buffer[self._value_start:self._pos])
+        except json.JSONDecodeError as e:
+            raise MalformedJSONError(str(e)) from e
+
+    def _skip_preamble(self) -> bool:
+        """
+        앞쪽 공백과 ```json 펜스를 건너뛰고 JSON 시작 위치 확인
+
+        펜스와 JSON이 같은 줄에 있어도 처리 (```{"a": 1}```)
+        닫는 펜스는 JSON 값이 끝난 뒤이므로 읽지 않음
+        """
+        text = self.buffer.lstrip()
+        offset = len(self.buffer) - len(text)
+
+        if text.startswith(_FENCE):
+            rest = text[len(_FENCE):]
+            lang = _FENCE_LANG.match(rest).end()
+            if lang == len(rest):
+                # 언어 태그가 아직 도착하는 중
+                return False
+            rest = rest[lang:]
+            offset += len(_FENCE) + lang + (len(rest) - len(rest.lstrip()))
+            text = rest.lstrip()
+        elif _FENCE.startswith(text):
+            # 펜스의 일부만 도착한 상태
+            return False
+
+        if not text:
+            return False
+        if text[0] not in _CLOSERS:
+            raise MalformedJSONError(f"Expected JSON object, got {text[:20]!r}")
+
+        self._started = True
+        self._pos = offset
+        self._value_start = offset
+        return True
+
+    def _check_member_token(self, char: str):
+        """최상위 멤버의 key/value 시작 문자를 검사하여 오류를 조기에 감지"""
+        if self._expect_key:
+            self._expect_key = False
+            if char not in ('"', "}"):
+                raise MalformedJSONError(f"Expected key at position {self._pos}, got {char!r}")
+        elif self._expect_value:
+            self._expect_value = False
+            if char not in _VALUE_STARTS:
+                raise MalformedJSONError(f"Expected value at position {self._pos}, got {char!r}")
+        elif char == ":":
+            self._expect_value = True
+
+    def _complete_member(self, end: int) -> list:
+        """최상위 객체의 멤버 하나를 파싱하여 필드로 반환"""
+        if self._stack[0] != "{":
+            return []
+
+        member = self.buffer[self._member_start:end].strip()
+        if not member:
+            # 빈 객체 "{}"만 허용
+            if self.buffer[end] == "}" and not self.fields:
+                return []
+            raise MalformedJSONError(f"Empty member at position {end}")
+
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError as e:
+            raise MalformedJSONError(f"Invalid member {member[:40]!r}: {str(e)}") from e
+
+        items = list(parsed.items())
+        self.fields.update(parsed)
+        return items
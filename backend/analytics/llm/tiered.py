@@ -0,0 +1,326 @@
+"""
+Tiered LLM Invocation
+
+노드별 모델 티어 정책에 따라 저비용 모델부터 호출하고,
+확신도가 낮거나 JSON 출력이 잘못된 경우에만 상위 티어로 승격
+"""
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+from langchain_core.messages import AIMessage
+from analytics.llm.resilience import (
+    CallCancelled,
+    DeadlineExceeded,
+    RequestCancelled,
+    UpstreamUnavailable,
+    call_with_resilience,
+    get_cancel_event,
+    node_deadline,
+    remaining_seconds,
+)
+from analytics.llm.streaming_json import StreamingJSONParser
+from analytics.profiling.profiler import profile_thread, record_field
+from config import build_chat_model, get_node_tiers
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 근사 (업스트림이 usage를 주지 않는 스트리밍 응답용)
+
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII 문자는 약 1.5자당 1토큰으로 계산
+    """
+    text = text or ""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return round(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+class TokenMeter:
+    """
+    invoke_tiered 한 번의 토큰 사용량 (승격/hedged 호출 포함 모든 시도 합산)
+
+    응답에 usage_metadata가 있으면 그 값을, 없으면 estimate_tokens 근사값을 사용
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_model = {}
+        self.calls = 0
+        self.estimated = False
+
+    def record(self, model: str, messages: list, response=None):
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            input_tokens, output_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        else:
+            # 응답 전에 취소된 호출도 프롬프트 토큰은 과금됨
+            input_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+            output_tokens = estimate_tokens(getattr(response, "content", "") or "")
+        with self._lock:
+            tokens = self.by_model.setdefault(model, {"input": 0, "output": 0})
+            tokens["input"] += input_tokens
+            tokens["output"] += output_tokens
+            self.calls += 1
+            self.estimated = self.estimated or not usage
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "input": sum(tokens["input"] for tokens in self.by_model.values()),
+                "output": sum(tokens["output"] for tokens in self.by_model.values()),
+                "calls": self.calls,
+                "estimated": self.estimated,
+                "by_model": {model: dict(tokens) for model, tokens in self.by_model.items()},
+            }
+
+
+class TieredResult(NamedTuple):
+    """티어 호출 결과"""
+    response: Any
+    parsed: Any
+    tier: str
+    model: str
+    tokens: Optional[dict] = None
+
+    def tier_record(self) -> dict:
+        """state["model_tiers"]에 기록할 항목 (응답 티어/모델 + 토큰 사용량)"""
+        return {"tier": self.tier, "model": self.model, "tokens": self.tokens}
+
+
+def call_options(state: dict, node_name: str) -> dict:
+    """
+    state에서 노드의 LLM 호출 옵션 구성 (invoke_tiered 키워드 인자)
+
+    Args:
+        state (dict): 현재 그래프 상태
+        node_name (str): 노드 이름
+
+    Returns:
+        dict: {"deadline_at": 노드 마감 시각, "priority": 요청 우선순위,
+               "profile_id": 프로파일 세션 ID, "job_id": 비동기 작업 ID}
+    """
+    return {
+        "deadline_at": node_deadline(state, node_name),
+        "priority": state.get("priority") or "interactive",
+        "profile_id": state.get("profile_id"),
+        "job_id": state.get("job_id"),
+    }
+
+
+def stream_json(
+    llm,
+    messages: list,
+    on_field: Optional[Callable[[str, Any], None]] = None,
+    cancel: Optional[threading.Event] = None,
+):
+    """
+    LLM 응답을 스트리밍으로 받아 JSON 객체로 점진 파싱
+
+    - 최상위 필드가 완성될 때마다 on_field(key, value) 호출
+    - 형식 오류가 감지되면 즉시 스트림을 중단하고 MalformedJSONError 발생
+    - JSON 객체가 완성되면 나머지 토큰은 받지 않고 종료
+
+    Args:
+        llm: LangChain Chat 모델
+        messages (list): LLM 입력 메시지
+        on_field (Callable): 필드 완성 콜백
+        cancel (threading.Event): 설정되면 스트림 중단 (hedged 호출 패배/데드라인 초과/작업 취소)
+
+    Returns:
+        tuple[AIMessage, Any]: (응답 메시지, 파싱된 JSON)
+
+    Raises:
+        MalformedJSONError: JSON 형식 오류 (response 속성에 지금까지의 응답 포함)
+        CallCancelled: cancel 이벤트로 중단된 경우
+    """
+    parser = StreamingJSONParser()
+    stream = llm.stream(messages)
+
+    try:
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                raise CallCancelled()
+            for key, value in parser.feed(chunk.content):
+                if on_field:
+                    on_field(key, value)
+            if parser.done:
+                break
+        parsed = parser.close()
+    except ValueError as e:
+        e.response = AIMessage(content=parser.buffer)
+        raise
+    finally:
+        # 조기 종료 시 업스트림 연결 정리
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+
+    return AIMessage(content=parser.buffer), parsed
+
+
+def stream_text(llm, messages: list, cancel: Optional[threading.Event] = None) -> AIMessage:
+    """
+    LLM 텍스트 응답을 스트리밍으로 수신 (파서가 전체 텍스트를 받아야 하는 호출용)
+
+    invoke 대신 스트리밍으로 받아 청크마다 cancel 이벤트를 확인하므로
+    작업 취소/hedged 호출 패배 시 응답이 끝날 때까지 업스트림 슬롯을 붙잡지 않음
+
+    Args:
+        llm: LangChain Chat 모델
+        messages (list): LLM 입력 메시지
+        cancel (threading.Event): 설정되면 스트림 중단
+
+    Returns:
+        AIMessage: 전체 응답 메시지
+
+    Raises:
+        CallCancelled: cancel 이벤트로 중단된 경우
+    """
+    parts = []
+    stream = llm.stream(messages)
+
+    try:
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                raise CallCancelled()
+            parts.append(chunk.content)
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+
+    return AIMessage(content="".join(parts))
+
+
+def invoke_tiered(
+    node_name: str,
+    messages: list,
+    temperature: float = 0.7,
+    parse: Optional[Callable[[str], Any]] = None,
+    needs_escalation: Optional[Callable[[Any], bool]] = None,
+    on_field: Optional[Callable[[str, Any], None]] = None,
+    deadline_at: Optional[float] = None,
+    priority: str = "interactive",
+    profile_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+) -> TieredResult:
+    """
+    노드의 티어 순서대로 LLM 호출 (필요할 때만 상위 티어로 승격)
+
+    Args:
+        node_name (str): 티어 정책을 조회할 노드 이름
+        messages (list): LLM 입력 메시지
+        temperature (float): Temperature 설정
+        parse (Callable): 텍스트 응답 파서 (ValueError 발생 시 승격)
+            None이면 JSON 응답을 스트리밍으로 파싱
+        needs_escalation (Callable): 파싱 결과를 보고 승격 여부 판단
+        on_field (Callable): JSON 스트리밍 시 최상위 필드 완성 콜백
+            (승격되면 상위 티어의 필드를 다시 전달, 완성 시점은 콜백과 무관하게 프로파일 세션에 기록됨)
+        deadline_at (float): 노드 마감 시각 (resilience.node_deadline)
+        priority (str): 업스트림 대기열 우선순위 ("interactive" | "batch")
+        profile_id (str): 프로파일 세션 ID (hedged 호출 스레드도 노드 이름으로 샘플링)
+        job_id (str): 비동기 작업 ID (작업이 취소되면 진행 중인 호출을 중단하고 RequestCancelled)
+
+    Returns:
+        TieredResult: 마지막으로 응답한 티어의 결과
+            (모든 티어에서 파싱 실패 시 parsed는 None, tokens는 모든 시도의 합계)
+
+    Raises:
+        UpstreamUnavailable: 데드라인 초과 또는 모든 티어의 업스트림 장애
+        AdmissionRejected: 업스트림 대기열 초과 (API에서 429/503으로 응답)
+        RequestCancelled: 비동기 작업 취소 (승격하지 않고 즉시 전파)
+    """
+    tiers = get_node_tiers(node_name)
+    abort = get_cancel_event(job_id)
+    result = None
+    unavailable = None
+    meter = TokenMeter()
+
+    def field_emitter(tier: str):
+        """
+        티어 한 번의 필드 완성 콜백
+
+        같은 티어의 hedged 호출이 같은 필드를 두 번 내보내지 않도록 중복 제거
+        (승격되면 상위 티어의 필드를 다시 내보내고, 승격 후 늦게 도착한 하위 티어 필드는 버림)
+        """
+        emitted = set()
+
+        def emit(key, value):
+            if tier != current_tier or key in emitted:
+                return
+            emitted.add(key)
+            # 프로파일 중인 요청은 필드별 완성 시점을 기록 (time-to-first-field, 승격 시 상위 티어 시점으로 갱신)
+            record_field(profile_id, node_name, key)
+            print(f"📡 [{node_name}] {tier} {key} 수신 완료")
+            if on_field:
+                on_field(key, value)
+
+        return emit
+
+    current_tier = None
+    for index, (tier, model) in enumerate(tiers):
+        is_last = index == len(tiers) - 1
+        current_tier = tier
+        emit = field_emitter(tier)
+
+        def attempt(cancel, model=model, emit=emit):
+            response = None
+            with profile_thread(profile_id, node_name):
+                try:
+                    llm = build_chat_model(
+                        model=model,
+                        temperature=temperature,
+                        timeout=remaining_seconds(deadline_at),
+                    )
+                    if parse is None:
+                        response, parsed = stream_json(llm, messages, on_field=emit, cancel=cancel)
+                        return response, parsed
+
+                    response = stream_text(llm, messages, cancel=cancel)
+                    try:
+                        return response, parse(response.content)
+                    except ValueError as e:
+                        e.response = response
+                        raise
+                except ValueError as e:
+                    response = getattr(e, "response", None)
+                    raise
+                finally:
+                    meter.record(model, messages, response)
+
+        try:
+            response, parsed = call_with_resilience(
+                model, attempt, deadline_at=deadline_at, priority=priority, abort=abort
+            )
+        except ValueError as e:
+            # MalformedJSONError / 파서 검증 오류
+            print(f"⚠️  [{node_name}] {tier}({model}) 출력 파싱 실패: {str(e)}")
+            result = TieredResult(getattr(e, "response", None), None, tier, model, meter.summary())
+            if not is_last:
+                print(f"⬆️  [{node_name}] 상위 티어로 승격")
+            continue
+        except RequestCancelled:
+            print(f"🛑 [{node_name}] {tier}({model}) 작업 취소로 호출 중단")
+            raise
+        except DeadlineExceeded:
+            # 남은 시간이 없으므로 다른 티어도 시도하지 않음
+            print(f"⏱️  [{node_name}] {tier}({model}) 데드라인 초과")
+            raise
+        except UpstreamUnavailable as e:
+            print(f"⚠️  [{node_name}] {tier}({model}) 업스트림 사용 불가: {str(e)}")
+            unavailable = e
+            continue
+
+        result = TieredResult(response, parsed, tier, model, meter.summary())
+        if not is_last and needs_escalation and needs_escalation(parsed):
+            print(f"⬆️  [{node_name}] {tier}({model}) 결과 신뢰도 부족, 상위 티어로 승격")
+            continue
+
+        break
+
+    if result is None:
+        raise unavailable
+
+    # hedged 호출의 패배 쪽이 늦게 기록될 수 있으므로 반환 시점의 합계로 갱신
+    result = result._replace(tokens=meter.summary())
+    print(f"🏷️  [{node_name}] served by tier={result.tier} ({result.model}), "
+          f"tokens in={result.tokens['input']} out={result.tokens['output']}")
+    return result
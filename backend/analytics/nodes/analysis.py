@@ -2,12 +2,124 @@
 Analysis Path Nodes
 
 버스 데이터를 로드하고 차트 타입을 선택한 후 분석을 수행하는 노드들
+(차트 생성과 인사이트 작성은 병렬 분기로 실행되어 merge_analytic에서 합쳐짐)
 """
-import json
-import os
 from analytics.types.state_types import AnalyticsState
-from config import build_chat_model
-from langchain_core.messages import SystemMessage
+from analytics.charts.downsample import downsample_line_chart
+from analytics.data.anomalies import anomaly_chart, find_anomalies, match_anomaly_question
+from analytics.data.anomalies import to_prompt_text as anomaly_prompt_text
+from analytics.data.snapshot import get_snapshot
+from analytics.data.sql_store import SCHEMA_DESCRIPTION, format_result, get_sql_store
+from analytics.data.stats import match_stats_view
+from analytics.data.tables import create_table, describe_sources, read_page
+from analytics.llm.admission import AdmissionRejected
+from analytics.llm.resilience import RequestCancelled, UpstreamUnavailable
+from analytics.llm.tiered import call_options, invoke_tiered
+from analytics.nodes.degraded import DEGRADED_TIER, select_chart_type_locally, summarize_locally
+from analytics.nodes.session import REUSED_TIER, conversation_context, is_follow_up
+from config import LINE_CHART_ENVELOPE, LINE_CHART_MAX_POINTS, SQL_MAX_ROWS, SQL_QUERY_ENABLED
+from langchain_core.messages import HumanMessage, SystemMessage
+
+VALID_CHART_TYPES = ("line_chart", "bar_chart", "table", "text_summary")
+
+# 노선 경제성 지표(1인당 비용, km당 비용, 이용률)를 프롬프트에 포함하는 질문 키워드
+_ECONOMICS_KEYWORDS = ("효율", "비용", "단가", "1인당", "인당", "km", "이용률", "수익", "통합", "폐지", "시나리오")
+
+# generate_chart / generate_insights 병렬 분기 (merge_analytic에서 합쳐짐)
+ANALYTIC_BRANCHES = ("generate_chart", "generate_insights")
+
+# 분기가 예외로 결과를 만들지 못한 경우의 티어 기록 (다른 분기의 결과만 부분 응답으로 반환)
+FAILED_TIER = {"tier": "failed", "model": None}
+
+# generate_insights의 output format (차트는 generate_chart가 따로 만들므로 인사이트만 작성)
+_INSIGHTS_OUTPUT_FORMAT = """
+{
+    "insights": [
+        "출근3호 노선이 36명으로 가장 많은 승차 인원을 기록했으며, 이는 전체 승차 인원의 약 23%에 해당합니다.",
+        "퇴근 노선은 모두 17:15에 출발하며 해당 시간대의 승차 인원이 60명으로 가장 많습니다.",
+        "1인당 운행비는 노선별로 약 3,900원에서 6,000원까지 분포하여 이용 인원이 적은 노선의 효율이 낮습니다."
+    ],
+    "reason": "분석 결과 설명"
+}
+
+chart_data는 서버가 따로 생성하므로 출력하지 마세요.
+"""
+
+# generate_chart의 차트별 output format (text_summary는 차트가 없으므로 LLM 호출 없음)
+_CHART_OUTPUT_FORMATS = {
+    "line_chart": """
+{
+    "chart_data": {
+        "labels": ["January", "February", "March", ...],
+        "datasets": [{
+            "label": "Dataset Label",
+            "data": [65, 59, 80, ...],
+            "borderColor": "rgb(75, 192, 192)",
+            "tension": 0.1
+        }]
+    }
+}
+    """,
+    "bar_chart": """
+{
+    "chart_data": {
+        "labels": ["노선1", "노선2", ...],
+        "datasets": [{
+            "label": "운행단가",
+            "data": [73000, 68000, ...],
+            "backgroundColor": "rgba(59, 130, 246, 0.6)",
+            "borderColor": "rgb(59, 130, 246)",
+            "borderWidth": 1
+        }]
+    }
+}
+    """,
+    "table": """
+{
+    "table_query": {
+        "source": "routes",
+        "route": null,
+        "sort_by": "승차인원",
+        "descending": true
+    }
+}
+
+table_query 작성 규칙 (행 데이터는 서버가 직접 계산하므로 rows를 출력하지 마세요):
+- source: 아래 테이블 소스 중 질문에 맞는 하나
+""" + describe_sources() + """
+- route: 특정 노선만 보여줄 때 노선명 (전체면 null)
+- sort_by: 정렬할 컬럼명 (정렬 불필요 시 null), descending: 내림차순 여부
+    """,
+}
+
+
+def _parse_chart_type(content: str) -> str:
+    """차트 타입 응답 검증 (유효하지 않으면 ValueError → 상위 티어로 승격)"""
+    chart_type = content.strip()
+    if chart_type not in VALID_CHART_TYPES:
+        raise ValueError(f"Invalid chart type: {chart_type}")
+    return chart_type
+
+
+def _fit_chart(state: AnalyticsState, chart_type: str, chart_data, snapshot=None, table_query=None) -> dict:
+    """
+    차트 데이터를 응답 크기에 맞게 정리
+
+    - line_chart: 요청의 포인트 예산(max_points)으로 다운샘플링
+    - table: 로컬 데이터로 계산한 테이블 핸들 + 첫 페이지 + 전체 행 수 (나머지는 /api/tables/{id})
+    """
+    if chart_type == "table" and snapshot is not None:
+        page = read_page(create_table(snapshot, table_query))
+        print(f"📋 table handle: {page['source']} {page['total_count']}행 (첫 페이지 {len(page['rows'])}행)")
+        return {"chart_data": page}
+    if chart_type != "line_chart":
+        return {"chart_data": chart_data}
+
+    max_points = state.get("max_points") or LINE_CHART_MAX_POINTS
+    chart_data, info = downsample_line_chart(chart_data, max_points, envelope=LINE_CHART_ENVELOPE)
+    if info:
+        print(f"📉 line_chart downsampled: {info['original_points']} → {info['points']} points")
+    return {"chart_data": chart_data, "chart_downsampling": info}
 
 
 def get_bus_data(state: AnalyticsState):
@@ -17,45 +129,51 @@ def get_bus_data(state: AnalyticsState):
     - 승하차정보.json
     - 통근수당.json
 
+    데이터는 공유 스냅샷에 한 번만 로드되어 있으므로 state에는 스냅샷 버전만 기록
+
     Args:
         state (AnalyticsState): 현재 그래프의 상태
 
     Returns:
-        dict: 업데이트할 상태 {"transport_data": "...", "commute_allowance_data": "..."}
+        dict: 업데이트할 상태 {"data_version": "..."} (실패 시 {"data_error": "..."})
     """
     try:
-        # 파일 경로 설정 (프로젝트 루트 기준)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+        snapshot = get_snapshot(state.get("data_version"), state.get("tenant_id"))
+
+        print(f"✅ 승하차 정보 {len(snapshot.transport_records)}건 로드 완료")
+        print(f"✅ 통근 수당 정보 {len(snapshot.commute_records)}건 로드 완료")
+
+        return {"data_version": snapshot.version}
+    except Exception as e:
+        error_msg = f"❌ 버스 데이터 로드 중 오류: {str(e)}"
+        print(error_msg)
+        return {"data_error": error_msg}
 
-        transport_path = os.path.join(project_root, "data", "승하차정보.json")
-        commute_path = os.path.join(project_root, "data", "통근수당.json")
 
-        print(f"📂 Loading transport data from: {transport_path}")
-        print(f"📂 Loading commute data from: {commute_path}")
+def detect_anomalies(state: AnalyticsState):
+    """
+    이상 패턴 질문이면 구간별 이상치 판정 (LangGraph Node, LLM 호출 없음)
 
-        # 승하차 정보 로드
-        with open(transport_path, 'r', encoding='utf-8') as f:
-            transport_data = json.load(f)
+    승하차 저장소의 증분 통계(구간별 이동 평균/분산)로 최근 운행일을 판정하고,
+    이력이 없으면 스냅샷의 노선 내 정류장 비교로 판정
+    결과(이상 구간 + 하이라이트할 엣지 ID)는 응답의 anomalies로 전달되고
+    generate_chart / generate_insights는 원본 데이터 대신 이 결과로 차트와 인사이트를 작성
 
-        # 통근 수당 로드
-        with open(commute_path, 'r', encoding='utf-8') as f:
-            commute_data = json.load(f)
+    Args:
+        state (AnalyticsState): 현재 그래프의 상태
 
-        print(f"✅ 승하차 정보 {len(transport_data)}건 로드 완료")
-        print(f"✅ 통근 수당 정보 {len(commute_data)}건 로드 완료")
+    Returns:
+        dict: 업데이트할 상태 {"anomalies": {"method", "history_days", "segments", "edges"} | None}
+    """
+    user_question = state.get("question") or state["messages"][-1].content
+    if state.get("data_error") or not match_anomaly_question(user_question):
+        return {"anomalies": None}
 
-        return {
-            "transport_data": json.dumps(transport_data, ensure_ascii=False),
-            "commute_allowance_data": json.dumps(commute_data, ensure_ascii=False)
-        }
-    except Exception as e:
-        error_msg = f"❌ 버스 데이터 로드 중 오류: {str(e)}"
-        print(error_msg)
-        return {
-            "transport_data": "[]",
-            "commute_allowance_data": "[]"
-        }
+    snapshot = get_snapshot(state.get("data_version"), state.get("tenant_id"))
+    result = find_anomalies(snapshot)
+    print(f"🚨 detect_anomalies ({result['method']}): 이상 구간 {len(result['segments'])}개, "
+          f"엣지 {len(result['edges'])}개")
+    return {"anomalies": result}
 
 
 def chart_type_selector(state: AnalyticsState):
@@ -73,9 +191,18 @@ def chart_type_selector(state: AnalyticsState):
     - bar_chart: 비교, 순위, 노선별 비교
     - table: 상세 데이터, 전체 목록
     - text_summary: 요약, 설명
+
+    후속 질문이 차트 종류를 따로 지정하지 않으면 직전 턴의 차트 타입을 재사용
     """
-    user_message = state["messages"][-1]
-    user_question = user_message.content if hasattr(user_message, 'content') else str(user_message)
+    user_question = state.get("question") or state["messages"][-1].content
+
+    last_chart_type = (state.get("last_turn") or {}).get("chart_type")
+    if last_chart_type and is_follow_up(state) and select_chart_type_locally(user_question) == "text_summary":
+        print(f"📊 Chart Type Selected (follow-up): {last_chart_type}")
+        return {
+            "chart_type": last_chart_type,
+            "model_tiers": {"chart_type_selector": REUSED_TIER}
+        }
 
     system_prompt = """
 당신은 차트 타입 선택 전문가입니다.
@@ -105,123 +232,322 @@ def chart_type_selector(state: AnalyticsState):
 
     messages = [
         SystemMessage(content=system_prompt),
-        user_message
+        HumanMessage(content=user_question)
     ]
 
-    # LLM 호출
-    llm = build_chat_model(temperature=0.3)
-    response = llm.invoke(messages)
-
-    chart_type = response.content.strip()
+    # LLM 호출 (저비용 티어부터, 잘못된 차트 타입이면 승격)
+    try:
+        served = invoke_tiered(
+            "chart_type_selector",
+            messages,
+            temperature=0.3,
+            parse=_parse_chart_type,
+            **call_options(state, "chart_type_selector"),
+        )
+    except UpstreamUnavailable as e:
+        # 업스트림 장애/데드라인 초과 시 키워드 기반 선택
+        chart_type = select_chart_type_locally(user_question)
+        print(f"🛟 Chart Type Selected (degraded): {chart_type} ({str(e)})")
+        return {
+            "chart_type": chart_type,
+            "degraded": True,
+            "model_tiers": {"chart_type_selector": DEGRADED_TIER}
+        }
+    response = served.response
 
     # 유효성 검증
-    valid_types = ["line_chart", "bar_chart", "table", "text_summary"]
-    if chart_type not in valid_types:
-        print(f"⚠️  Invalid chart type: {chart_type}, defaulting to text_summary")
+    chart_type = served.parsed
+    if chart_type is None:
+        print(f"⚠️  Invalid chart type: {response.content.strip()}, defaulting to text_summary")
         chart_type = "text_summary"
 
     print(f"📊 Chart Type Selected: {chart_type}")
 
     return {
         "chart_type": chart_type,
-        "messages": state["messages"] + [response]
+        "messages": [response],
+        "model_tiers": {"chart_type_selector": served.tier_record()}
     }
 
 
-def generate_analytic(state: AnalyticsState):
+def chart_router(state: AnalyticsState) -> str:
+    """
+    이상 탐지 후 다음 노드 결정 (LangGraph Conditional Edge)
+
+    클라이언트가 차트 타입을 지정했으면 chart_type_selector를 건너뛰고 바로 조회
+
+    Args:
+        state (AnalyticsState): 현재 그래프의 상태
+
+    Returns:
+        str: "query_data" | "chart_type_selector"
+    """
+    if state.get("chart_type") in VALID_CHART_TYPES:
+        print(f"📊 Chart Type Selected (hinted): {state['chart_type']}")
+        return "query_data"
+    return "chart_type_selector"
+
+
+def query_data(state: AnalyticsState):
     """
-    Solar Pro2를 사용하여 데이터 분석 및 차트 데이터 생성 (LangGraph Node)
+    질문에 필요한 데이터만 SQL로 조회 (LangGraph Node)
+
+    LLM은 스키마 설명만 보고 읽기 전용 SQL을 작성하고, 쿼리는 로컬 SQLite에서 실행되어
+    결과 행만 generate_chart / generate_insights 프롬프트에 들어감 (데이터 크기와 무관하게 프롬프트 크기 일정)
+    검증/실행에 실패한 SQL은 상위 티어로 승격하고, 모두 실패하면 기존처럼 원본 데이터로 분석
 
     Args:
         state (AnalyticsState): 현재 그래프의 상태
 
     Returns:
-        dict: 업데이트할 상태 {"chart_data": {...}, "analysis_result": "...", "messages": [...]}
+        dict: 업데이트할 상태 {"query_result": {"sql", "columns", "rows", "row_count", "truncated"} | None}
+
+    table 차트(테이블 핸들), 표준 통계 질문(집계 뷰), 이상 패턴 질문(detect_anomalies)은
+    이미 로컬에서 계산하므로 조회하지 않음
     """
-    user_question = state["messages"][0].content if hasattr(state["messages"][0], 'content') else str(state["messages"][0])
+    user_question = state.get("question") or state["messages"][-1].content
     chart_type = state.get("chart_type", "text_summary")
-    transport_data = state.get("transport_data", "")
-    commute_data = state.get("commute_allowance_data", "")
 
-    print(f"🔬 Generating analytics for: {chart_type}")
+    if not SQL_QUERY_ENABLED or state.get("data_error") or chart_type == "table" or state.get("anomalies"):
+        return {"query_result": None}
 
-    # 차트별 output format 정의
-    output_formats = {
-        "line_chart": """
-{
-    "chart_data": {
-        "labels": ["January", "February", "March", ...],
-        "datasets": [{
-            "label": "Dataset Label",
-            "data": [65, 59, 80, ...],
-            "borderColor": "rgb(75, 192, 192)",
-            "tension": 0.1
-        }]
-    },
-    "insights": [
-        "1월부터 3월까지 데이터가 지속적으로 상승하는 추세를 보이며, 특히 2월에 가장 큰 증가폭을 기록했습니다.",
-        "전체 기간 동안 평균 70 수준을 유지하고 있으며, 계절적 변동성이 관찰됩니다.",
-        "향후 이러한 상승 추세가 계속될 것으로 예상되며, 4월에는 85를 넘어설 가능성이 있습니다."
-    ],
-    "reason": "분석 결과 설명"
-}
-        """,
-        "bar_chart": """
-{
-    "chart_data": {
-        "labels": ["노선1", "노선2", ...],
-        "datasets": [{
-            "label": "운행단가",
-            "data": [73000, 68000, ...],
-            "backgroundColor": "rgba(59, 130, 246, 0.6)",
-            "borderColor": "rgb(59, 130, 246)",
-            "borderWidth": 1
-        }]
-    },
-    "insights": [
-        "출근1호 노선이 73,000원으로 가장 높은 운행단가를 기록했으며, 이는 평균 대비 약 15% 높은 수준입니다.",
-        "노선별 운행단가 편차가 크게 나타나고 있으며, 가장 높은 노선과 낮은 노선 간 약 20,000원의 차이를 보입니다.",
-        "운행단가가 높은 노선들은 주로 장거리 운행 구간을 포함하고 있어 연료비와 시간 비용이 많이 발생하는 것으로 분석됩니다."
-    ],
-    "reason": "분석 결과 설명"
-}
-        """,
-        "table": """
-{
-    "chart_data": {
-        "columns": ["노선명", "운행단가", "지급수당"],
-        "rows": [
-            ["출근1호-한국대서문", 73000, 10000],
-            ["출근2호-한국전자기술연구원", 68000, 10000],
-            ...
-        ]
-    },
-    "insights": [
-        "전체 8개 노선 중 출퇴근 노선이 6개로 대부분을 차지하며, 모든 노선의 지급수당은 동일하게 10,000원으로 책정되어 있습니다.",
-        "운행단가는 노선의 거리와 소요 시간에 비례하여 책정되며, 최소 53,000원부터 최대 73,000원까지 분포하고 있습니다.",
-        "평균 운행단가는 약 65,000원 수준이며, 출근 노선이 퇴근 노선보다 평균적으로 약 5,000원 더 높은 것으로 나타났습니다."
-    ],
-    "reason": "분석 결과 설명"
-}
-        """,
-        "text_summary": """
-{
-    "chart_data": null,
-    "insights": [
-        "전체 데이터를 분석한 결과, 주요 패턴과 트렌드가 명확하게 나타났으며 예상 범위 내에서 움직이고 있습니다.",
-        "특정 구간에서 이상치가 발견되었으나 전체적인 데이터 품질은 양호하며, 추가적인 조사가 필요한 부분은 제한적입니다.",
-        "향후 지속적인 모니터링을 통해 추세 변화를 감지하고, 필요시 개선 조치를 취하는 것이 권장됩니다."
-    ],
-    "reason": "상세 분석 결과 텍스트"
-}
-        """
-    }
+    snapshot = get_snapshot(state.get("data_version"), state.get("tenant_id"))
+    if match_stats_view(user_question, snapshot):
+        return {"query_result": None}
+
+    store = get_sql_store(snapshot)
 
     system_prompt = f"""
-교통 데이터: {transport_data}
+당신은 SQLite 쿼리 작성 전문가입니다.
+{conversation_context(state)}
+사용자 질문에 답하고 {chart_type}을(를) 그리는 데 필요한 데이터만 조회하는 SQLite 쿼리를 작성하세요.
+
+스키마:
+{SCHEMA_DESCRIPTION}
+규칙:
+1. SELECT 또는 WITH로 시작하는 쿼리 하나만 작성 (INSERT / UPDATE / DELETE / PRAGMA 금지)
+2. 원본 행을 그대로 나열하지 말고 GROUP BY와 SUM / COUNT / AVG로 집계
+3. 차트 라벨이 될 컬럼을 첫 번째에, 값 컬럼을 그 뒤에 배치
+4. 결과는 {SQL_MAX_ROWS}행 이하
+5. 승차 인원은 direction = '승차', 하차 인원은 direction = '하차' 조건으로 합계
+
+응답: SQL만 출력 (설명, 코드 블록 금지)
+"""
+
+    # 잘못된 SQL (검증 실패, 권한 없는 동작, 실행 오류)은 ValueError → 상위 티어로 승격
+    try:
+        served = invoke_tiered(
+            "query_data",
+            [SystemMessage(content=system_prompt), HumanMessage(content=user_question)],
+            temperature=0.1,
+            parse=store.execute,
+            **call_options(state, "query_data"),
+        )
+    except UpstreamUnavailable as e:
+        print(f"🛟 query_data degraded: {str(e)}")
+        return {"query_result": None, "degraded": True, "model_tiers": {"query_data": DEGRADED_TIER}}
+
+    result = served.parsed
+    if result is None:
+        print("⚠️  SQL 생성 실패, 원본 데이터로 분석")
+    else:
+        print(f"🗄️  query_data: {result['row_count']}행" + (" (truncated)" if result["truncated"] else ""))
+        print(f"   SQL: {result['sql']}")
+
+    # SQL 응답은 대화 기록(messages)에 남기지 않음 (다음 턴 프롬프트에 불필요)
+    return {"query_result": result, "model_tiers": {"query_data": served.tier_record()}}
+
+
+def _analysis_context(state: AnalyticsState) -> dict:
+    """
+    generate_chart / generate_insights가 공유하는 분석 입력
+
+    이상 패턴 질문은 이상 구간, 표준 통계 질문은 미리 계산된 집계 뷰 재사용
+    (원본 JSON 대신 로컬에서 계산한 결과만 프롬프트에 포함하고 차트도 로컬에서 생성)
+    query_data가 SQL 조회 결과를 만들었으면 원본 데이터 대신 결과 행만 프롬프트에 포함
+
+    Returns:
+        dict: {"question", "chart_type", "snapshot", "anomalies", "stats_view", "data_context"}
+    """
+    user_question = state.get("question") or state["messages"][-1].content
+
+    # 공유 스냅샷의 직렬화된 데이터 참조 (로드 실패 시 빈 데이터)
+    snapshot = None if state.get("data_error") else get_snapshot(state.get("data_version"), state.get("tenant_id"))
+
+    anomalies = state.get("anomalies")
+    stats_view = match_stats_view(user_question, snapshot) if snapshot is not None and not anomalies else None
+    query_result = state.get("query_result")
+    if anomalies:
+        data_context = f"""
+이상 구간 판정 결과 (로컬에서 계산한 정확한 값, 수치는 이 값을 그대로 사용, 이상 구간이 0개면 특이사항 없음):
+{anomaly_prompt_text(anomalies)}
+"""
+    elif stats_view:
+        data_context = f"""
+집계 통계 (미리 계산된 정확한 값, 수치는 이 값을 그대로 사용):
+{snapshot.stats.to_prompt_text(stats_view)}
+"""
+    elif query_result:
+        data_context = f"""
+조회 결과 (로컬 데이터베이스에서 SQL로 계산한 정확한 값, 수치는 이 값을 그대로 사용):
+{format_result(query_result)}
+"""
+    else:
+        data_context = f"""
+교통 데이터: {snapshot.transport_json if snapshot is not None else "[]"}
+
+통근 수당 데이터: {snapshot.commute_json if snapshot is not None else "[]"}
+"""
+
+    return {
+        "question": user_question,
+        "chart_type": state.get("chart_type") or "text_summary",
+        "snapshot": snapshot,
+        "anomalies": anomalies,
+        "stats_view": stats_view,
+        "data_context": data_context,
+    }
+
+
+def _local_summary(context: dict) -> dict:
+    """업스트림 장애/데드라인 초과 시 로컬 집계 결과 (summarize_locally)"""
+    snapshot = context["snapshot"]
+    return summarize_locally(
+        snapshot.transport_records if snapshot is not None else [],
+        snapshot.commute_records if snapshot is not None else [],
+        context["chart_type"],
+    )
+
+
+def _chart_needs_escalation(chart_type: str):
+    """차트 JSON에 chart_data(labels/datasets) 또는 table_query가 없으면 승격"""
+    def needs_escalation(result) -> bool:
+        if not isinstance(result, dict):
+            return True
+        if chart_type == "table":
+            return not isinstance(result.get("table_query"), dict)
+        chart_data = result.get("chart_data")
+        return not (
+            isinstance(chart_data, dict)
+            and isinstance(chart_data.get("labels"), list)
+            and isinstance(chart_data.get("datasets"), list)
+        )
+    return needs_escalation
+
+
+def generate_chart(state: AnalyticsState):
+    """
+    차트 데이터 생성 (LangGraph Node, generate_insights와 병렬 실행)
+
+    Args:
+        state (AnalyticsState): 현재 그래프의 상태
+
+    Returns:
+        dict: 업데이트할 상태 {"chart_data": {...} | None, "chart_downsampling": {...}, "model_tiers": {...}}
+
+    - text_summary: 차트 없음 (LLM 호출 없음)
+    - 이상 구간 / 표준 통계 질문: 로컬에서 계산한 차트 (LLM 호출 없음)
+    - table: 저비용 티어가 조회 조건(table_query)만 고르고 행은 로컬 데이터에서 페이지 단위로 제공
+    - line_chart / bar_chart: 저비용 티어가 chart_data만 작성 (형식이 잘못되면 승격)
+      line_chart는 요청의 max_points 이하로 다운샘플링 (LTTB + min/max envelope)
+    업스트림 장애/데드라인 초과 시 로컬 집계 차트, 그 밖의 오류는 차트 없이 인사이트만 반환 (merge_analytic)
+    """
+    context = _analysis_context(state)
+    chart_type = context["chart_type"]
+    snapshot = context["snapshot"]
+
+    if chart_type == "text_summary":
+        return {"chart_data": None}
+
+    if context["anomalies"]:
+        local_chart = anomaly_chart(context["anomalies"], chart_type)
+    else:
+        local_chart = snapshot.stats.chart(context["stats_view"], chart_type) if context["stats_view"] else None
+    if local_chart is not None:
+        print(f"📊 generate_chart: 로컬 차트 ({'anomalies' if context['anomalies'] else context['stats_view']})")
+        return _fit_chart(state, chart_type, local_chart, snapshot)
+
+    # table은 행을 서버가 계산하므로 데이터 없이 조회 조건만 요청
+    data_context = "" if chart_type == "table" else context["data_context"]
+    system_prompt = f"""{data_context}
+사용자 질문: {context["question"]}
+선택된 차트: {chart_type}
+
+위 데이터로 질문에 답하는 차트 데이터를 아래 JSON 형식으로만 출력하세요.
+```json 감싸지 말고 순수 JSON만 출력. 설명이나 인사이트는 쓰지 마세요.
+
+Output Format:
+{_CHART_OUTPUT_FORMATS[chart_type]}
+"""
+
+    try:
+        served = invoke_tiered(
+            "generate_chart",
+            [SystemMessage(content=system_prompt)],
+            temperature=0.2,
+            needs_escalation=_chart_needs_escalation(chart_type),
+            **call_options(state, "generate_chart"),
+        )
+    except UpstreamUnavailable as e:
+        print(f"🛟 generate_chart degraded: {str(e)}")
+        return {
+            **_fit_chart(state, chart_type, _local_summary(context)["chart_data"], snapshot),
+            "model_tiers": {"generate_chart": DEGRADED_TIER}
+        }
+    except (RequestCancelled, AdmissionRejected):
+        raise
+    except Exception as e:
+        print(f"❌ generate_chart failed: {str(e)}")
+        return {"chart_data": None, "model_tiers": {"generate_chart": {**FAILED_TIER, "error": str(e)}}}
+
+    result = served.parsed if isinstance(served.parsed, dict) else {}
+    if _chart_needs_escalation(chart_type)(result) and chart_type != "table":
+        print("⚠️  차트 JSON 파싱 실패, 로컬 집계 차트 사용")
+        result = {"chart_data": _local_summary(context)["chart_data"]}
+
+    print(f"📊 generate_chart 완료: {chart_type}")
+
+    # 차트 JSON은 대화 기록(messages)에 남기지 않음 (다음 턴 프롬프트에 불필요)
+    return {
+        **_fit_chart(state, chart_type, result.get("chart_data"), snapshot, result.get("table_query")),
+        "model_tiers": {"generate_chart": served.tier_record()}
+    }
+
+
+def generate_insights(state: AnalyticsState):
+    """
+    Solar Pro2(노드 티어 정책)를 사용하여 인사이트와 분석 설명 작성 (LangGraph Node, generate_chart와 병렬 실행)
+
+    Args:
+        state (AnalyticsState): 현재 그래프의 상태
+
+    Returns:
+        dict: 업데이트할 상태 {"insights": [...], "analysis_result": "...", "messages": [...], "model_tiers": {...}}
+
+    차트 JSON을 함께 쓰지 않으므로 출력이 짧고, 차트 생성 지연과 무관하게 완료됨
+    표준 통계 질문은 원본 데이터 대신 집계 결과, 이상 패턴 질문은 이상 구간 판정 결과로 작성
+    업스트림 장애/데드라인 초과 시 로컬 집계 요약, 그 밖의 오류는 인사이트 없이 차트만 반환 (merge_analytic)
+    """
+    context = _analysis_context(state)
+    user_question = context["question"]
+    chart_type = context["chart_type"]
+    snapshot = context["snapshot"]
+
+    if context["stats_view"]:
+        print(f"📊 Stats view reused: {context['stats_view']}")
+
+    # 효율/비용 질문은 로컬 엔진이 계산한 정확한 지표를 함께 제공
+    economics_context = ""
+    if snapshot is not None and any(keyword in user_question.lower() for keyword in _ECONOMICS_KEYWORDS):
+        economics_context = f"""
+노선별 경제성 지표 (미리 계산된 정확한 값, 수치는 이 값을 그대로 사용):
+{snapshot.economics.to_prompt_text()}
+"""
 
-통근 수당 데이터: {commute_data}
+    print(f"🔬 Generating insights for: {chart_type}")
 
+    system_prompt = f"""{context["data_context"]}{economics_context}
+{conversation_context(state)}
 사용자 질문: {user_question}
 선택된 차트: {chart_type}
 
@@ -235,38 +561,85 @@ def generate_analytic(state: AnalyticsState):
 4. "핵심 통찰 1:", "•" 같은 불릿 포인트나 번호는 사용하지 마세요.
 
 Output Format:
-{output_formats[chart_type]}
+{_INSIGHTS_OUTPUT_FORMAT}
 """
 
-    # Solar Pro2 LLM 호출
-    llm = build_chat_model(model="solar-pro2", temperature=0.5)
-    response = llm.invoke([SystemMessage(content=system_prompt)])
-
+    # LLM 호출 (노드 티어 정책, 기본 Solar Pro2 / JSON 오류 시 승격)
     try:
-        # JSON 파싱
-        content = response.content.strip()
-
-        # ```json 블록 제거
-        if content.startswith("```json"):
-            content = content.replace("```json", "").replace("```", "").strip()
-        elif content.startswith("```"):
-            content = content.replace("```", "").strip()
+        served = invoke_tiered(
+            "generate_insights",
+            [SystemMessage(content=system_prompt)],
+            temperature=0.5,
+            **call_options(state, "generate_insights"),
+        )
+    except UpstreamUnavailable as e:
+        print(f"🛟 generate_insights degraded: {str(e)}")
+        result = _local_summary(context)
+        return {
+            "analysis_result": result["reason"],
+            "insights": result["insights"],
+            "model_tiers": {"generate_insights": DEGRADED_TIER}
+        }
+    except (RequestCancelled, AdmissionRejected):
+        raise
+    except Exception as e:
+        print(f"❌ generate_insights failed: {str(e)}")
+        return {"model_tiers": {"generate_insights": {**FAILED_TIER, "error": str(e)}}}
+    response = served.response
+    model_tiers = {"generate_insights": served.tier_record()}
 
-        result = json.loads(content)
+    if isinstance(served.parsed, dict):
+        result = served.parsed
 
         print(f"✅ 분석 완료")
         print(f"   - insights: {len(result.get('insights', []))}개")
 
         return {
-            "chart_data": result.get("chart_data"),
             "analysis_result": result.get("reason", ""),
             "insights": result.get("insights", []),
-            "messages": state["messages"] + [response]
-        }
-    except json.JSONDecodeError as e:
-        print(f"⚠️  분석 결과 JSON 파싱 실패: {str(e)}")
-        print(f"   Raw content: {response.content[:200]}")
-        return {
-            "analysis_result": response.content,
-            "messages": state["messages"] + [response]
+            "messages": [response],
+            "model_tiers": model_tiers
         }
+
+    print("⚠️  분석 결과 JSON 파싱 실패")
+    print(f"   Raw content: {response.content[:200]}")
+    return {
+        "analysis_result": response.content,
+        "messages": [response],
+        "model_tiers": model_tiers
+    }
+
+
+def merge_analytic(state: AnalyticsState):
+    """
+    generate_chart / generate_insights 결과 병합 (LangGraph Node, 두 분기가 모두 끝나면 실행)
+
+    두 분기는 서로 다른 state 필드만 쓰므로 이 노드는 분기별 상태만 응답 플래그로 정리
+    - 로컬 계산으로 대체된 분기가 있으면 degraded
+    - 예외로 결과를 만들지 못한 분기가 있으면 partial (나머지 분기 결과만 반환)
+
+    Args:
+        state (AnalyticsState): 현재 그래프의 상태
+
+    Returns:
+        dict: 업데이트할 상태 {"degraded": True, "partial": True, "analysis_result": ...} (해당할 때만)
+    """
+    model_tiers = state.get("model_tiers") or {}
+    branch_tiers = {node: model_tiers.get(node) or {} for node in ANALYTIC_BRANCHES}
+    failed = [node for node, tier in branch_tiers.items() if tier.get("tier") == FAILED_TIER["tier"]]
+
+    update = {}
+    if any(tier == DEGRADED_TIER for tier in branch_tiers.values()):
+        update["degraded"] = True
+    if failed:
+        update["partial"] = True
+        print(f"🧩 merge_analytic: 부분 응답 ({', '.join(failed)} 실패)")
+        if "generate_insights" in failed:
+            update["analysis_result"] = (
+                "분석 설명을 생성하지 못해 차트만 제공합니다." if state.get("chart_data") is not None
+                else "분석 결과를 생성하지 못했습니다. 잠시 후 다시 시도해주세요."
+            )
+
+    print(f"🧩 merge_analytic: chart={'있음' if state.get('chart_data') is not None else '없음'}, "
+          f"insights {len(state.get('insights') or [])}개")
+    return update
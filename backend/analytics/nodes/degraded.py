@@ -0,0 +1,162 @@
+"""
+Degraded Responses
+
+업스트림 LLM을 사용할 수 없을 때 (데드라인 초과, circuit open)
+노드들이 사용하는 로컬 계산 기반 응답
+"""
+from collections import OrderedDict
+
+# 응답을 제공한 티어 기록용
+DEGRADED_TIER = {"tier": "degraded", "model": "local"}
+
+_ANALYSIS_KEYWORDS = ("분석", "추이", "비교", "그래프", "차트", "통계", "현황")
+_FIND_KEYWORDS = ("어디", "어느", "가장", "최대", "최소", "높은", "낮은")
+
+_CHART_KEYWORDS = (
+    ("line_chart", ("추이", "변화", "월별", "시간별", "트렌드")),
+    ("bar_chart", ("비교", "노선별", "순위", "상위", "하위")),
+    ("table", ("상세", "목록", "전체", "데이터")),
+)
+
+
+def classify_intent_locally(question: str) -> str:
+    """
+    키워드 기반 Intent 분류 (router 프롬프트의 키워드 규칙과 동일)
+
+    Args:
+        question (str): 사용자 질문
+
+    Returns:
+        str: "find_highlight" | "analysis" | "fallback"
+    """
+    if any(keyword in question for keyword in _ANALYSIS_KEYWORDS):
+        return "analysis"
+    if any(keyword in question for keyword in _FIND_KEYWORDS):
+        return "find_highlight"
+    return "fallback"
+
+
+def select_chart_type_locally(question: str) -> str:
+    """
+    키워드 기반 차트 타입 선택 (chart_type_selector 프롬프트의 키워드 규칙과 동일)
+
+    Args:
+        question (str): 사용자 질문
+
+    Returns:
+        str: "line_chart" | "bar_chart" | "table" | "text_summary"
+    """
+    for chart_type, keywords in _CHART_KEYWORDS:
+        if any(keyword in question for keyword in keywords):
+            return chart_type
+    return "text_summary"
+
+
+def select_edge_locally(raw_edges: list) -> dict:
+    """
+    승차/하차 인원(data.count)이 가장 큰 엣지 선택
+
+    Args:
+        raw_edges (list): ReactFlow 원본 엣지 리스트
+
+    Returns:
+        dict: {"highlight": {...}, "reason": "..."} (엣지가 없으면 빈 dict)
+    """
+    ranked = sorted(
+        raw_edges,
+        key=lambda edge: (edge.get("data") or {}).get("count", 0),
+        reverse=True,
+    )
+    if not ranked:
+        return {}
+
+    top = ranked[0]
+    top_count = (top.get("data") or {}).get("count", 0)
+    reason = (
+        f"{top.get('label', '')} 구간이 {top_count}명으로 "
+        f"전체 {len(ranked)}개 엣지 중 가장 많은 인원을 기록했습니다."
+    )
+    if len(ranked) > 1:
+        second_count = (ranked[1].get("data") or {}).get("count", 0)
+        reason += f" 2위 대비 {top_count - second_count}명 더 많습니다."
+
+    return {
+        "highlight": {
+            "id": top.get("id"),
+            "source": top.get("source"),
+            "target": top.get("target"),
+            "label": top.get("label", ""),
+        },
+        "reason": reason,
+    }
+
+
+def summarize_locally(transport_records: list, commute_records: list, chart_type: str) -> dict:
+    """
+    노선별 승차 인원과 운행단가를 로컬에서 집계하여 분석 결과 생성
+
+    Args:
+        transport_records (list): 승하차 정보 레코드
+        commute_records (list): 통근 수당 레코드
+        chart_type (str): 선택된 차트 타입
+
+    Returns:
+        dict: {"chart_data": ..., "insights": [...], "reason": "..."}
+    """
+    riders = OrderedDict()
+    for record in transport_records:
+        route = record.get("노선명")
+        riders.setdefault(route, 0)
+        if record.get("승/하차") == "승차":
+            riders[route] += record.get("인원", 0)
+
+    unit_prices = {record.get("노선명"): record.get("운행단가", 0) for record in commute_records}
+    routes = list(riders.keys())
+    counts = [riders[route] for route in routes]
+
+    if chart_type == "bar_chart":
+        chart_data = {
+            "labels": routes,
+            "datasets": [{
+                "label": "승차 인원",
+                "data": counts,
+                "backgroundColor": "rgba(59, 130, 246, 0.6)",
+                "borderColor": "rgb(59, 130, 246)",
+                "borderWidth": 1
+            }]
+        }
+    elif chart_type == "line_chart":
+        chart_data = {
+            "labels": routes,
+            "datasets": [{
+                "label": "승차 인원",
+                "data": counts,
+                "borderColor": "rgb(75, 192, 192)",
+                "tension": 0.1
+            }]
+        }
+    elif chart_type == "table":
+        chart_data = {
+            "columns": ["노선명", "승차인원", "운행단가"],
+            "rows": [[route, riders[route], unit_prices.get(route)] for route in routes]
+        }
+    else:
+        chart_data = None
+
+    total = sum(counts)
+    insights = []
+    if routes:
+        top_route = max(routes, key=lambda route: riders[route])
+        insights.append(f"전체 {len(routes)}개 노선의 총 승차 인원은 {total}명입니다.")
+        insights.append(f"{top_route} 노선이 {riders[top_route]}명으로 가장 많은 승차 인원을 기록했습니다.")
+        priced = [route for route in routes if unit_prices.get(route) and riders[route]]
+        if priced:
+            cheapest = min(priced, key=lambda route: unit_prices[route] / riders[route])
+            per_rider = unit_prices[cheapest] / riders[cheapest]
+            insights.append(f"{cheapest} 노선의 1인당 운행단가가 약 {per_rider:,.0f}원으로 가장 효율적입니다.")
+
+    return {
+        "chart_data": chart_data,
+        "insights": insights,
+        "reason": "AI 분석 서비스 응답이 지연되어 로컬 집계 결과를 제공합니다."
+    }
@@ -4,105 +4,63 @@ Find/Highlight Path Nodes
 그래프 데이터를 로드하고 LLM을 사용하여 엣지를 선택하는 노드들
 """
 import json
-import os
 from analytics.types.state_types import AnalyticsState
-from config import build_chat_model
+from analytics.data.snapshot import get_snapshot
+from analytics.llm.resilience import UpstreamUnavailable
+from analytics.llm.tiered import call_options, invoke_tiered
+from analytics.nodes.degraded import DEGRADED_TIER, select_edge_locally
+from analytics.nodes.session import conversation_context
 from langchain_core.messages import SystemMessage
 
 
+def _needs_escalation(result) -> bool:
+    """highlight 엣지 ID가 없으면 승격"""
+    if not isinstance(result, dict):
+        return True
+    highlight = result.get("highlight")
+    return not isinstance(highlight, dict) or not highlight.get("id")
+
+
 def get_graph_data(state: AnalyticsState):
     """
-    ReactFlow 그래프 데이터를 JSON 파일에서 로드하는 노드 (LangGraph Node)
+    공유 스냅샷의 ReactFlow 그래프 데이터를 요청에 연결하는 노드 (LangGraph Node)
 
     Args:
         state (AnalyticsState): 현재 그래프의 상태
 
     Returns:
-        dict: 업데이트할 상태 {"graph_data": {노드와 엣지 정보}}
+        dict: 업데이트할 상태 {"data_version": "..."} (실패 시 {"data_error": "..."})
 
     동작 과정:
-    1. data/reactflow_graph_route_stop.json 파일 경로 설정
-    2. JSON 파일을 읽어서 파싱
-    3. LLM이 이해하기 쉬운 형태로 데이터 구조화
-    4. state에 graph_data로 저장
+    1. 공유 데이터 스냅샷 조회 (파일은 데이터 버전이 바뀔 때만 다시 읽음)
+    2. 그래프 데이터는 state에 복사하지 않고 스냅샷 버전만 기록
+    3. 이후 노드는 get_snapshot(data_version)으로 같은 스냅샷을 참조
 
-    데이터 구조:
+    스냅샷 그래프 데이터 구조:
     - nodes: 노드 리스트 (id, type, label 등)
     - edges: 엣지 리스트 (source, target, label 등)
     - summary: 그래프 요약 정보 (노드 수, 엣지 수 등)
     """
     try:
-        # 1. JSON 파일 경로 설정 (프로젝트 루트 기준)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        json_path = os.path.join(project_root, "frontend", "public", "reactflow_graph.json")
-
-        print(f"📂 Loading graph data from: {json_path}")
-
-        # 2. JSON 파일 읽기
-        with open(json_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-
-        # 3. LLM이 이해하기 쉬운 형태로 데이터 구조화
-        # 노드 정보 추출 및 정리
-        nodes = []
-        for node in raw_data.get("nodes", []):
-            node_info = {
-                "id": node.get("id"),
-                "type": node.get("type"),
-                "label": node.get("data", {}).get("label", "")
-            }
-            # 추가 데이터가 있으면 포함
-            if "position" in node:
-                node_info["position"] = node["position"]
-            if "parentId" in node:
-                node_info["parentId"] = node["parentId"]
-            nodes.append(node_info)
-
-        # 엣지 정보 추출 및 정리
-        edges = []
-        for edge in raw_data.get("edges", []):
-            edge_info = {
-                "id": edge.get("id"),
-                "source": edge.get("source"),
-                "target": edge.get("target"),
-                "label": edge.get("label", "")
-            }
-            edges.append(edge_info)
-
-        # 4. 그래프 요약 정보 생성
-        summary = {
-            "total_nodes": len(nodes),
-            "total_edges": len(edges),
-            "node_types": list(set(node.get("type") for node in nodes if node.get("type"))),
-            "description": "버스 노선과 정류장 정보를 담은 ReactFlow 그래프 데이터"
-        }
-
-        # 5. 구조화된 데이터 생성
-        structured_data = {
-            "summary": summary,
-            "nodes": nodes,
-            "edges": edges,
-            "raw_data": raw_data  # 필요시 원본 데이터도 포함
-        }
+        snapshot = get_snapshot(state.get("data_version"), state.get("tenant_id"))
+        summary = snapshot.graph["summary"]
 
         print(f"✅ 그래프 데이터 로드 완료: {summary['total_nodes']}개 노드, {summary['total_edges']}개 엣지")
 
-        # 6. state 업데이트
-        return {"graph_data": structured_data}
+        return {"data_version": snapshot.version}
 
-    except FileNotFoundError:
-        error_msg = f"❌ 파일을 찾을 수 없습니다: {json_path}"
+    except FileNotFoundError as e:
+        error_msg = f"❌ 파일을 찾을 수 없습니다: {e.filename}"
         print(error_msg)
-        return {"graph_data": {"error": error_msg}}
+        return {"data_error": error_msg}
     except json.JSONDecodeError as e:
         error_msg = f"❌ JSON 파싱 오류: {str(e)}"
         print(error_msg)
-        return {"graph_data": {"error": error_msg}}
+        return {"data_error": error_msg}
     except Exception as e:
         error_msg = f"❌ 데이터 로드 중 오류 발생: {str(e)}"
         print(error_msg)
-        return {"graph_data": {"error": error_msg}}
+        return {"data_error": error_msg}
 
 
 def select_edge(state: AnalyticsState):
@@ -110,16 +68,16 @@ def select_edge(state: AnalyticsState):
     LLM을 사용하여 사용자 질문에 맞는 엣지 선택 (LangGraph Node)
 
     Args:
-        state (AnalyticsState): 현재 그래프의 상태 (메시지 리스트 및 그래프 데이터 포함)
+        state (AnalyticsState): 현재 그래프의 상태 (메시지 리스트 및 데이터 스냅샷 버전 포함)
 
     Returns:
         dict: 업데이트할 상태 {"messages": [AI 응답], "highlight_edge": {...}, "analysis_result": "..."}
 
     동작 과정:
-    1. state에서 graph_data 가져오기
-    2. 그래프 데이터를 JSON 형태로 컨텍스트에 포함
-    3. build_chat_model()로 LLM 인스턴스 생성
-    4. 사용자 메시지 + 그래프 컨텍스트를 LLM에 전달하여 응답 생성
+    1. state의 data_version으로 공유 스냅샷 조회
+    2. 스냅샷에 미리 직렬화된 노드/엣지 JSON을 컨텍스트에 포함
+    3. 사용자 메시지 + 그래프 컨텍스트를 티어 정책에 따라 LLM에 전달
+    4. JSON 출력이 잘못되면 상위 티어 모델로 재시도
     5. 생성된 응답을 messages 리스트에 추가
     6. LLM이 선택한 엣지를 원본 데이터 구조 형태로 출력
 
@@ -129,21 +87,17 @@ def select_edge(state: AnalyticsState):
     """
     print("🔍 select_edge 노드 실행 중...")
 
-    # 1. 그래프 데이터 가져오기
-    graph_data = state.get("graph_data", {})
+    # 1. 공유 스냅샷 가져오기 (로드 실패 시 None)
+    snapshot = None if state.get("data_error") else get_snapshot(state.get("data_version"), state.get("tenant_id"))
 
     # 2. 그래프 데이터를 JSON 형태로 컨텍스트 변환
     context_message = ""
-    if graph_data and "error" not in graph_data:
-        summary = graph_data.get("summary", {})
-        edges = graph_data.get("edges", [])
-        nodes = graph_data.get("nodes", [])
-
-        # JSON 형태로 edges 데이터 구조 포함
-        edges_json = json.dumps(edges, ensure_ascii=False, indent=2)
+    if snapshot is not None:
+        summary = snapshot.graph["summary"]
 
-        # 노드 정보도 제공 (정류장 상세 정보)
-        nodes_json = json.dumps(nodes, ensure_ascii=False, indent=2)
+        # JSON 형태의 edges/nodes 데이터 (스냅샷에서 한 번만 직렬화됨)
+        edges_json = snapshot.edges_json
+        nodes_json = snapshot.nodes_json
 
         # 그래프 정보를 텍스트로 구성
         context_message = f"""
@@ -200,21 +154,36 @@ output format:
         context_message = "[그래프 데이터를 로드하지 못했습니다. 일반적인 질문에 대해서만 답변할 수 있습니다.]"
         print("⚠️  그래프 데이터 없이 실행")
 
-    # 3. LLM 인스턴스 생성 (높은 temperature로 더 상세한 분석 생성)
-    llm = build_chat_model(temperature=0.8)
-
-    # 4. 기존 메시지에 컨텍스트 추가
-    messages = state["messages"].copy()
-
-    # 시스템 메시지로 컨텍스트 추가 (첫 번째 위치에)
-    messages.insert(0, SystemMessage(content=context_message))
+    # 3. 시스템 메시지로 컨텍스트 추가 (첫 번째 위치에, state의 메시지 리스트는 수정하지 않음)
+    #    세션에서는 윈도우 안의 최근 턴 메시지와 이전 대화 요약이 함께 전달됨
+    messages = [SystemMessage(content=context_message + conversation_context(state)), *state["messages"]]
 
-    # 5. LLM 호출 및 응답 반환
-    response = llm.invoke(messages)
-
-    # 6. 응답에서 highlight_edge 추출
+    # 4. LLM 호출 (높은 temperature로 더 상세한 분석 생성, JSON 오류 시 승격)
     try:
-        result = json.loads(response.content.strip())
+        served = invoke_tiered(
+            "select_edge",
+            messages,
+            temperature=0.8,
+            needs_escalation=_needs_escalation,
+            **call_options(state, "select_edge"),
+        )
+    except UpstreamUnavailable as e:
+        # 업스트림 장애/데드라인 초과 시 인원수 기준 로컬 선택
+        print(f"🛟 select_edge degraded: {str(e)}")
+        raw_edges = list(snapshot.edges_by_id.values()) if snapshot is not None else []
+        result = select_edge_locally(raw_edges)
+        return {
+            "highlight_edge": result.get("highlight"),
+            "analysis_result": result.get("reason", ""),
+            "degraded": True,
+            "model_tiers": {"select_edge": DEGRADED_TIER}
+        }
+    response = served.response
+    model_tiers = {"select_edge": served.tier_record()}
+
+    # 5. 응답에서 highlight_edge 추출
+    if isinstance(served.parsed, dict):
+        result = served.parsed
         highlight_edge = result.get("highlight", {})
         reason = result.get("reason", "")
 
@@ -223,11 +192,13 @@ output format:
         return {
             "messages": [response],
             "highlight_edge": highlight_edge,
-            "analysis_result": reason
-        }
-    except json.JSONDecodeError:
-        print("⚠️  응답 JSON 파싱 실패")
-        return {
-            "messages": [response],
-            "analysis_result": response.content
+            "analysis_result": reason,
+            "model_tiers": model_tiers
         }
+
+    print("⚠️  응답 JSON 파싱 실패")
+    return {
+        "messages": [response],
+        "analysis_result": response.content,
+        "model_tiers": model_tiers
+    }
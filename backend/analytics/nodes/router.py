@@ -4,9 +4,28 @@ Router Node - Intent Analysis
 LLM을 사용하여 사용자 질문의 intent를 분석하고 적절한 경로로 라우팅
 """
 from analytics.types.state_types import AnalyticsState
-from config import build_chat_model
-from langchain_core.messages import SystemMessage
-import json
+from analytics.llm.resilience import UpstreamUnavailable
+from analytics.llm.tiered import call_options, invoke_tiered
+from analytics.nodes.degraded import DEGRADED_TIER, classify_intent_locally
+from analytics.nodes.session import REUSED_TIER, conversation_context, is_follow_up
+from config import ESCALATION_CONFIDENCE_THRESHOLD
+from langchain_core.messages import HumanMessage, SystemMessage
+
+VALID_INTENTS = ("find_highlight", "analysis", "fallback")
+
+# 클라이언트가 지정한 intent/차트 타입으로 분류 노드를 건너뛴 경우의 티어 기록
+HINTED_TIER = {"tier": "hinted", "model": "client"}
+
+
+def _needs_escalation(result) -> bool:
+    """Intent가 유효하지 않거나 confidence가 임계값보다 낮으면 승격"""
+    if not isinstance(result, dict) or result.get("intent") not in VALID_INTENTS:
+        return True
+    try:
+        confidence = float(result.get("confidence", 0.0))
+    except (TypeError, ValueError):
+        return True
+    return confidence < ESCALATION_CONFIDENCE_THRESHOLD
 
 
 def intent_analyzer(state: AnalyticsState):
@@ -17,7 +36,7 @@ def intent_analyzer(state: AnalyticsState):
         state (AnalyticsState): 현재 그래프 상태
 
     Returns:
-        dict: 업데이트할 상태 {"intent_type": "find_highlight" | "analysis" | "fallback"}
+        dict: 업데이트할 상태 {"intent_type": "find_highlight" | "analysis" | "fallback", "model_tiers": {...}}
 
     Intent Types:
     - find_highlight: 특정 노선/정류장을 찾거나 하이라이트하는 질문
@@ -28,10 +47,19 @@ def intent_analyzer(state: AnalyticsState):
     - "가장 포화가 많은 노선은?" → find_highlight
     - "월별 운행 단가 추이를 보여줘" → analysis
     - "안녕하세요" → fallback
+    - (세션) "그럼 퇴근 노선은?" → 직전 턴의 intent 재사용 (LLM 호출 없음)
     """
     # 사용자 메시지 추출
-    user_message = state["messages"][-1]
-    user_question = user_message.content if hasattr(user_message, 'content') else str(user_message)
+    user_question = state.get("question") or state["messages"][-1].content
+
+    # 후속 질문은 직전 턴의 intent를 그대로 사용
+    if is_follow_up(state):
+        intent = state["last_turn"]["intent_type"]
+        print(f"🎯 Intent Analysis (follow-up): {intent}")
+        return {
+            "intent_type": intent,
+            "model_tiers": {"intent_analyzer": REUSED_TIER}
+        }
 
     # LLM을 사용한 Intent 분류
     system_prompt = """
@@ -53,6 +81,8 @@ def intent_analyzer(state: AnalyticsState):
    - 예시: "안녕하세요", "도움말", "무엇을 할 수 있나요?"
    - 목적: 기본 응답 제공
 
+이전 대화 맥락이 주어지면 질문이 이전 질문의 연장인지 고려하세요.
+
 응답 형식 (JSON만 출력, 다른 설명 금지):
 {
     "intent": "find_highlight" | "analysis" | "fallback",
@@ -62,42 +92,113 @@ def intent_analyzer(state: AnalyticsState):
 """
 
     messages = [
-        SystemMessage(content=system_prompt),
-        user_message
+        SystemMessage(content=system_prompt + conversation_context(state)),
+        HumanMessage(content=user_question)
     ]
 
-    # LLM 호출
-    llm = build_chat_model(temperature=0.3)
-    response = llm.invoke(messages)
+    # LLM 호출 (저비용 티어부터, 확신도가 낮으면 승격)
+    try:
+        served = invoke_tiered(
+            "intent_analyzer",
+            messages,
+            temperature=0.3,
+            needs_escalation=_needs_escalation,
+            **call_options(state, "intent_analyzer"),
+        )
+    except UpstreamUnavailable as e:
+        # 업스트림 장애/데드라인 초과 시 키워드 기반 분류
+        intent = classify_intent_locally(user_question)
+        print(f"🛟 Intent Analysis (degraded): {intent} ({str(e)})")
+        return {
+            "intent_type": intent,
+            "degraded": True,
+            "model_tiers": {"intent_analyzer": DEGRADED_TIER}
+        }
+    response = served.response
 
     # 응답 내용 로깅
     print(f"📝 LLM Raw Response: {response.content}")
 
-    try:
-        # JSON 파싱 (여러 형식 처리)
-        content = response.content.strip()
-
-        # ```json 블록 제거
-        if content.startswith("```json"):
-            content = content.replace("```json", "").replace("```", "").strip()
-        elif content.startswith("```"):
-            content = content.replace("```", "").strip()
-
-        result = json.loads(content)
+    result = served.parsed
+    if isinstance(result, dict):
         intent = result.get("intent", "fallback")
-        confidence = result.get("confidence", 0.0)
+        if intent not in VALID_INTENTS:
+            intent = "fallback"
+        try:
+            confidence = float(result.get("confidence", 0.0))
+        except (TypeError, ValueError):
+            confidence = 0.0
         reason = result.get("reason", "")
 
         print(f"🎯 Intent Analysis (LLM): {intent} (confidence: {confidence:.2f})")
         print(f"   Reason: {reason}")
-
-    except json.JSONDecodeError as e:
+    else:
         # JSON 파싱 실패 시 fallback
-        print(f"⚠️  Intent parsing failed: {str(e)}")
+        print("⚠️  Intent parsing failed")
         print(f"   Raw content: {response.content[:200]}")
         intent = "fallback"
 
-    return {"intent_type": intent}
+    return {
+        "intent_type": intent,
+        "model_tiers": {"intent_analyzer": served.tier_record()}
+    }
+
+
+def hinted_turn_fields(intent: str = None, chart_type: str = None) -> dict:
+    """
+    클라이언트 힌트(intent, chart_type)를 그래프 입력 필드로 변환
+
+    state에 미리 채워진 intent_type / chart_type은 entry_router / chart_router가 보고
+    intent_analyzer / chart_type_selector를 건너뜀 (chart_type 힌트만 있으면 analysis로 간주)
+
+    Args:
+        intent (str): find_highlight | analysis | fallback (None이면 LLM 분류)
+        chart_type (str): line_chart | bar_chart | table | text_summary (None이면 LLM 선택)
+
+    Returns:
+        dict: new_turn_input에 넘길 필드 (힌트가 없으면 빈 dict)
+    """
+    if chart_type and not intent:
+        intent = "analysis"
+    if not intent:
+        return {}
+    fields = {"intent_type": intent}
+    if chart_type:
+        fields["chart_type"] = chart_type
+    return fields
+
+
+def hinted_model_tiers(fields: dict) -> dict:
+    """
+    힌트로 건너뛴 노드의 티어 기록
+
+    model_tiers는 턴 시작 시 None으로 초기화해야 하므로(세션에서 이전 턴 값과 병합 방지)
+    그래프 입력이 아니라 응답을 만들 때 합침
+    """
+    tiers = {}
+    if fields.get("intent_type"):
+        tiers["intent_analyzer"] = HINTED_TIER
+    if fields.get("chart_type"):
+        tiers["chart_type_selector"] = HINTED_TIER
+    return tiers
+
+
+def entry_router(state: AnalyticsState) -> str:
+    """
+    대화 기록 정리 후 첫 노드 결정 (LangGraph Conditional Edge)
+
+    클라이언트가 intent를 지정했으면 intent_analyzer를 건너뛰고 해당 경로로 바로 진입
+
+    Args:
+        state (AnalyticsState): 현재 그래프 상태
+
+    Returns:
+        str: 다음 노드 이름
+    """
+    if state.get("intent_type") in VALID_INTENTS:
+        print(f"🎯 Intent Analysis (hinted): {state['intent_type']}")
+        return conditional_router(state)
+    return "intent_analyzer"
 
 
 def conditional_router(state: AnalyticsState) -> str:
@@ -0,0 +1,225 @@
+"""
+Session Nodes
+
+멀티턴 세션(thread_id)의 대화 기록을 관리하는 노드들
+
+- manage_history: 최근 HISTORY_WINDOW_TURNS 턴만 메시지로 남기고 오래된 턴은 누적 요약으로 합침
+- record_turn: 이번 턴에서 확정된 intent/노선/정류장/차트 타입을 last_turn에 기록
+
+후속 질문("그럼 퇴근 노선은?")은 last_turn을 재사용하여 다시 분류하지 않음
+"""
+from analytics.types.state_types import AnalyticsState
+from analytics.data.snapshot import get_snapshot
+from analytics.llm.resilience import UpstreamUnavailable
+from analytics.llm.tiered import call_options, invoke_tiered
+from config import HISTORY_SUMMARY_MAX_CHARS, HISTORY_WINDOW_TURNS
+from langchain_core.messages import RemoveMessage, SystemMessage
+
+# 이전 턴 값을 재사용했을 때 model_tiers에 기록되는 티어
+REUSED_TIER = {"tier": "reused", "model": "last_turn"}
+
+# 후속 질문으로 판단하는 시작 표현
+FOLLOW_UP_PREFIXES = ("그럼", "그러면", "그건", "그거", "거기", "이번엔", "이번에는", "반대로", "아까", "또")
+
+# 요약 입력에 넣는 메시지당 최대 길이 (차트 JSON 등 긴 응답이 요약 프롬프트를 키우지 않도록)
+_SUMMARY_MESSAGE_MAX_CHARS = 300
+
+
+def _is_human(message) -> bool:
+    return getattr(message, "type", None) == "human"
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def is_follow_up(state: AnalyticsState) -> bool:
+    """
+    현재 질문이 직전 턴에 이어지는 후속 질문인지 판단
+
+    Args:
+        state (AnalyticsState): 현재 그래프 상태
+
+    Returns:
+        bool: last_turn이 있고 질문이 후속 표현으로 시작하면 True
+    """
+    last_turn = state.get("last_turn")
+    if not last_turn or last_turn.get("intent_type") not in ("find_highlight", "analysis"):
+        return False
+    question = (state.get("question") or "").strip()
+    return question.startswith(FOLLOW_UP_PREFIXES)
+
+
+def conversation_context(state: AnalyticsState) -> str:
+    """
+    프롬프트에 넣을 이전 대화 맥락 (세션이 아니거나 첫 턴이면 빈 문자열)
+
+    Args:
+        state (AnalyticsState): 현재 그래프 상태
+
+    Returns:
+        str: 누적 요약 + 직전 턴에서 확정된 노선/정류장/차트 타입
+    """
+    lines = []
+    summary = state.get("history_summary")
+    if summary:
+        lines.append(f"- 이전 대화 요약: {summary}")
+
+    last_turn = state.get("last_turn") or {}
+    if last_turn.get("question"):
+        lines.append(f"- 직전 질문: {last_turn['question']}")
+    if last_turn.get("route"):
+        lines.append(f"- 직전 턴의 노선: {last_turn['route']}")
+    if last_turn.get("stop"):
+        lines.append(f"- 직전 턴의 정류장: {last_turn['stop']}")
+    if last_turn.get("chart_type"):
+        lines.append(f"- 직전 턴의 차트 타입: {last_turn['chart_type']}")
+
+    if not lines:
+        return ""
+    return (
+        "[이전 대화 맥락]\n"
+        + "\n".join(lines)
+        + "\n질문에 노선/정류장이 명시되지 않았다면 직전 턴의 값을 기준으로 답하세요.\n"
+    )
+
+
+def _split_window(messages: list):
+    """최근 HISTORY_WINDOW_TURNS 턴 이전의 메시지와 이후의 메시지로 분리 (턴은 HumanMessage에서 시작)"""
+    human_indexes = [i for i, message in enumerate(messages) if _is_human(message)]
+    if len(human_indexes) <= HISTORY_WINDOW_TURNS:
+        return [], messages
+    cut = human_indexes[-HISTORY_WINDOW_TURNS]
+    return messages[:cut], messages[cut:]
+
+
+def _summarize_locally(previous_summary: str, old_messages: list) -> str:
+    """업스트림 없이 이전 질문들을 이어 붙인 요약 (최대 길이를 넘으면 오래된 내용부터 잘라냄)"""
+    questions = [_clip(message.content, 80) for message in old_messages if _is_human(message)]
+    summary = " / ".join(filter(None, [previous_summary] + questions))
+    return summary[-HISTORY_SUMMARY_MAX_CHARS:]
+
+
+def _parse_summary(content: str) -> str:
+    """요약 응답 검증 (비어 있으면 ValueError → 상위 티어로 승격)"""
+    summary = content.strip()
+    if not summary:
+        raise ValueError("Empty summary")
+    return _clip(summary, HISTORY_SUMMARY_MAX_CHARS)
+
+
+def manage_history(state: AnalyticsState):
+    """
+    대화 기록 윈도우 유지 (LangGraph Node)
+
+    최근 HISTORY_WINDOW_TURNS 턴은 메시지 그대로 두고, 그보다 오래된 턴은
+    history_summary에 합친 뒤 RemoveMessage로 체크포인트에서 제거
+    → 대화가 길어져도 프롬프트 크기가 (윈도우 + 요약 최대 길이)로 제한됨
+
+    Args:
+        state (AnalyticsState): 현재 그래프 상태
+
+    Returns:
+        dict: 업데이트할 상태 {"messages": [RemoveMessage...], "history_summary": "..."} (윈도우 안이면 {})
+    """
+    old_messages, _ = _split_window(state.get("messages", []))
+    if not old_messages:
+        return {}
+
+    previous_summary = state.get("history_summary") or ""
+    transcript = "\n".join(
+        f"{'사용자' if _is_human(message) else '어시스턴트'}: {_clip(message.content, _SUMMARY_MESSAGE_MAX_CHARS)}"
+        for message in old_messages
+    )
+
+    system_prompt = f"""
+당신은 버스 노선 데이터 분석 대화의 요약 담당자입니다.
+
+기존 요약과 새로 밀려난 대화를 합쳐 하나의 요약으로 작성하세요.
+- 사용자가 관심을 가진 노선, 정류장, 지표(승차 인원, 운행단가 등)를 빠짐없이 남기세요.
+- {HISTORY_SUMMARY_MAX_CHARS}자 이내의 평문으로만 출력하세요 (JSON, 불릿 금지).
+
+기존 요약: {previous_summary or "(없음)"}
+
+새로 밀려난 대화:
+{transcript}
+"""
+
+    try:
+        served = invoke_tiered(
+            "summarize_history",
+            [SystemMessage(content=system_prompt)],
+            temperature=0.3,
+            parse=_parse_summary,
+            **call_options(state, "summarize_history"),
+        )
+        summary = served.parsed or _summarize_locally(previous_summary, old_messages)
+    except UpstreamUnavailable as e:
+        # 요약 실패가 턴 전체를 막지 않도록 로컬 요약으로 대체
+        print(f"🛟 summarize_history degraded: {str(e)}")
+        summary = _summarize_locally(previous_summary, old_messages)
+
+    print(f"🗜️  History summarized: {len(old_messages)}개 메시지 → {len(summary)}자")
+
+    return {
+        "messages": [RemoveMessage(id=message.id) for message in old_messages],
+        "history_summary": summary,
+    }
+
+
+def _match_route(question: str, snapshot) -> str:
+    """질문에 언급된 노선명 (전체 이름 또는 '-' 앞의 노선 번호, 예: "출근1호")"""
+    for route in snapshot.commute_by_route:
+        if not route:
+            continue
+        if route in question or route.split("-")[0] in question:
+            return route
+    return None
+
+
+def record_turn(state: AnalyticsState):
+    """
+    이번 턴에서 확정된 값을 last_turn에 기록 (LangGraph Node)
+
+    - find_highlight: 선택된 엣지의 출발 정류장에서 노선/정류장 추출
+    - analysis: 질문에 언급된 노선 (없으면 후속 질문일 때 직전 노선 유지)
+    - fallback: 직전 턴 값을 그대로 유지
+
+    Args:
+        state (AnalyticsState): 현재 그래프 상태
+
+    Returns:
+        dict: 업데이트할 상태 {"last_turn": {...}}
+    """
+    intent = state.get("intent_type")
+    if intent not in ("find_highlight", "analysis"):
+        return {}
+
+    previous = state.get("last_turn") or {}
+    follow_up = is_follow_up(state)
+    question = state.get("question") or ""
+    route = previous.get("route") if follow_up else None
+    stop = previous.get("stop") if follow_up else None
+
+    snapshot = None if state.get("data_error") else get_snapshot(state.get("data_version"), state.get("tenant_id"))
+    if snapshot is not None:
+        edge = state.get("highlight_edge") or {}
+        source = snapshot.nodes_by_id.get(edge.get("source")) if edge.get("source") else None
+        if source is not None:
+            node_data = source.get("data") or {}
+            route = node_data.get("route") or route
+            stop = node_data.get("stopName") or stop
+        else:
+            route = _match_route(question, snapshot) or route
+
+    last_turn = {
+        "question": question,
+        "intent_type": intent,
+        "route": route,
+        "stop": stop,
+        "chart_type": state.get("chart_type") or (previous.get("chart_type") if follow_up else None),
+    }
+    print(f"🧷 Turn recorded: route={route}, stop={stop}, chart_type={last_turn['chart_type']}")
+
+    return {"last_turn": last_turn}
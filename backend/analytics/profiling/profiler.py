@@ -0,0 +1,303 @@
+"""
+Request Profiler
+
+요청 단위 opt-in 프로파일링 (X-Profile 헤더 또는 PROFILE_SAMPLE_RATE 샘플링)
+
+- CPU: 등록된 스레드의 스택을 주기적으로 샘플링하여 folded stack
+  ("node;frame;frame count" - flamegraph.pl / speedscope 호환)으로 집계
+- 노드 태깅: 그래프 노드와 노드가 띄운 LLM 호출 스레드가 실행되는 동안
+  해당 스레드를 노드 이름으로 등록 → 스택의 첫 프레임이 노드 이름
+- 메모리: tracemalloc으로 요청 전체의 할당 diff와 노드별 할당량/피크 기록
+- 스트리밍 필드: JSON 스트리밍 응답의 최상위 필드가 완성된 시점 (요청 시작 기준 ms, 노드별)
+
+프로파일 세션은 state["profile_id"]로 노드/LLM 호출 스레드에 전달됨
+(deadline_at, priority와 같은 방식으로 call_options를 통해 전달)
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from config import (
+    PROFILE_MAX_RESULTS,
+    PROFILE_SAMPLE_INTERVAL_MS,
+    PROFILE_TRACEMALLOC_FRAMES,
+)
+
+# 스택 샘플 최대 깊이
+MAX_STACK_DEPTH = 128
+# 메모리 diff 상위 항목 수
+TOP_ALLOCATIONS = 25
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ProfileSession:
+    """
+    요청 하나의 프로파일 결과
+
+    Attributes:
+        id (str): 프로파일 ID
+        label (str): 요청 설명 (질문)
+        samples (Counter): folded stack → 샘플 수
+        nodes (dict): 노드 → {"calls", "wall_ms", "alloc_kb", "peak_kb"}
+        fields (dict): 노드 → {필드: 완성 시점 ms (요청 시작 기준)}
+        allocations (list): 요청 전체의 tracemalloc diff 상위 항목
+    """
+
+    def __init__(self, label: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.samples = Counter()
+        self.nodes = OrderedDict()
+        self.fields = OrderedDict()
+        self.allocations = []
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._start_snapshot = None
+
+    def record_node(self, node: str, wall_ms: float, alloc_kb: float, peak_kb: float):
+        with self._lock:
+            stats = self.nodes.setdefault(node, {"calls": 0, "wall_ms": 0.0, "alloc_kb": 0.0, "peak_kb": 0.0})
+            stats["calls"] += 1
+            stats["wall_ms"] = round(stats["wall_ms"] + wall_ms, 1)
+            stats["alloc_kb"] = round(stats["alloc_kb"] + alloc_kb, 1)
+            stats["peak_kb"] = max(stats["peak_kb"], round(peak_kb, 1))
+
+    def record_field(self, node: str, key: str):
+        """스트리밍 응답 필드 완성 시점 (상위 티어로 승격되어 다시 완성되면 나중 시점으로 갱신)"""
+        with self._lock:
+            self.fields.setdefault(node, {})[key] = round((time.time() - self.started_at) * 1000, 1)
+
+    def folded(self, node: str = None) -> str:
+        """flamegraph 호환 folded stack 텍스트 (node 지정 시 해당 노드만)"""
+        with self._lock:
+            items = sorted(self.samples.items())
+        return "\n".join(
+            f"{stack} {count}" for stack, count in items
+            if node is None or stack.split(";", 1)[0] == node
+        )
+
+    def summary(self) -> dict:
+        with self._lock:
+            total = sum(self.samples.values())
+            by_node = Counter()
+            for stack, count in self.samples.items():
+                by_node[stack.split(";", 1)[0]] += count
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": total,
+            "sample_interval_ms": PROFILE_SAMPLE_INTERVAL_MS,
+            "samples_by_node": dict(by_node.most_common()),
+            "nodes": dict(self.nodes),
+            "fields": {node: dict(fields) for node, fields in self.fields.items()},
+        }
+
+
+# 진행 중인 세션 / 완료된 세션 (최근 PROFILE_MAX_RESULTS개)
+_active = {}
+_finished = OrderedDict()
+_registry_lock = threading.Lock()
+_sampler = None
+_tracemalloc_users = 0
+# 프로파일러가 tracemalloc을 시작했는지 (PYTHONTRACEMALLOC 등으로 이미 켜져 있으면 끄지 않음)
+_tracemalloc_owned = False
+_labels = {}
+
+
+def _frame_label(code) -> str:
+    """프레임 표시 이름 (함수명 + backend/site-packages 기준 상대 경로)"""
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if "site-packages" + os.sep in filename:
+            filename = filename.split("site-packages" + os.sep, 1)[1]
+        elif filename.startswith(_BACKEND_ROOT):
+            filename = os.path.relpath(filename, _BACKEND_ROOT)
+        label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        _labels[code] = label
+    return label
+
+
+def _sample_loop():
+    """활성 세션이 있는 동안 등록된 스레드의 스택을 샘플링"""
+    global _sampler
+    interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+    me = threading.get_ident()
+    while True:
+        with _registry_lock:
+            sessions = list(_active.values())
+            if not sessions:
+                _sampler = None
+                return
+
+        frames = sys._current_frames()
+        for session in sessions:
+            with session._lock:
+                threads = list(session._threads.items())
+            for ident, tags in threads:
+                frame = frames.get(ident)
+                if frame is None or ident == me or not tags:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(tags[-1])
+                folded = ";".join(reversed(stack))
+                with session._lock:
+                    session.samples[folded] += 1
+
+        time.sleep(interval)
+
+
+def get_session(profile_id: str):
+    """진행 중인 프로파일 세션 (없으면 None)"""
+    if not profile_id:
+        return None
+    return _active.get(profile_id)
+
+
+def record_field(profile_id: str, node: str, key: str):
+    """프로파일 중인 요청이면 스트리밍 응답 필드 완성 시점 기록"""
+    session = get_session(profile_id)
+    if session is not None:
+        session.record_field(node, key)
+
+
+@contextmanager
+def profile_thread(profile_id: str, node: str):
+    """
+    현재 스레드를 프로파일 세션에 노드 이름으로 등록 (profile_id가 없으면 아무것도 하지 않음)
+
+    같은 스레드에서 중첩되면 안쪽 노드 이름이 우선 (그래프 스레드 "graph" 안의 노드 실행 등)
+    """
+    session = get_session(profile_id)
+    if session is None:
+        yield
+        return
+
+    ident = threading.get_ident()
+    with session._lock:
+        session._threads.setdefault(ident, []).append(node)
+    try:
+        yield
+    finally:
+        with session._lock:
+            tags = session._threads.get(ident)
+            if tags:
+                tags.pop()
+            if not tags:
+                session._threads.pop(ident, None)
+
+
+@contextmanager
+def profile_node(profile_id: str, node: str):
+    """그래프 노드 실행 구간 프로파일링 (스레드 태깅 + 소요 시간/메모리 기록)"""
+    session = get_session(profile_id)
+    if session is None:
+        yield
+        return
+
+    with profile_thread(profile_id, node):
+        before, _ = tracemalloc.get_traced_memory()
+        # 피크는 프로세스 전역이므로 동시에 여러 요청을 프로파일링하면 근사값
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            current, peak = tracemalloc.get_traced_memory()
+            session.record_node(node, wall_ms, (current - before) / 1024, (peak - before) / 1024)
+
+
+def instrument_node(name: str, node):
+    """
+    그래프 노드 래퍼 (state["profile_id"]가 있을 때만 노드 구간을 프로파일링)
+
+    Args:
+        name (str): 노드 이름 (folded stack의 첫 프레임)
+        node (Callable): LangGraph 노드 함수
+
+    Returns:
+        Callable: 래핑된 노드 함수
+    """
+    @wraps(node)
+    def wrapper(state):
+        with profile_node(state.get("profile_id"), name):
+            return node(state)
+
+    return wrapper
+
+
+def start_profile(label: str) -> ProfileSession:
+    """프로파일 세션 시작 (샘플러 스레드와 tracemalloc은 첫 세션에서 시작)"""
+    global _sampler, _tracemalloc_users, _tracemalloc_owned
+
+    session = ProfileSession(label)
+    with _registry_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+        _active[session.id] = session
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="request-profiler", daemon=True)
+            _sampler.start()
+
+    session._start_snapshot = tracemalloc.take_snapshot()
+    return session
+
+
+def finish_profile(session: ProfileSession):
+    """프로파일 세션 종료 (메모리 diff 계산 후 결과 보관)"""
+    global _tracemalloc_users, _tracemalloc_owned
+
+    end_snapshot = tracemalloc.take_snapshot()
+    # tracemalloc/프로파일러 자체의 할당(샘플 집계 등)은 제외
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diff = end_snapshot.filter_traces(filters).compare_to(
+        session._start_snapshot.filter_traces(filters), "lineno"
+    )
+    session.allocations = [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in diff[:TOP_ALLOCATIONS]
+    ]
+    session._start_snapshot = None
+    session.duration_ms = round((time.time() - session.started_at) * 1000, 1)
+
+    with _registry_lock:
+        _active.pop(session.id, None)
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+        _finished[session.id] = session
+        while len(_finished) > PROFILE_MAX_RESULTS:
+            _finished.popitem(last=False)
+
+    print(f"🔬 Profile {session.id} captured: {session.duration_ms}ms, {sum(session.samples.values())} samples")
+
+
+def get_profile(profile_id: str):
+    """완료된 프로파일 (없으면 None)"""
+    return _finished.get(profile_id)
+
+
+def list_profiles() -> list:
+    """완료된 프로파일 요약 (최신순)"""
+    return [session.summary() for session in reversed(list(_finished.values()))]
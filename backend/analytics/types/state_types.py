@@ -4,39 +4,128 @@ Analytics Agent State Types
 LangGraph에서 사용되는 상태(State) 타입 정의
 """
 from typing import TypedDict, Annotated, Optional, Literal
+from langchain_core.messages import HumanMessage
 from langgraph.graph.message import add_messages
 
 
+def merge_dicts(left: Optional[dict], right: Optional[dict]) -> dict:
+    """
+    여러 노드가 기록한 dict를 병합하는 reducer
+
+    None을 넘기면 초기화 (세션의 새 턴 시작 시 이전 턴 값을 비우는 용도)
+    """
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
 class AnalyticsState(TypedDict):
     """
     Analytics Agent의 전체 상태를 정의하는 클래스
 
+    요청마다 복사되는 상태는 작게 유지하고, 그래프/승하차/통근 수당 같은
+    큰 읽기 전용 데이터는 공유 스냅샷(analytics.data.snapshot)에 두고 data_version으로 참조
+
     LangGraph 실행 중 유지되는 상태:
-    - messages: 대화 메시지 리스트 (자동 누적)
+    - messages: 대화 메시지 리스트 (자동 누적, 노드는 새 메시지만 반환)
+    - question: 현재 턴의 사용자 질문
     - intent_type: 질문 유형 (find_highlight | analysis | fallback)
+    - model_tiers: 노드별 응답을 제공한 모델 티어 (자동 병합)
+    - deadline_at: 요청 마감 시각 (time.time() 기준, 노드별로 분할하여 사용)
+    - degraded: 업스트림 장애로 로컬 계산 응답을 사용했는지 여부
+    - partial: 차트/인사이트 병렬 분기 중 하나가 실패해 나머지 결과만 반환하는지 여부 (merge_analytic)
+    - priority: 업스트림 대기열 우선순위 (interactive | batch)
+    - profile_id: 프로파일링 중인 요청의 프로파일 세션 ID (analytics.profiling.profiler)
+    - job_id: 비동기 작업 ID (작업이 취소되면 진행 중인 LLM 호출 중단, analytics.llm.resilience)
+
+    세션 상태 (thread_id 체크포인트로 턴 사이에 유지):
+    - history_summary: 윈도우 밖으로 밀려난 이전 턴들의 누적 요약
+    - last_turn: 직전 턴에서 확정된 intent/노선/정류장/차트 타입 (후속 질문에서 재사용)
+
+    공유 데이터 참조:
+    - tenant_id: 요청의 테넌트 (테넌트별 데이터셋 선택, None이면 기본 테넌트)
+    - data_version: 이 요청이 사용하는 데이터 스냅샷 버전
+    - data_error: 스냅샷 로드 실패 시 오류 메시지
 
     Find/Highlight Path 상태:
-    - graph_data: ReactFlow 그래프 데이터
     - highlight_edge: 선택된 엣지 정보
 
     Analysis Path 상태:
-    - transport_data: 승하차 정보 JSON 문자열
-    - commute_allowance_data: 통근 수당 JSON 문자열
     - chart_type: 차트 타입
-    - chart_data: 차트 데이터
+    - anomalies: detect_anomalies 노드의 이상 구간 (method, history_days, segments, edges)
+    - query_result: query_data 노드의 SQL 조회 결과 (sql, columns, rows, row_count, truncated)
+    - chart_data: 차트 데이터 (line_chart는 max_points 이하로 다운샘플링됨)
+    - max_points: 요청별 line_chart 포인트 예산
+    - chart_downsampling: 다운샘플링 정보 (원본/결과 포인트 수, 방식)
     - analysis_result: 분석 결과 텍스트
     """
     messages: Annotated[list, add_messages]
+    question: Optional[str]
     intent_type: Optional[Literal['find_highlight', 'analysis', 'fallback']]
+    model_tiers: Annotated[dict, merge_dicts]
+    deadline_at: Optional[float]
+    degraded: Optional[bool]
+    partial: Optional[bool]
+    priority: Optional[Literal['interactive', 'batch']]
+    profile_id: Optional[str]
+    job_id: Optional[str]
+
+    # Session
+    history_summary: Optional[str]
+    last_turn: Optional[dict]
+
+    # Shared data reference
+    tenant_id: Optional[str]
+    data_version: Optional[str]
+    data_error: Optional[str]
 
     # Find/Highlight specific
-    graph_data: Optional[dict]
     highlight_edge: Optional[dict]
 
     # Analysis specific
-    transport_data: Optional[str]
-    commute_allowance_data: Optional[str]
     chart_type: Optional[Literal['line_chart', 'bar_chart', 'table', 'text_summary']]
+    anomalies: Optional[dict]
+    query_result: Optional[dict]
     chart_data: Optional[dict]
+    max_points: Optional[int]
+    chart_downsampling: Optional[dict]
     analysis_result: Optional[str]
     insights: Optional[list]
+
+
+def new_turn_input(question: str, **fields) -> dict:
+    """
+    한 턴의 그래프 입력 생성
+
+    세션(체크포인트)에서는 이전 턴의 결과가 state에 남아 있으므로
+    턴마다 새로 계산되는 필드를 명시적으로 초기화 (history_summary, last_turn은 유지)
+
+    Args:
+        question (str): 사용자 질문
+        **fields: 추가 입력 (deadline_at, priority 등)
+
+    Returns:
+        dict: graph.invoke 입력
+    """
+    return {
+        "messages": [HumanMessage(content=question)],
+        "question": question,
+        "intent_type": None,
+        "model_tiers": None,
+        "degraded": False,
+        "partial": False,
+        "profile_id": None,
+        "job_id": None,
+        "tenant_id": None,
+        "data_version": None,
+        "data_error": None,
+        "highlight_edge": None,
+        "chart_type": None,
+        "anomalies": None,
+        "query_result": None,
+        "chart_data": None,
+        "chart_downsampling": None,
+        "analysis_result": None,
+        "insights": None,
+        **fields,
+    }
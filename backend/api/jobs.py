@@ -0,0 +1,357 @@
+"""
+Analytics Jobs
+
+오래 걸리는 분석 질문을 비동기 작업으로 실행 (/api/analytics/jobs)
+
+- 작업 상태/결과는 sqlite(JOB_DB_PATH)에 저장 → 클라이언트 연결이 끊기거나 다른 워커로 폴링해도 조회 가능
+- 워커 프로세스마다 크기가 제한된 대기열(JOB_QUEUE_MAX)과 고정된 실행 슬롯(JOB_WORKERS)으로 실행
+- 취소는 실행 중인 작업의 취소 이벤트를 설정하여 진행 중인 LLM 호출까지 중단
+  (다른 워커에 들어온 취소 요청은 cancel_requested 플래그로 전달되어 JOB_CANCEL_POLL_SECONDS 안에 반영)
+- 끝난 작업은 JOB_RESULT_TTL_SECONDS 후 삭제
+- sqlite 호출은 워커 간 쓰기 경합 시 잠금 대기(최대 5초)가 생길 수 있으므로 모두 스레드풀에서 실행
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+from fastapi.concurrency import run_in_threadpool
+from analytics.llm.resilience import (
+    RequestCancelled,
+    cancel_request,
+    get_cancel_event,
+    register_cancel,
+    unregister_cancel,
+)
+from config import (
+    JOB_CANCEL_POLL_SECONDS,
+    JOB_DB_PATH,
+    JOB_QUEUE_MAX,
+    JOB_RESULT_TTL_SECONDS,
+    JOB_WORKERS,
+)
+
+# 작업 상태: queued → running → succeeded | failed | cancelled (queued에서 바로 cancelled 가능)
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# 대기열이 가득 찼을 때 Retry-After (초)
+QUEUE_FULL_RETRY_AFTER = 5
+
+# 만료된 작업 삭제 간격 (초)
+_PURGE_INTERVAL_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    status_code INTEGER,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs (expires_at);
+"""
+
+
+class JobQueueFull(Exception):
+    """워커의 작업 대기열이 가득 참 (429)"""
+
+
+class JobFailed(Exception):
+    """작업 실행 실패 (status_code와 detail을 작업 결과로 저장)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    작업 상태/결과 저장소 (sqlite)
+
+    메서드는 블로킹 호출이므로 이벤트 루프에서는 run_in_threadpool로 호출
+    (연결 하나를 잠금으로 직렬화하여 여러 스레드에서 공유)
+    연결은 gunicorn 마스터가 아닌 워커에서 처음 사용할 때 열림 (fork 후)
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, timeout=5, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute(sql, params)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, tenant: str, request: dict) -> dict:
+        """queued 작업 생성 (pid는 대기열을 가진 워커 프로세스)"""
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, tenant, status, request, pid, created_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+            (job_id, tenant, json.dumps(request, ensure_ascii=False), os.getpid(), time.time()),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str, tenant: str = None) -> Optional[dict]:
+        """
+        작업 조회
+
+        Returns:
+            dict: 작업 (없거나 만료되었거나 다른 테넌트의 작업이면 None)
+        """
+        row = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["expires_at"] is not None and row["expires_at"] < time.time():
+            return None
+        if tenant is not None and row["tenant"] != tenant:
+            return None
+        return self._to_dict(row)
+
+    def claim(self, job_id: str) -> Optional[dict]:
+        """queued → running (대기 중에 취소/만료된 작업이면 None)"""
+        cursor = self._execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, pid = ? WHERE id = ? AND status = 'queued'",
+            (time.time(), os.getpid(), job_id),
+        )
+        return self.get(job_id) if cursor.rowcount else None
+
+    def finish(self, job_id: str, status: str, result: dict = None, error: str = None, status_code: int = None):
+        """작업 종료 기록 (결과는 JOB_RESULT_TTL_SECONDS 동안 보관)"""
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, status_code = ?, finished_at = ?, expires_at = ? "
+            "WHERE id = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+             error, status_code, now, now + JOB_RESULT_TTL_SECONDS, job_id),
+        )
+
+    def request_cancel(self, job_id: str) -> Optional[str]:
+        """
+        작업 취소 요청
+
+        - queued: 즉시 cancelled (워커가 꺼낼 때 건너뜀)
+        - running: cancel_requested 설정 (실행 중인 워커가 확인하여 중단)
+
+        Returns:
+            str: 취소 요청 후 상태 ("cancelled" | "running", 이미 끝난 작업이면 None)
+        """
+        now = time.time()
+        cursor = self._execute(
+            "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?, expires_at = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (now, now + JOB_RESULT_TTL_SECONDS, job_id),
+        )
+        if cursor.rowcount:
+            return "cancelled"
+        cursor = self._execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+        )
+        return "running" if cursor.rowcount else None
+
+    def cancel_requested(self, job_ids: list) -> list:
+        """실행 중인 작업 중 취소 요청된 작업 ID"""
+        if not job_ids:
+            return []
+        placeholders = ", ".join("?" for _ in job_ids)
+        rows = self._execute(
+            f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({placeholders})", tuple(job_ids)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def purge_expired(self) -> int:
+        """보관 시간이 지난 작업 삭제"""
+        cursor = self._execute(
+            "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def fail_orphans(self) -> int:
+        """
+        종료된 워커 프로세스가 가지고 있던 queued/running 작업을 failed로 기록
+
+        대기열은 프로세스 메모리에 있으므로 워커가 재시작되면 그 작업은 실행되지 않음
+        """
+        rows = self._execute(
+            "SELECT id, pid FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchall()
+        orphans = [row["id"] for row in rows if row["pid"] != os.getpid() and not _pid_alive(row["pid"])]
+        for job_id in orphans:
+            self.finish(job_id, "failed", error="Worker restarted before the job finished", status_code=503)
+        return len(orphans)
+
+
+job_store = JobStore(JOB_DB_PATH)
+
+
+class JobRunner:
+    """
+    워커 프로세스의 작업 대기열과 실행 슬롯 (이벤트 루프 단위)
+
+    Args:
+        execute: (job_id, request, tenant) → 응답 dict
+            실패는 JobFailed, 취소는 RequestCancelled로 전달
+    """
+
+    def __init__(self, execute: Callable[[str, dict, str], Awaitable[dict]]):
+        self._execute = execute
+        self._queue = None
+        self._tasks = []
+        self._running = set()
+        # 작업 생성(sqlite)을 기다리는 동안 대기열 자리를 미리 잡아 둔 수
+        self._reserved = 0
+
+    def stats(self) -> dict:
+        """대기열 깊이와 실행 중인 작업 수"""
+        return {
+            "queued": (self._queue.qsize() if self._queue is not None else 0) + self._reserved,
+            "running": len(self._running),
+            "workers": JOB_WORKERS,
+            "max_queue": JOB_QUEUE_MAX,
+        }
+
+    async def start(self):
+        """실행 슬롯과 유지보수 태스크 시작 (lifespan 또는 첫 제출 시)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=JOB_QUEUE_MAX)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(JOB_WORKERS)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+        orphans = await run_in_threadpool(job_store.fail_orphans)
+        if orphans:
+            print(f"🧹 Marked {orphans} orphaned job(s) as failed")
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def submit(self, request: dict, tenant: str) -> dict:
+        """
+        작업 등록
+
+        Returns:
+            dict: queued 작업
+
+        Raises:
+            JobQueueFull: 이 워커의 대기열이 가득 참
+        """
+        await self.start()
+        # 작업 생성을 기다리는 동안 다른 제출이 같은 자리를 쓰지 않도록 자리를 먼저 예약
+        if self._queue.qsize() + self._reserved >= JOB_QUEUE_MAX:
+            raise JobQueueFull(f"Job queue full ({JOB_QUEUE_MAX} queued)")
+        self._reserved += 1
+        try:
+            job = await run_in_threadpool(job_store.create, tenant, request)
+            self._queue.put_nowait(job["id"])
+        finally:
+            self._reserved -= 1
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        """
+        작업 취소 (이 워커에서 실행 중이면 즉시 중단, 다른 워커는 다음 확인 때 중단)
+
+        Returns:
+            str: 취소 요청 후 상태 ("cancelled" | "running", 이미 끝난 작업이면 None)
+        """
+        status = await run_in_threadpool(job_store.request_cancel, job_id)
+        if status == "running":
+            cancel_request(job_id)
+        return status
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"❌ Job {job_id} bookkeeping error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await run_in_threadpool(job_store.claim, job_id)
+        if job is None:
+            return
+
+        register_cancel(job_id)
+        self._running.add(job_id)
+        started = time.time()
+        try:
+            result = await self._execute(job_id, job["request"], job["tenant"])
+            if get_cancel_event(job_id).is_set():
+                # 마지막 LLM 호출 이후에 취소된 경우에도 취소로 기록
+                raise RequestCancelled(f"Job {job_id} cancelled")
+            await run_in_threadpool(job_store.finish, job_id, "succeeded", result=result)
+            print(f"✅ Job {job_id} succeeded ({time.time() - started:.1f}s)")
+        except RequestCancelled:
+            await run_in_threadpool(job_store.finish, job_id, "cancelled", error="Cancelled")
+            print(f"🛑 Job {job_id} cancelled ({time.time() - started:.1f}s)")
+        except JobFailed as e:
+            await run_in_threadpool(job_store.finish, job_id, "failed", error=e.detail, status_code=e.status_code)
+            print(f"❌ Job {job_id} failed: {e.status_code} {e.detail}")
+        except Exception as e:
+            await run_in_threadpool(job_store.finish, job_id, "failed", error=str(e), status_code=500)
+            print(f"❌ Job {job_id} failed: {str(e)}")
+        finally:
+            self._running.discard(job_id)
+            unregister_cancel(job_id)
+
+    async def _maintain(self):
+        """다른 워커에서 들어온 취소 요청 반영, 만료된 작업 삭제"""
+        last_purge = 0.0
+        while True:
+            await asyncio.sleep(JOB_CANCEL_POLL_SECONDS)
+            try:
+                for job_id in await run_in_threadpool(job_store.cancel_requested, list(self._running)):
+                    cancel_request(job_id)
+                if time.time() - last_purge >= _PURGE_INTERVAL_SECONDS:
+                    last_purge = time.time()
+                    purged = await run_in_threadpool(job_store.purge_expired)
+                    if purged:
+                        print(f"🧹 Purged {purged} expired job(s)")
+            except sqlite3.Error as e:
+                print(f"⚠️  Job maintenance error: {str(e)}")
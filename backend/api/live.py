@@ -0,0 +1,177 @@
+"""
+Live Dashboard Hub
+
+데이터 버전이 바뀌면 연결된 대시보드 클라이언트(WebSocket)에 delta를 push
+
+- 메시지는 버전당 한 번만 계산/직렬화하고 모든 구독자에게 같은 문자열을 전달
+- 구독자마다 크기가 제한된 대기열을 두어 느린 클라이언트가 다른 구독자나 watcher를 막지 않음
+  (대기열이 가득 차면 밀린 delta를 버리고 전체 스냅샷 한 건으로 재동기화)
+- watcher는 구독자가 있을 때만 데이터 버전을 확인 (파일 stat만 사용하므로 저렴함)
+- 테넌트마다 별도의 뷰/구독자 집합 (구독자가 없어진 테넌트의 뷰는 버림)
+"""
+import asyncio
+import json
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from analytics.data.live_view import build_live_view, delta_message, full_message
+from analytics.data.snapshot import get_snapshot
+from config import DEFAULT_TENANT, LIVE_MAX_SUBSCRIBERS, LIVE_POLL_INTERVAL_SECONDS, LIVE_QUEUE_SIZE
+
+
+class LiveHubFull(Exception):
+    """워커당 최대 구독자 수 초과"""
+
+
+def _encode(message: dict) -> str:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class Subscriber:
+    """구독자 하나의 전송 대기열 (직렬화된 메시지 문자열)"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self.resyncs = 0
+
+
+class LiveHub:
+    """테넌트 하나의 데이터 버전별 대시보드 뷰와 구독자 fan-out (이벤트 루프 단위)"""
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        self._subscribers = set()
+        self._view = None
+        self._full_text = None
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._view.version if self._view is not None else None
+
+    def _snapshot_text(self) -> str:
+        """현재 뷰의 전체 스냅샷 메시지 (버전당 한 번만 직렬화)"""
+        if self._full_text is None:
+            self._full_text = _encode(full_message(self._view))
+        return self._full_text
+
+    async def refresh(self) -> bool:
+        """
+        데이터 버전이 바뀌었으면 뷰를 다시 계산하고 구독자에게 delta push
+
+        Returns:
+            bool: 뷰가 바뀌었는지 여부
+        """
+        async with self._refresh_lock:
+            snapshot = await run_in_threadpool(lambda: get_snapshot(tenant=self.tenant))
+            previous = self._view
+            if previous is not None and previous.version == snapshot.version:
+                return False
+
+            view = await run_in_threadpool(build_live_view, snapshot)
+            self._view = view
+            self._full_text = None
+
+            if previous is not None and self._subscribers:
+                text = await run_in_threadpool(lambda: _encode(delta_message(previous, view)))
+                self._publish(text)
+                print(f"📡 Live update {previous.version} → {view.version}: {len(self._subscribers)}명에게 전송"
+                      + (f" (tenant={self.tenant})" if self.tenant != DEFAULT_TENANT else ""))
+            return True
+
+    def _publish(self, text: str):
+        for subscriber in self._subscribers:
+            try:
+                subscriber.queue.put_nowait(text)
+            except asyncio.QueueFull:
+                # delta가 하나라도 빠지면 클라이언트 상태가 어긋나므로 밀린 메시지를 모두 버리고 전체 스냅샷으로 교체
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(self._snapshot_text())
+                subscriber.resyncs += 1
+
+    async def subscribe(self, known_version: str = None) -> Subscriber:
+        """
+        구독 등록
+
+        Args:
+            known_version (str): 클라이언트가 이미 가진 데이터 버전 (같으면 전체 스냅샷을 보내지 않음)
+
+        Returns:
+            Subscriber: 전송 대기열
+        """
+        if self._view is None:
+            await self.refresh()
+
+        subscriber = Subscriber()
+        if known_version != self._view.version:
+            subscriber.queue.put_nowait(self._snapshot_text())
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+
+class LiveHubs:
+    """테넌트별 LiveHub 모음 (워커당 구독자 수 제한과 데이터 버전 watcher)"""
+
+    def __init__(self):
+        self._hubs = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(hub.subscriber_count for hub in self._hubs.values())
+
+    async def subscribe(self, tenant: str, known_version: str = None) -> tuple:
+        """
+        테넌트 대시보드 구독 등록
+
+        Args:
+            tenant (str): 인증된 테넌트 ID (api.tenant.authorize_tenant)
+            known_version (str): 클라이언트가 이미 가진 데이터 버전
+
+        Returns:
+            tuple[LiveHub, Subscriber]: 테넌트 hub와 전송 대기열 (해제 시 unsubscribe에 전달)
+
+        Raises:
+            LiveHubFull: 최대 구독자 수 초과
+        """
+        if self.subscriber_count >= LIVE_MAX_SUBSCRIBERS:
+            raise LiveHubFull(f"Too many live subscribers ({LIVE_MAX_SUBSCRIBERS})")
+        hub = self._hubs.get(tenant)
+        if hub is None:
+            hub = self._hubs[tenant] = LiveHub(tenant)
+        try:
+            return hub, await hub.subscribe(known_version)
+        except Exception:
+            self._discard_idle(hub)
+            raise
+
+    def unsubscribe(self, hub: LiveHub, subscriber: Subscriber):
+        hub.unsubscribe(subscriber)
+        self._discard_idle(hub)
+
+    def _discard_idle(self, hub: LiveHub):
+        # 구독자가 없는 테넌트의 뷰는 유지하지 않음 (다음 구독 시 다시 계산)
+        if not hub.subscriber_count and self._hubs.get(hub.tenant) is hub:
+            del self._hubs[hub.tenant]
+
+    async def watch(self):
+        """데이터 버전 watcher (lifespan에서 백그라운드 태스크로 실행, 구독자가 있는 테넌트만 확인)"""
+        while True:
+            await asyncio.sleep(LIVE_POLL_INTERVAL_SECONDS)
+            for hub in list(self._hubs.values()):
+                if not hub.subscriber_count:
+                    continue
+                try:
+                    await hub.refresh()
+                except Exception as e:
+                    # 데이터 파일이 쓰는 중이라 깨져 있는 경우 등 → 다음 주기에 다시 시도
+                    print(f"⚠️  Live refresh failed (tenant={hub.tenant}): {str(e)}")
+
+
+live_hubs = LiveHubs()
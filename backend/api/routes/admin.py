@@ -0,0 +1,92 @@
+"""
+Admin API Routes
+
+요청 프로파일 조회 (X-Admin-Token 헤더 필요, ADMIN_TOKEN 미설정 시 비활성화)
+
+- /admin/profiles: 최근 프로파일 목록
+- /admin/profiles/{id}: 노드별 소요 시간/메모리와 할당 상위 항목
+- /admin/profiles/{id}/folded: flamegraph.pl / speedscope 호환 folded stack
+- /admin/tenants: 테넌트 스냅샷 LRU 상태 (추정 메모리, 로드/해제 지표)
+"""
+import hmac
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from analytics.data.snapshot import snapshot_cache_stats
+from analytics.profiling.profiler import get_profile, list_profiles
+from config import ADMIN_TOKEN
+
+router = APIRouter()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """관리자 토큰 검증 (ADMIN_TOKEN이 설정되지 않았으면 항상 False)"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin API disabled")
+    if not is_admin(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _require_profile(profile_id: str):
+    session = get_profile(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    return session
+
+
+@router.get("/admin/profiles")
+async def profiles(x_admin_token: Optional[str] = Header(default=None)):
+    """최근 프로파일 목록 (최신순)"""
+    _require_admin(x_admin_token)
+    return {"profiles": list_profiles()}
+
+
+@router.get("/admin/profiles/{profile_id}")
+async def profile_detail(profile_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    프로파일 상세
+
+    Response: {
+        ...요약 (노드별 calls / wall_ms / alloc_kb / peak_kb, 노드별 샘플 수),
+        "allocations": [{"location", "size_diff_kb", "count_diff"}, ...]
+    }
+    """
+    _require_admin(x_admin_token)
+    session = _require_profile(profile_id)
+    return {**session.summary(), "allocations": session.allocations}
+
+
+@router.get("/admin/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def profile_folded(
+    profile_id: str,
+    node: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    folded stack 텍스트 ("node;frame;frame count" 한 줄씩)
+
+    Example:
+        curl -H "X-Admin-Token: ..." /api/admin/profiles/{id}/folded | flamegraph.pl > profile.svg
+        (speedscope에는 파일을 그대로 업로드)
+    """
+    _require_admin(x_admin_token)
+    session = _require_profile(profile_id)
+    return PlainTextResponse(session.folded(node) + "\n")
+
+
+@router.get("/admin/tenants")
+async def tenants(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    테넌트 스냅샷 LRU 상태 (이 워커 기준)
+
+    Response: {"budget_mb", "max_tenants", "used_mb", "hits", "misses", "loads", "reloads", "evictions", "load_ms",
+               "tenants": [{"tenant", "version", "approx_mb", "loaded_at", "last_used"}, ...] (최근 사용 순)}
+    """
+    _require_admin(x_admin_token)
+    return snapshot_cache_stats()
@@ -2,19 +2,96 @@
 Analytics API Routes
 
 LangGraph를 실행하여 사용자 질문에 대한 분석 결과 반환
+(오래 걸리는 질문은 /analytics/jobs로 비동기 작업 등록 후 폴링)
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from langchain_core.messages import HumanMessage
-from analytics.graph.analytics_graph import get_analytics_graph
+import asyncio
+import json
+import random
+import sys
+import time
+import weakref
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import Callable, Optional, Dict, Any, Literal
+from analytics.data.sources import data_version
+from analytics.graph.checkpointer import acquire_session_lease, release_session_lease
+from analytics.llm.admission import AdmissionRejected, get_model_limiter
+from analytics.llm.resilience import DeadlineExceeded, RequestCancelled, UpstreamUnavailable
+from analytics.profiling.profiler import finish_profile, profile_thread, start_profile
+from api.jobs import QUEUE_FULL_RETRY_AFTER, JobFailed, JobQueueFull, JobRunner, job_store
+from api.routes.admin import is_admin
+from api.singleflight import SingleFlight, normalize_question
+from api.tenant import resolve_tenant
+from config import (
+    DEFAULT_TENANT,
+    JOB_DEADLINE_SECONDS,
+    JOB_MAX_DEADLINE_SECONDS,
+    MAX_REQUEST_DEADLINE_SECONDS,
+    PROFILE_SAMPLE_RATE,
+    REQUEST_DEADLINE_SECONDS,
+    get_node_tiers,
+)
 
 router = APIRouter()
 
+# 동일 질문 동시 요청 coalescing (응답 캐시와 무관하게 동작)
+_singleflight = SingleFlight()
+
+# 같은 세션(thread_id)의 턴은 순서대로 실행 (체크포인트 경합 방지)
+# 워커 안에서는 asyncio 락, 워커 간에는 세션 DB의 lease (acquire_session_lease)
+_session_locks = weakref.WeakValueDictionary()
+
+# 세션 lease 유지 시간 = 요청 데드라인 + 여유 (데드라인 이후 응답 정리/체크포인트 저장 시간)
+SESSION_LEASE_GRACE_SECONDS = 30
+
+
+def _state_size_bytes(obj, _seen=None) -> int:
+    """
+    요청 state가 실제로 점유하는 메모리 크기 (바이트, 중첩 객체 포함)
+
+    공유 스냅샷은 state에 들어가지 않으므로 요청당 메모리만 측정됨
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_state_size_bytes(k, _seen) + _state_size_bytes(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_state_size_bytes(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        # LangChain 메시지 등 (content, additional_kwargs ...)
+        size += _state_size_bytes(vars(obj), _seen)
+    return size
+
 
 class QuestionRequest(BaseModel):
     """사용자 질문 요청 모델"""
     question: str
+    # 요청 데드라인 (초, 미지정 시 REQUEST_DEADLINE_SECONDS)
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+    # 업스트림 대기열 우선순위 (interactive 요청이 batch보다 먼저 처리됨)
+    priority: Literal["interactive", "batch"] = "interactive"
+    # line_chart 최대 포인트 수 (미지정 시 LINE_CHART_MAX_POINTS, 화면 폭에 맞춰 지정)
+    max_points: Optional[int] = Field(default=None, ge=3, le=10000)
+    # 멀티턴 세션 ID (지정하면 이전 대화 맥락을 이어서 사용, 미지정 시 독립 요청)
+    thread_id: Optional[str] = Field(default=None, min_length=1, max_length=128)
+    # 클라이언트가 이미 아는 intent (지정하면 intent_analyzer LLM 호출을 건너뜀)
+    intent: Optional[Literal["find_highlight", "analysis", "fallback"]] = None
+    # 클라이언트가 이미 아는 차트 타입 (지정하면 chart_type_selector LLM 호출을 건너뜀, intent 미지정 시 analysis)
+    chart_type: Optional[Literal["line_chart", "bar_chart", "table", "text_summary"]] = None
+
+    @model_validator(mode="after")
+    def _check_hints(self):
+        # 차트 타입은 analysis 경로에서만 사용됨
+        if self.chart_type and self.intent not in (None, "analysis"):
+            raise ValueError(f"chart_type hint requires intent 'analysis' (got '{self.intent}')")
+        return self
 
 
 class AnalyticsResponse(BaseModel):
@@ -25,18 +102,67 @@ class AnalyticsResponse(BaseModel):
     analysis_result: Optional[str] = None
     chart_type: Optional[str] = None
     insights: Optional[list] = None
+    model_tiers: Optional[Dict[str, Any]] = None
+    degraded: bool = False
+    # 차트/인사이트 생성 분기 중 하나가 실패해 나머지 결과만 담긴 응답
+    partial: bool = False
+    chart_downsampling: Optional[Dict[str, Any]] = None
+    # 분석에 사용한 SQL (query_data 노드가 조회한 경우)
+    query_sql: Optional[str] = None
+    # 이상 패턴 질문의 이상 구간과 하이라이트할 엣지 (detect_anomalies 노드)
+    anomalies: Optional[Dict[str, Any]] = None
+    thread_id: Optional[str] = None
+
+
+class JobRequest(QuestionRequest):
+    """비동기 분석 작업 요청 모델 (deadline_seconds 기본/최대값은 JOB_DEADLINE_SECONDS/JOB_MAX_DEADLINE_SECONDS)"""
+    # 백그라운드 작업이므로 기본적으로 interactive 요청에 업스트림 대기열을 양보
+    priority: Literal["interactive", "batch"] = "batch"
+
+
+class JobStatus(BaseModel):
+    """비동기 분석 작업 상태 응답 모델"""
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    question: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # 결과 보관 만료 시각 (끝난 작업만, 이후 조회 시 404)
+    expires_at: Optional[float] = None
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+
+def _should_profile(x_profile: Optional[str], x_admin_token: Optional[str]) -> bool:
+    """X-Profile 헤더(관리자 토큰 필요) 또는 PROFILE_SAMPLE_RATE 샘플링으로 프로파일링 여부 결정"""
+    if x_profile in ("1", "true") and is_admin(x_admin_token):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
 
 
 @router.post("/analytics", response_model=AnalyticsResponse)
-async def analyze(request: QuestionRequest):
+async def analyze(
+    request: QuestionRequest,
+    response: Response,
+    x_profile: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+    tenant: str = Depends(resolve_tenant),
+):
     """
     Analytics Agent API - LangGraph 실행
 
+    테넌트는 X-Tenant-Id 헤더로 선택 (미지정 시 기본 테넌트, 세션/coalescing도 테넌트별로 분리)
+
     Flow:
-    1. 사용자 질문을 HumanMessage로 변환
-    2. LangGraph invoke로 실행
-    3. 결과 state에서 응답 추출
-    4. FastAPI response model로 반환
+    1. 같은 질문(정규화) + 같은 데이터 버전의 요청이 진행 중이면 그 실행에 합류
+       (thread_id 세션 요청은 대화 맥락이 다르므로 합류하지 않고 세션별로 순서대로 실행)
+       (프로파일링 요청은 자기 실행을 측정해야 하므로 합류하지 않음)
+    2. 사용자 질문을 HumanMessage로 변환
+    3. LangGraph invoke로 실행
+    4. 결과 state에서 응답 추출
+    5. FastAPI response model로 반환
 
     Example:
         POST /api/analytics
@@ -46,20 +172,369 @@ async def analyze(request: QuestionRequest):
             "highlight_edge": {...},
             "analysis_result": "..."
         }
+
+    Profiling:
+        X-Profile: 1 + X-Admin-Token 헤더 (또는 PROFILE_SAMPLE_RATE 샘플링)이면
+        요청 전체를 프로파일링하고 X-Profile-Id 응답 헤더로 /api/admin/profiles/{id} 조회 ID 반환
+    """
+    if _should_profile(x_profile, x_admin_token):
+        # tracemalloc 스냅샷은 힙 크기에 비례하므로 이벤트 루프 밖에서 실행
+        profile = await run_in_threadpool(start_profile, request.question)
+        response.headers["X-Profile-Id"] = profile.id
+        try:
+            return await _run_with_session_lock(request, tenant, profile_id=profile.id)
+        finally:
+            await run_in_threadpool(finish_profile, profile)
+
+    if request.thread_id:
+        return await _run_with_session_lock(request, tenant)
+
+    # 같은 테넌트 + 같은 질문 + 같은 데이터 버전 + 같은 포인트 예산 + 같은 힌트의 동시 요청은 하나의 그래프 실행 결과/오류를 공유
+    # (데이터 버전은 경로 기반이라 테넌트마다 다르므로 키에 테넌트가 포함된 것과 같음)
+    key = (f"{data_version(tenant)}:{request.max_points}:{request.intent}:{request.chart_type}:"
+           f"{normalize_question(request.question)}")
+    return await _singleflight.do(key, lambda: _run_analytics(request, tenant))
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/analytics/stream")
+async def analyze_stream(request: QuestionRequest, tenant: str = Depends(resolve_tenant)):
+    """
+    Analytics Agent API - 차트를 먼저 보내는 스트리밍 응답 (text/event-stream)
+
+    generate_chart 분기가 끝나는 즉시 차트를 보내고, 그래프 실행이 끝나면 전체 응답을 보냄
+    (인사이트 작성을 기다리지 않고 차트를 먼저 그릴 수 있음)
+
+    Events:
+        chart: {"chart_type", "chart_data", "chart_downsampling", "model_tiers"} (analysis 경로만, 최대 1회)
+        result: POST /analytics와 같은 형식의 전체 응답
+        error: {"status_code", "detail"} (스트림 시작 후 발생한 429/503/504/500 ...)
+
+    각 클라이언트가 자기 실행의 중간 결과를 받아야 하므로 동일 질문 coalescing은 하지 않음
+    (세션 요청은 /analytics와 같이 같은 thread_id끼리 순서대로 실행)
+
+    Example:
+        POST /api/analytics/stream
+        Body: {"question": "노선별 승차 인원을 비교해줘"}
+        Response:
+            event: chart
+            data: {"chart_type": "bar_chart", "chart_data": {...}, ...}
+
+            event: result
+            data: {"intent_type": "analysis", "chart_data": {...}, "insights": [...], ...}
+    """
+    # 대기열 포화는 스트림을 열기 전에 429로 응답
+    _reject_if_saturated(request)
+
+    queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def on_chart(payload: dict):
+        # 그래프 실행 스레드에서 호출됨
+        loop.call_soon_threadsafe(queue.put_nowait, ("chart", payload))
+
+    async def events():
+        task = asyncio.create_task(_run_with_session_lock(request, tenant, on_chart=on_chart))
+        # 실행 스레드가 예약한 chart 이벤트가 먼저 들어간 뒤 종료 표시가 들어감
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (item := await queue.get()) is not None:
+                yield _sse(*item)
+            try:
+                yield _sse("result", task.result().model_dump())
+            except HTTPException as e:
+                yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        finally:
+            # 클라이언트 연결이 끊기면 응답 대기 중단
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _job_status(job: dict) -> JobStatus:
+    return JobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        question=job["request"]["question"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        expires_at=job["expires_at"],
+        cancel_requested=job["cancel_requested"],
+        error=job["error"],
+        status_code=job["status_code"],
+    )
+
+
+async def _require_job(job_id: str, tenant: str) -> dict:
+    # 다른 테넌트의 작업은 존재 여부도 드러내지 않음 (sqlite 조회는 스레드풀에서)
+    job = await run_in_threadpool(job_store.get, job_id, tenant)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+async def _execute_job(job_id: str, request: dict, tenant: str) -> dict:
+    """작업 실행 단위 (single-flight 없이 실행, 세션 작업은 같은 thread_id끼리 순서대로)"""
+    try:
+        response = await _run_with_session_lock(JobRequest(**request), tenant, job_id=job_id)
+    except HTTPException as e:
+        raise JobFailed(e.status_code, str(e.detail))
+    return response.model_dump()
+
+
+# 워커 프로세스의 작업 대기열/실행 슬롯 (lifespan에서 시작)
+job_runner = JobRunner(_execute_job)
+
+
+@router.post("/analytics/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(request: JobRequest, response: Response, tenant: str = Depends(resolve_tenant)):
+    """
+    비동기 분석 작업 등록 (작업 ID를 즉시 반환)
+
+    작업은 클라이언트 연결과 무관하게 실행되고 결과는 JOB_RESULT_TTL_SECONDS 동안 보관됨
+
+    Example:
+        POST /api/analytics/jobs
+        Body: {"question": "노선별 승차 인원 추이를 분석해줘"}
+        Response (202): {"job_id": "...", "status": "queued", ...}
+        → GET /api/analytics/jobs/{job_id} 폴링, 끝나면 GET /api/analytics/jobs/{job_id}/result
+    """
+    try:
+        job = await job_runner.submit(request.model_dump(), tenant)
+    except JobQueueFull as e:
+        print(f"🚦 Job rejected: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER)})
+
+    print(f"📥 Job {job['id']} queued: {request.question}"
+          + (f" (tenant={tenant})" if tenant != DEFAULT_TENANT else ""))
+    response.headers["Location"] = f"/api/analytics/jobs/{job['id']}"
+    return _job_status(job)
+
+
+@router.get("/analytics/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str, tenant: str = Depends(resolve_tenant)):
+    """작업 상태 조회 (queued | running | succeeded | failed | cancelled)"""
+    return _job_status(await _require_job(job_id, tenant))
+
+
+@router.get("/analytics/jobs/{job_id}/result", response_model=AnalyticsResponse)
+async def job_result(job_id: str, tenant: str = Depends(resolve_tenant)):
+    """
+    작업 결과 조회
+
+    - succeeded: 분석 응답 (POST /analytics와 같은 형식)
+    - failed: 실행 시 발생한 상태 코드와 오류 (429/503/504/500 ...)
+    - queued / running / cancelled: 409
+    """
+    job = await _require_job(job_id, tenant)
+    if job["status"] == "succeeded":
+        return job["result"]
+    if job["status"] == "failed":
+        raise HTTPException(status_code=job["status_code"] or 500, detail=job["error"])
+    raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+
+
+@router.delete("/analytics/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str, tenant: str = Depends(resolve_tenant)):
+    """
+    작업 취소
+
+    - queued: 즉시 cancelled
+    - running: 진행 중인 LLM 호출을 중단하고 cancelled로 기록 (다른 워커에서 실행 중이면 JOB_CANCEL_POLL_SECONDS 안에)
+    - 이미 끝난 작업: 409
+    """
+    await _require_job(job_id, tenant)
+    if await job_runner.cancel(job_id) is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already finished")
+    print(f"🛑 Job {job_id} cancel requested")
+    return _job_status(await _require_job(job_id, tenant))
+
+
+@router.get("/analytics/jobs", response_model=Dict[str, Any])
+async def job_queue_stats():
+    """이 워커의 작업 대기열 깊이와 실행 중인 작업 수"""
+    return job_runner.stats()
+
+
+def _session_key(thread_id: str, tenant: str) -> str:
+    """세션 체크포인트 키 (다른 테넌트가 같은 thread_id를 써도 대화가 섞이지 않도록 테넌트로 구분)"""
+    return thread_id if tenant == DEFAULT_TENANT else f"{tenant}:{thread_id}"
+
+
+async def _run_with_session_lock(
+    request: QuestionRequest,
+    tenant: str,
+    profile_id: str = None,
+    job_id: str = None,
+    on_chart: Optional[Callable[[dict], None]] = None,
+) -> AnalyticsResponse:
+    """single-flight 없이 실행 (세션 요청은 같은 thread_id끼리 순서대로 실행)"""
+    if not request.thread_id:
+        return await _run_analytics(request, tenant, profile_id=profile_id, job_id=job_id, on_chart=on_chart)
+
+    session_key = _session_key(request.thread_id, tenant)
+    lock = _session_locks.get(session_key)
+    if lock is None:
+        lock = _session_locks[session_key] = asyncio.Lock()
+    async with lock:
+        # 다른 워커에서 같은 세션 턴이 실행 중이면 끝날 때까지 대기 (체크포인트는 워커 간 공유)
+        deadline_seconds = _deadline_seconds(request, job_id)
+        owner = await run_in_threadpool(
+            acquire_session_lease, session_key, deadline_seconds + SESSION_LEASE_GRACE_SECONDS, deadline_seconds
+        )
+        if owner is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Session {request.thread_id} is busy with another turn",
+                headers={"Retry-After": "1"}
+            )
+        try:
+            return await _run_analytics(request, tenant, profile_id=profile_id, job_id=job_id, on_chart=on_chart)
+        finally:
+            await run_in_threadpool(release_session_lease, session_key, owner)
+
+
+def _deadline_seconds(request: QuestionRequest, job_id: str = None) -> float:
+    """요청 데드라인 (초, 비동기 작업은 JOB_DEADLINE_SECONDS 기준)"""
+    if job_id is None:
+        return min(request.deadline_seconds or REQUEST_DEADLINE_SECONDS, MAX_REQUEST_DEADLINE_SECONDS)
+    return min(request.deadline_seconds or JOB_DEADLINE_SECONDS, JOB_MAX_DEADLINE_SECONDS)
+
+
+def _first_llm_node(request: QuestionRequest) -> Optional[str]:
+    """힌트로 건너뛴 노드를 제외하고 처음 LLM을 호출하는 노드 (대기열 포화 사전 확인용, 없으면 None)"""
+    if request.intent is None and request.chart_type is None:
+        return "intent_analyzer"
+    if request.intent == "find_highlight":
+        return "select_edge"
+    if request.intent == "fallback":
+        return None
+    return "query_data" if request.chart_type else "chart_type_selector"
+
+
+def _reject_if_saturated(request: QuestionRequest):
+    """첫 LLM 호출 모델의 대기열이 가득 차 있으면 그래프 실행 전에 즉시 429"""
+    first_node = _first_llm_node(request)
+    if first_node is None:
+        return
+    _, first_model = get_node_tiers(first_node)[0]
+    limiter = get_model_limiter(first_model)
+    if limiter.is_saturated(request.priority):
+        raise HTTPException(
+            status_code=429,
+            detail=f"{first_model}: upstream queue full",
+            headers={"Retry-After": str(limiter.retry_after())}
+        )
+
+
+def _invoke_graph(
+    analytics_graph,
+    initial_state: dict,
+    config: Optional[dict],
+    profile_id: str = None,
+    on_chart: Optional[Callable[[dict], None]] = None,
+):
     """
+    그래프 실행 (프로파일링 중이면 노드 밖의 LangGraph 실행 구간은 "graph"로 샘플링)
+
+    on_chart가 있으면 노드 단위 업데이트를 스트리밍으로 받아 generate_chart가 끝나는 즉시
+    차트를 전달 (병렬 분기인 generate_insights를 기다리지 않음)
+    """
+    with profile_thread(profile_id, "graph"):
+        if on_chart is None:
+            return analytics_graph.invoke(initial_state, config)
+
+        result = None
+        chart_type = initial_state.get("chart_type")
+        for mode, chunk in analytics_graph.stream(initial_state, config, stream_mode=["updates", "values"]):
+            if mode == "values":
+                result = chunk
+                continue
+            for node, update in chunk.items():
+                update = update or {}
+                chart_type = update.get("chart_type", chart_type)
+                if node == "generate_chart":
+                    on_chart({
+                        "chart_type": chart_type,
+                        "chart_data": update.get("chart_data"),
+                        "chart_downsampling": update.get("chart_downsampling"),
+                        "model_tiers": update.get("model_tiers"),
+                    })
+        return result
+
+
+async def _run_analytics(
+    request: QuestionRequest,
+    tenant: str,
+    profile_id: str = None,
+    job_id: str = None,
+    on_chart: Optional[Callable[[dict], None]] = None,
+) -> AnalyticsResponse:
+    """
+    LangGraph를 실행하여 응답 생성 (single-flight / 비동기 작업 / 스트리밍 실행 단위)
+
+    job_id가 있으면 작업 데드라인(JOB_DEADLINE_SECONDS)을 사용하고,
+    작업이 취소되면 진행 중인 LLM 호출을 중단하고 RequestCancelled를 그대로 전달
+    on_chart가 있으면 generate_chart 분기가 끝나는 즉시 차트를 전달 (그래프 실행 스레드에서 호출)
+    """
+    # langgraph/langchain은 부팅 시 import하지 않음 (lifespan warm-up에서 미리 로드됨)
+    from analytics.graph.analytics_graph import get_analytics_graph, get_session_graph
+    from analytics.nodes.router import hinted_model_tiers, hinted_turn_fields
+    from analytics.types.state_types import new_turn_input
+
+    # 첫 LLM 호출 모델의 대기열이 가득 차 있으면 그래프 실행 전에 즉시 거절
+    # (비동기 작업은 이미 작업 대기열에서 순서를 기다렸으므로 데드라인까지 업스트림 슬롯을 기다림)
+    if job_id is None:
+        _reject_if_saturated(request)
+
     try:
-        # LangGraph 인스턴스 가져오기
-        analytics_graph = get_analytics_graph()
+        # LangGraph 인스턴스 가져오기 (세션 요청은 체크포인터가 붙은 그래프)
+        if request.thread_id:
+            analytics_graph = get_session_graph()
+            config = {"configurable": {"thread_id": _session_key(request.thread_id, tenant)}}
+        else:
+            analytics_graph = get_analytics_graph()
+            config = None
+
+        # 요청 데드라인 (노드별로 분할되어 사용됨)
+        deadline_seconds = _deadline_seconds(request, job_id)
+
+        # 클라이언트 힌트 (intent_type / chart_type을 미리 채워 분류 노드를 건너뜀)
+        hints = hinted_turn_fields(request.intent, request.chart_type)
 
         # Initial state 구성 (LangGraph 형식)
-        initial_state = {
-            "messages": [HumanMessage(content=request.question)]
-        }
+        initial_state = new_turn_input(
+            request.question,
+            **hints,
+            deadline_at=time.time() + deadline_seconds,
+            priority=request.priority,
+            max_points=request.max_points,
+            profile_id=profile_id,
+            job_id=job_id,
+            tenant_id=tenant
+        )
 
         # LangGraph 실행
-        print(f"📨 Received question: {request.question}")
-        result = analytics_graph.invoke(initial_state)
+        print(f"📨 Received question: {request.question}"
+              + (f" (job={job_id})" if job_id else "")
+              + (f" (hints={hints})" if hints else "")
+              + (f" (tenant={tenant})" if tenant != DEFAULT_TENANT else "")
+              + (f" (thread_id={request.thread_id})" if request.thread_id else ""))
+        # 업스트림 대기 중에도 이벤트 루프가 막히지 않도록 스레드풀에서 실행
+        result = await run_in_threadpool(_invoke_graph, analytics_graph, initial_state, config, profile_id, on_chart)
         print(f"✅ LangGraph execution completed")
+        print(f"📏 Request state size: {_state_size_bytes(result) / 1024:.1f}KB "
+              f"(messages {len(result.get('messages', []))}개)")
 
         # State에서 결과 추출
         response_data = AnalyticsResponse(
@@ -68,7 +543,14 @@ async def analyze(request: QuestionRequest):
             chart_data=result.get("chart_data"),
             analysis_result=result.get("analysis_result"),
             chart_type=result.get("chart_type"),
-            insights=result.get("insights")
+            insights=result.get("insights"),
+            model_tiers={**hinted_model_tiers(hints), **(result.get("model_tiers") or {})} or None,
+            degraded=bool(result.get("degraded")),
+            partial=bool(result.get("partial")),
+            chart_downsampling=result.get("chart_downsampling"),
+            query_sql=(result.get("query_result") or {}).get("sql"),
+            anomalies=result.get("anomalies"),
+            thread_id=request.thread_id
         )
 
         print(f"📤 Response data:")
@@ -76,9 +558,30 @@ async def analyze(request: QuestionRequest):
         print(f"   - highlight_edge: {response_data.highlight_edge}")
         print(f"   - analysis_result: {response_data.analysis_result}")
         print(f"   - insights: {len(response_data.insights) if response_data.insights else 0}개")
+        print(f"   - model_tiers: {response_data.model_tiers}")
+        if response_data.degraded:
+            print("   - degraded: 로컬 계산 응답 포함")
+        if response_data.partial:
+            print("   - partial: 차트/인사이트 중 일부만 포함")
 
         return response_data
 
+    except AdmissionRejected as e:
+        print(f"🚦 Admission rejected in analytics: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except RequestCancelled as e:
+        print(f"🛑 Cancelled in analytics: {str(e)}")
+        raise
+    except DeadlineExceeded as e:
+        print(f"⏱️  Deadline exceeded in analytics: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except UpstreamUnavailable as e:
+        print(f"❌ Upstream unavailable in analytics: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"❌ Error in analytics: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
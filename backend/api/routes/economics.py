@@ -0,0 +1,82 @@
+"""
+Route Economics API Routes
+
+노선별 비용/이용 지표 조회 및 what-if 시나리오 일괄 평가 (LLM 호출 없음)
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, List
+from analytics.data.route_economics import MAX_SCENARIOS
+from analytics.data.snapshot import get_snapshot
+from api.tenant import resolve_tenant
+
+router = APIRouter()
+
+
+class Scenario(BaseModel):
+    """What-if 시나리오 (노선은 전체 노선명 또는 "출근1호" 같은 노선 번호)"""
+    name: Optional[str] = None
+    # {노선: 운행단가} 절대값 변경
+    unit_price: Dict[str, float] = Field(default_factory=dict)
+    # {노선 | "*": 변경률(%)} 상대 변경
+    unit_price_pct: Dict[str, float] = Field(default_factory=dict)
+    # [[유지 노선, 흡수 노선, ...], ...]
+    merge: List[List[str]] = Field(default_factory=list)
+    # 승차+하차 인원이 이 값보다 적은 정류장 폐지
+    drop_stops_below: float = Field(default=0, ge=0)
+    # 폐지된 정류장 승객 중 계속 타는 비율
+    dropped_rider_retention: float = Field(default=0, ge=0, le=1)
+
+
+class ScenarioRequest(BaseModel):
+    """시나리오 일괄 평가 요청 모델"""
+    scenarios: List[Scenario] = Field(min_length=1, max_length=MAX_SCENARIOS)
+
+
+@router.get("/economics/routes")
+async def route_economics(tenant: str = Depends(resolve_tenant)):
+    """
+    노선별 1인당 비용, km당 비용, 좌석 이용률
+
+    Example:
+        GET /api/economics/routes
+        Response: {"data_version": "...", "totals": {...}, "routes": [{"route": "출근1호-한국대서문", ...}]}
+    """
+    # 처음 요청된 테넌트는 스냅샷을 로드하므로 스레드풀에서 실행
+    snapshot = await run_in_threadpool(get_snapshot, None, tenant)
+    return {
+        "data_version": snapshot.version,
+        "totals": snapshot.economics.totals(),
+        "routes": snapshot.economics.route_metrics(),
+    }
+
+
+@router.post("/economics/scenarios")
+async def evaluate_scenarios(request: ScenarioRequest, tenant: str = Depends(resolve_tenant)):
+    """
+    What-if 시나리오 일괄 평가 (노선 통합, 운행단가 변경, 저이용 정류장 폐지)
+
+    Example:
+        POST /api/economics/scenarios
+        Body: {"scenarios": [
+            {"name": "퇴근 통합", "merge": [["퇴근1호", "퇴근3호"]]},
+            {"name": "단가 10% 인하", "unit_price_pct": {"*": -10}}
+        ]}
+        Response: {"data_version": "...", "baseline": {...}, "results": [{"name": "퇴근 통합", "delta_cost": -65000, ...}]}
+    """
+    # 처음 요청된 테넌트는 스냅샷을 로드하므로 스레드풀에서 실행
+    snapshot = await run_in_threadpool(get_snapshot, None, tenant)
+    scenarios = [scenario.model_dump() for scenario in request.scenarios]
+
+    try:
+        # 시나리오 수가 많으면 계산이 길어질 수 있으므로 이벤트 루프 밖에서 실행
+        results = await run_in_threadpool(snapshot.economics.evaluate, scenarios)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "data_version": snapshot.version,
+        "baseline": snapshot.economics.totals(),
+        "results": results,
+    }
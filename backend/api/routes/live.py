@@ -0,0 +1,85 @@
+"""
+Live Dashboard WebSocket Route
+
+데이터 버전이 바뀔 때 그래프 delta, 상위 엣지, 집계를 push (폴링 대체)
+
+Messages (server → client, JSON text):
+    {"type": "snapshot", "version", "graph": {"nodes", "edges"}, "top_edges", "aggregates"}
+    {"type": "delta", "version", "previous_version",
+     "graph": {"nodes": {"upsert", "remove"}, "edges": {"upsert", "remove"}},
+     "top_edges"?, "aggregates"?}
+
+테넌트는 다른 API와 같이 X-Tenant-Id / X-Tenant-Token 헤더로 선택
+(브라우저 WebSocket은 헤더를 지정할 수 없으므로 tenant / token 쿼리 파라미터도 허용)
+"""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from api.live import LiveHubFull, live_hubs
+from api.tenant import authorize_tenant
+
+router = APIRouter()
+
+
+async def _send_loop(websocket: WebSocket, subscriber):
+    while True:
+        text = await subscriber.queue.get()
+        await websocket.send_text(text)
+
+
+async def _receive_loop(websocket: WebSocket):
+    # 클라이언트 메시지는 사용하지 않음 (연결 종료 감지용)
+    while True:
+        await websocket.receive_text()
+
+
+@router.websocket("/live")
+async def live(
+    websocket: WebSocket,
+    version: Optional[str] = None,
+    tenant: Optional[str] = None,
+    token: Optional[str] = None,
+):
+    """
+    테넌트 대시보드 실시간 업데이트 구독
+
+    Example:
+        ws://localhost:8000/api/live?version=<마지막으로 받은 version>
+        (version이 현재와 같으면 전체 스냅샷 없이 이후 delta만 수신)
+        ws://localhost:8000/api/live?tenant=acme&token=<테넌트 토큰>
+    """
+    await websocket.accept()
+    try:
+        tenant_id = await run_in_threadpool(
+            authorize_tenant,
+            tenant or websocket.headers.get("x-tenant-id"),
+            token or websocket.headers.get("x-tenant-token"),
+            websocket.headers.get("x-admin-token"),
+        )
+    except HTTPException as e:
+        # 1008 Policy Violation (403/404/400 사유는 reason으로 전달)
+        await websocket.close(code=1008, reason=f"{e.status_code}: {e.detail}")
+        return
+
+    try:
+        hub, subscriber = await live_hubs.subscribe(tenant_id, version)
+    except LiveHubFull as e:
+        # 1013 Try Again Later
+        await websocket.close(code=1013, reason=str(e))
+        return
+
+    tasks = [
+        asyncio.create_task(_send_loop(websocket, subscriber)),
+        asyncio.create_task(_receive_loop(websocket)),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                print(f"⚠️  Live connection error: {str(error)}")
+    finally:
+        live_hubs.unsubscribe(hub, subscriber)
+        for task in tasks:
+            task.cancel()
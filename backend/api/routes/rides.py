@@ -0,0 +1,88 @@
+"""
+Ride Store API Routes
+
+운행일별 파티션 승하차 저장소 적재 및 기간 조회
+
+- /rides/ingest: 승하차 기록 적재 (X-Admin-Token 필요)
+- /rides/partitions: 파티션 목록
+- /rides/aggregate: 기간 집계 (기간에 걸친 파티션의 집계 파일만 읽음)
+- /rides/daily: 운행일별 승차/하차 합계
+
+테넌트는 X-Tenant-Id 헤더로 선택 (TENANTS_DIR/<tenant_id>/rides)
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from analytics.data.ride_store import get_ride_store
+from api.routes.admin import _require_admin
+from api.tenant import resolve_tenant
+from config import RIDE_INGEST_MAX_RECORDS
+
+router = APIRouter()
+
+
+class IngestRequest(BaseModel):
+    """승하차 기록 적재 요청 모델"""
+    # 승하차정보.json 형식 레코드 (+ "운행일": "YYYY-MM-DD")
+    records: List[Dict[str, Any]] = Field(min_length=1, max_length=RIDE_INGEST_MAX_RECORDS)
+    # "운행일"이 없는 레코드에 사용할 운행일
+    date: Optional[str] = None
+
+
+@router.post("/rides/ingest")
+async def ingest_rides(
+    request: IngestRequest,
+    x_admin_token: Optional[str] = Header(default=None),
+    tenant: str = Depends(resolve_tenant),
+):
+    """
+    승하차 기록 적재 (영향받은 파티션의 집계만 갱신)
+
+    Example:
+        POST /api/rides/ingest
+        Body: {"date": "2026-10-19", "records": [{"노선명": "출근1호-한국대서문", "정류장명": "...", "승/하차": "승차", "인원": 3, ...}]}
+        Response: {"ingested": 1, "partitions": ["2026-10-19"], "version": "..."}
+    """
+    _require_admin(x_admin_token)
+    try:
+        return await run_in_threadpool(get_ride_store(tenant).ingest, request.records, request.date)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/rides/partitions")
+async def ride_partitions(tenant: str = Depends(resolve_tenant)):
+    """파티션 목록 {"partition": "day", "version": "...", "partitions": {키: {"rows", "days"}}}"""
+    store = get_ride_store(tenant)
+    return {"partition": store.partition, "version": store.version(), **store.manifest()}
+
+
+@router.get("/rides/aggregate")
+async def ride_aggregate(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    route: Optional[str] = None,
+    tenant: str = Depends(resolve_tenant),
+):
+    """
+    기간 집계 (승하차정보.json과 같은 형식, 같은 노선/정류장/승하차의 인원은 기간 합계)
+
+    Example:
+        GET /api/rides/aggregate?start=2026-10-01&end=2026-10-19
+    """
+    try:
+        records = await run_in_threadpool(get_ride_store(tenant).aggregate, start, end, route)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"start": start, "end": end, "route": route, "records": records}
+
+
+@router.get("/rides/daily")
+async def ride_daily(start: Optional[str] = None, end: Optional[str] = None, tenant: str = Depends(resolve_tenant)):
+    """운행일별 승차/하차 합계 [{"운행일", "승차", "하차"}, ...]"""
+    try:
+        days = await run_in_threadpool(get_ride_store(tenant).daily_totals, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"start": start, "end": end, "days": days}
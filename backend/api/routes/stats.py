@@ -0,0 +1,66 @@
+"""
+Statistics API Routes
+
+데이터 버전별로 미리 계산된 집계 뷰 조회 (LangGraph / LLM을 거치지 않음)
+
+- 응답 본문은 스냅샷 생성 시 한 번만 직렬화된 bytes를 그대로 전달
+- ETag = 데이터 버전 + 뷰 이름 → 데이터가 바뀌지 않았으면 If-None-Match로 304
+  (데이터 버전은 테넌트마다 다르고 X-Tenant-Id에 따라 응답이 달라지므로 Vary: X-Tenant-Id)
+- 토큰으로 보호되는 테넌트 응답은 공유 캐시에 저장되지 않도록 Cache-Control: private
+"""
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from analytics.data.snapshot import get_snapshot
+from analytics.data.stats import STATS_VIEWS
+from api.tenant import resolve_tenant
+from config import DEFAULT_TENANT, STATS_MAX_AGE_SECONDS
+
+router = APIRouter()
+
+
+def _cached_response(body: bytes, etag: str, if_none_match: Optional[str], tenant: str = DEFAULT_TENANT) -> Response:
+    scope = "public" if tenant == DEFAULT_TENANT else "private"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"{scope}, max-age={STATS_MAX_AGE_SECONDS}",
+        "Vary": "X-Tenant-Id",
+    }
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/stats")
+async def stats_index(if_none_match: Optional[str] = Header(default=None), tenant: str = Depends(resolve_tenant)):
+    """
+    사용 가능한 통계 뷰 목록과 현재 데이터 버전
+
+    Response: {"version": "...", "views": ["overview", "routes", "stops", "departures", "costs"]}
+    """
+    # 데이터 버전이 바뀐 직후 첫 호출은 스냅샷을 다시 만들 수 있으므로 스레드풀에서 실행
+    snapshot = await run_in_threadpool(get_snapshot, None, tenant)
+    body = json.dumps({"version": snapshot.version, "views": list(STATS_VIEWS)}).encode("utf-8")
+    return _cached_response(body, f'"{snapshot.version}"', if_none_match, tenant)
+
+
+@router.get("/stats/{view}")
+async def stats_view(
+    view: str,
+    if_none_match: Optional[str] = Header(default=None),
+    tenant: str = Depends(resolve_tenant),
+):
+    """
+    통계 뷰 조회
+
+    Example:
+        GET /api/stats/routes
+        Response: {"view": "routes", "version": "...", "data": [{"노선명": ..., "승차": 20, ...}, ...]}
+        (If-None-Match에 이전 ETag를 보내면 데이터가 같을 때 304 Not Modified)
+    """
+    if view not in STATS_VIEWS:
+        raise HTTPException(status_code=404, detail=f"Unknown stats view: {view} (available: {', '.join(STATS_VIEWS)})")
+
+    snapshot = await run_in_threadpool(get_snapshot, None, tenant)
+    return _cached_response(snapshot.stats.encoded[view], f'"{snapshot.version}-{view}"', if_none_match, tenant)
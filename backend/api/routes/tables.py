@@ -0,0 +1,79 @@
+"""
+Table API Routes
+
+table 분석 응답의 테이블 핸들로 나머지 행을 커서 페이지 단위로 조회하거나 CSV로 내려받음
+(행은 로컬 데이터에서 계산하므로 LLM 호출 없음)
+"""
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from analytics.data.tables import TableExpired, decode_table_id, iter_csv, read_page
+from api.tenant import resolve_tenant
+from config import TABLE_MAX_PAGE_SIZE, TABLE_PAGE_SIZE
+
+router = APIRouter()
+
+
+def _resolve(table_id: str, tenant: str):
+    """테이블 ID 검증 (잘못된 ID, 다른 테넌트의 테이블은 404)"""
+    try:
+        spec = decode_table_id(table_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if spec.tenant != tenant:
+        raise HTTPException(status_code=404, detail=f"Invalid table id: {table_id}")
+    return spec
+
+
+@router.get("/tables/{table_id}")
+async def get_table_page(
+    table_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=TABLE_PAGE_SIZE, ge=1, le=TABLE_MAX_PAGE_SIZE),
+    tenant: str = Depends(resolve_tenant),
+):
+    """
+    테이블 페이지 조회
+
+    Example:
+        GET /api/tables/{table_id}?limit=50&cursor=eyJvZmZzZXQiOjUwfQ
+        Response: {"table_id": "...", "columns": [...], "rows": [[...], ...],
+                   "total_count": 1234, "next_cursor": "..." | null}
+    """
+    spec = _resolve(table_id, tenant)
+    try:
+        return await run_in_threadpool(read_page, spec, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TableExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+
+@router.get("/tables/{table_id}/export.csv")
+async def export_table_csv(table_id: str, tenant: str = Depends(resolve_tenant)):
+    """
+    테이블 전체를 CSV로 스트리밍 (UTF-8 BOM 포함)
+
+    Example:
+        GET /api/tables/{table_id}/export.csv
+    """
+    spec = _resolve(table_id, tenant)
+    try:
+        chunks = iter_csv(spec)
+        # 첫 청크를 미리 계산하여 데이터 버전 만료를 스트리밍 시작 전에 410으로 알림
+        first = await run_in_threadpool(next, chunks, "")
+    except TableExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+    def body():
+        yield first
+        yield from chunks
+
+    filename = quote(f"{spec.source}.csv")
+    return StreamingResponse(
+        body(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
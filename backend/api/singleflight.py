@@ -0,0 +1,69 @@
+"""
+Single-flight Request Coalescing
+
+같은 키의 요청이 동시에 들어오면 하나만 실행하고 나머지는 그 결과(또는 오류)를 공유
+"""
+import asyncio
+import re
+from typing import Awaitable, Callable, Dict
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.。？！]+$")
+
+
+def normalize_question(question: str) -> str:
+    """
+    질문 정규화 (앞뒤 공백, 연속 공백, 끝 문장부호, 대소문자 차이 제거)
+
+    Args:
+        question (str): 사용자 질문
+
+    Returns:
+        str: 정규화된 질문
+    """
+    question = _WHITESPACE.sub(" ", question.strip())
+    question = _TRAILING_PUNCTUATION.sub("", question)
+    return question.lower()
+
+
+class SingleFlight:
+    """키별로 진행 중인 실행을 하나로 합치는 coalescer (이벤트 루프 단위)"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        """
+        키에 대해 fn을 한 번만 실행하고 결과 공유
+
+        Args:
+            key (str): coalescing 키
+            fn (Callable): 실행할 코루틴 함수
+
+        Returns:
+            fn의 결과 (진행 중인 실행이 있으면 그 결과)
+
+        Raises:
+            fn이 발생시킨 예외 (대기 중인 모든 요청에 동일하게 전달)
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            print(f"🔗 Coalesced request: {key}")
+
+        # 먼저 온 요청이 끊겨도 공유 실행은 계속되도록 shield
+        return await asyncio.shield(task)
+
+    def in_flight_count(self) -> int:
+        """진행 중인 실행 수"""
+        return len(self._in_flight)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # 모든 요청이 끊긴 경우에도 "exception was never retrieved" 경고 방지
+        if not task.cancelled():
+            task.exception()
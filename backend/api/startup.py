@@ -0,0 +1,100 @@
+"""
+Application Startup (Warm-up)
+
+서버 부팅 직후 무거운 import, 데이터 스냅샷, LangGraph, 업스트림 연결을 미리 준비하고
+단계별 소요 시간을 기록 (readiness 판단에 사용)
+"""
+import time
+from config import MODEL_TIERS, SQL_QUERY_ENABLED, UPSTAGE_API_KEY, UPSTAGE_BASE_URL, build_chat_model, get_http_client
+
+_status = {
+    "ready": False,
+    "phases": {},
+    "total_ms": None,
+    "error": None,
+}
+
+
+def _phase(name: str, fn):
+    """단계 실행 및 소요 시간(ms) 기록"""
+    started = time.perf_counter()
+    result = fn()
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    _status["phases"][name] = elapsed_ms
+    print(f"🚀 Startup phase '{name}': {elapsed_ms}ms")
+    return result
+
+
+def _import_runtime():
+    """요청 처리에 필요한 무거운 모듈 import (langgraph, langchain)"""
+    import langchain_core.messages  # noqa: F401
+    import langchain_openai  # noqa: F401
+    import analytics.graph.analytics_graph  # noqa: F401
+
+
+def _load_snapshot():
+    from analytics.data.snapshot import get_snapshot
+    from analytics.data.sql_store import get_sql_store
+    snapshot = get_snapshot()
+    if SQL_QUERY_ENABLED:
+        # 분석용 SQLite 파일도 첫 분석 요청 전에 만들어 둠 (다른 워커가 만들었으면 재사용)
+        get_sql_store(snapshot)
+
+
+def _build_graph():
+    from analytics.graph.analytics_graph import get_analytics_graph, get_session_graph
+    get_analytics_graph()
+    # 세션 그래프는 체크포인트 저장소(sqlite 연결)를 열기 때문에 워커에서만 생성
+    get_session_graph()
+
+
+def _open_upstream():
+    """티어별 LLM 클라이언트를 만들고 업스트림 연결(TLS)을 미리 열어 연결 풀에 보관"""
+    for model in sorted(set(MODEL_TIERS.values())):
+        build_chat_model(model=model)
+
+    try:
+        get_http_client().get(
+            f"{UPSTAGE_BASE_URL}/models",
+            headers={"Authorization": f"Bearer {UPSTAGE_API_KEY}"},
+            timeout=5.0,
+        )
+    except Exception as e:
+        # 연결 예열 실패는 치명적이지 않음 (첫 요청에서 다시 연결)
+        print(f"⚠️  Upstream pre-connect failed: {str(e)}")
+
+
+def warm_up():
+    """
+    모든 warm-up 단계를 순서대로 실행 (블로킹, 스레드에서 호출할 것)
+
+    단계:
+    1. import: langgraph / langchain import
+    2. snapshot: 공유 데이터 스냅샷 로드 (+ 분석용 SQL 저장소)
+    3. graph: LangGraph 컴파일
+    4. upstream: LLM 클라이언트 생성 및 업스트림 연결 예열
+    """
+    started = time.perf_counter()
+    try:
+        _phase("import", _import_runtime)
+        _phase("snapshot", _load_snapshot)
+        _phase("graph", _build_graph)
+        _phase("upstream", _open_upstream)
+    except Exception as e:
+        _status["error"] = str(e)
+        print(f"❌ Startup warm-up failed: {str(e)}")
+        return
+
+    _status["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    _status["ready"] = True
+    print(f"✅ Startup warm-up completed in {_status['total_ms']}ms")
+
+
+def startup_status() -> dict:
+    """
+    현재 warm-up 상태
+
+    Returns:
+        dict: {"ready": bool, "phases": {단계: ms}, "total_ms": float, "error": str}
+    """
+    return {**_status, "phases": dict(_status["phases"])}
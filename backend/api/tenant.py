@@ -0,0 +1,62 @@
+"""
+Tenant Resolution
+
+요청 헤더(X-Tenant-Id)로 테넌트를 선택하는 FastAPI 의존성
+
+- 헤더가 없으면 기본 테넌트(DEFAULT_TENANT)
+- 기본 테넌트 외의 테넌트는 X-Tenant-Token(TENANT_TOKENS) 또는 X-Admin-Token이 맞아야 접근 가능 (403)
+  → 인증 전에는 테넌트 존재 여부를 드러내지 않음
+- 잘못된 형식은 400, 데이터 디렉터리가 없는 테넌트는 404
+"""
+import hmac
+from fastapi import Header, HTTPException
+from typing import Optional
+from analytics.data.sources import UnknownTenant, tenant_sources
+from api.routes.admin import is_admin
+from config import DEFAULT_TENANT, TENANT_TOKENS
+
+
+def _tenant_authorized(tenant: str, token: Optional[str], admin_token: Optional[str]) -> bool:
+    """테넌트 토큰 또는 관리자 토큰 검증"""
+    if is_admin(admin_token):
+        return True
+    expected = TENANT_TOKENS.get(tenant)
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+def authorize_tenant(tenant_id: Optional[str], token: Optional[str], admin_token: Optional[str]) -> str:
+    """
+    테넌트 ID 검증 (기본 테넌트가 아니면 테넌트 토큰 확인)
+
+    Returns:
+        str: 테넌트 ID (미지정이면 기본 테넌트)
+
+    Raises:
+        HTTPException: 403 (토큰 불일치), 404 (없는 테넌트), 400 (잘못된 형식)
+    """
+    tenant_id = (tenant_id or "").strip() or None
+    if tenant_id is not None and tenant_id != DEFAULT_TENANT:
+        if not _tenant_authorized(tenant_id, token, admin_token):
+            raise HTTPException(status_code=403, detail="Invalid tenant token")
+    try:
+        return tenant_sources(tenant_id).tenant
+    except UnknownTenant as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def resolve_tenant(
+    x_tenant_id: Optional[str] = Header(default=None),
+    x_tenant_token: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+) -> str:
+    """
+    요청의 테넌트 ID (기본 테넌트가 아니면 테넌트 토큰 확인)
+
+    Usage:
+        async def endpoint(tenant: str = Depends(resolve_tenant)): ...
+    """
+    return authorize_tenant(x_tenant_id, x_tenant_token, x_admin_token)
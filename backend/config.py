@@ -4,8 +4,8 @@ Backend Configuration
 환경 변수 및 LLM 설정
 """
 import os
+import threading
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 
 # .env 파일 로드
 load_dotenv()
@@ -14,29 +14,354 @@ load_dotenv()
 UPSTAGE_API_KEY = os.getenv("UPSTAGE_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+UPSTAGE_BASE_URL = "https://api.upstage.ai/v1/solar"
 
-def build_chat_model(model: str = "solar-pro", temperature: float = 0.7):
+# 사용 가능한 Upstage 모델 (빠르고 저렴한 순)
+# 새 모델은 UPSTAGE_EXTRA_MODELS(콤마 구분)로 명시적으로 추가해야 티어에 사용할 수 있음
+UPSTAGE_MODELS = ("solar-mini", "solar-pro", "solar-pro2") + tuple(
+    model.strip() for model in os.getenv("UPSTAGE_EXTRA_MODELS", "").split(",") if model.strip()
+)
+
+# ============================================================
+# 모델 티어 정책
+# ============================================================
+# 티어 이름 → 모델 이름 (저비용/고속 → 고성능 순서)
+MODEL_TIERS = {
+    "fast": os.getenv("MODEL_TIER_FAST", "solar-mini"),
+    "standard": os.getenv("MODEL_TIER_STANDARD", "solar-pro"),
+    "premium": os.getenv("MODEL_TIER_PREMIUM", "solar-pro2"),
+}
+
+# 노드별 티어 순서: 첫 번째 티어부터 호출하고, 확신도가 낮거나
+# JSON 출력이 잘못된 경우에만 다음 티어로 승격
+NODE_MODEL_TIERS = {
+    "intent_analyzer": ["fast", "standard", "premium"],
+    "chart_type_selector": ["fast", "standard"],
+    "select_edge": ["standard", "premium"],
+    "query_data": ["standard", "premium"],
+    # 차트 JSON은 저비용 티어, 인사이트 작성은 고성능 티어 (두 노드는 병렬 실행)
+    "generate_chart": ["fast", "standard"],
+    "generate_insights": ["premium"],
+    "summarize_history": ["fast", "standard"],
+}
+
+# 오타나 등록되지 않은 모델이 다른 모델로 조용히 대체되지 않도록 설정 로드 시점에 검증
+_unknown_models = {tier: model for tier, model in MODEL_TIERS.items() if model not in UPSTAGE_MODELS}
+if _unknown_models:
+    raise ValueError(
+        f"Unknown models in MODEL_TIERS: {_unknown_models} "
+        f"(available: {', '.join(UPSTAGE_MODELS)}, add new models with UPSTAGE_EXTRA_MODELS)"
+    )
+_unknown_tiers = {node: tiers for node, tiers in NODE_MODEL_TIERS.items() if set(tiers) - set(MODEL_TIERS)}
+if _unknown_tiers:
+    raise ValueError(f"Unknown tiers in NODE_MODEL_TIERS: {_unknown_tiers}")
+
+# 이 값보다 낮은 confidence는 상위 티어로 승격
+ESCALATION_CONFIDENCE_THRESHOLD = float(os.getenv("ESCALATION_CONFIDENCE_THRESHOLD", "0.7"))
+
+# 모델별 토큰 단가 (USD / 1M tokens, "모델:입력/출력" 콤마 구분, 예: "solar-mini:0.15/0.15")
+# 설정된 모델만 평가 리포트(evals.runner)에 비용이 계산됨
+MODEL_TOKEN_PRICES = {
+    model.strip(): tuple(float(price) for price in prices.split("/"))
+    for model, prices in (
+        entry.split(":") for entry in os.getenv("MODEL_TOKEN_PRICES", "").split(",") if entry.strip()
+    )
+}
+
+
+# ============================================================
+# 요청 데드라인 / Hedging / Circuit Breaker
+# ============================================================
+# 요청 전체 데드라인 (초) 및 클라이언트가 요청할 수 있는 최대값
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+MAX_REQUEST_DEADLINE_SECONDS = float(os.getenv("MAX_REQUEST_DEADLINE_SECONDS", "60"))
+
+# 노드가 사용할 수 있는 남은 데드라인의 비율 (뒤에 남은 노드의 몫을 보장)
+NODE_DEADLINE_SHARES = {
+    "intent_analyzer": 0.25,
+    "chart_type_selector": 0.2,
+    "select_edge": 1.0,
+    "query_data": 0.4,
+    # 병렬 분기: 차트는 남은 시간의 절반 안에 못 받으면 로컬 집계 차트로 대체
+    "generate_chart": 0.5,
+    "generate_insights": 1.0,
+    "summarize_history": 0.15,
+}
+
+# 첫 호출이 최근 지연시간의 백분위수를 넘기면 같은 요청을 한 번 더 보냄
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.5"))
+
+# 업스트림 오류율이 임계값을 넘으면 회로를 열고 로컬 계산 응답으로 전환
+CIRCUIT_ERROR_RATE_THRESHOLD = float(os.getenv("CIRCUIT_ERROR_RATE_THRESHOLD", "0.5"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "10"))
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60"))
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "30"))
+
+# OpenAI 클라이언트 내부 재시도 횟수 (느린 응답은 데드라인 안에서 hedging이 담당)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
+# LLM HTTP 요청 하나의 최대 시간 (초, 데드라인이 없거나 더 길어도 적용)
+# → 취소되거나 hedging에서 패배한 호출이 업스트림 슬롯을 무한히 붙잡지 않음
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
+
+
+# ============================================================
+# 업스트림 Admission Control (모델별 rate limit)
+# ============================================================
+# requests_per_second/burst: token bucket, max_concurrency: 동시 호출 수,
+# max_queue: 대기열 길이 (가득 차면 429 + Retry-After)
+MODEL_RATE_LIMITS = {
+    "solar-mini": {"requests_per_second": 10.0, "burst": 20, "max_concurrency": 16, "max_queue": 64},
+    "solar-pro": {"requests_per_second": 5.0, "burst": 10, "max_concurrency": 8, "max_queue": 32},
+    "solar-pro2": {"requests_per_second": 3.0, "burst": 6, "max_concurrency": 4, "max_queue": 16},
+}
+
+# 요청 우선순위 (값이 작을수록 먼저 처리)
+REQUEST_PRIORITIES = {"interactive": 0, "batch": 1}
+
+# batch 요청이 사용할 수 있는 대기열 비율 (나머지는 interactive 전용)
+BATCH_QUEUE_SHARE = float(os.getenv("BATCH_QUEUE_SHARE", "0.5"))
+
+
+# ============================================================
+# 노선 경제성 (analytics/data/route_economics.py)
+# ============================================================
+# 버스 1대 좌석 수 (이용률 = 최대 재차 인원 / 좌석 수)
+BUS_CAPACITY = int(os.getenv("BUS_CAPACITY", "45"))
+# 야간수당이 지급되는 출발 시각(시)
+NIGHT_ALLOWANCE_HOURS = frozenset(
+    int(hour) for hour in os.getenv("NIGHT_ALLOWANCE_HOURS", "22,23,0,1,2,3,4,5").split(",") if hour.strip()
+)
+
+
+# ============================================================
+# line_chart 다운샘플링 (analytics/charts/downsample.py)
+# ============================================================
+# 요청에 max_points가 없을 때 line_chart에 남길 최대 포인트 수
+LINE_CHART_MAX_POINTS = int(os.getenv("LINE_CHART_MAX_POINTS", "500"))
+# 다운샘플링 시 구간별 최솟값/최댓값 envelope dataset 추가 여부
+LINE_CHART_ENVELOPE = os.getenv("LINE_CHART_ENVELOPE", "true").lower() == "true"
+
+
+# ============================================================
+# table 응답 페이지네이션 (analytics/data/tables.py)
+# ============================================================
+# 분석 응답에 포함되는 첫 페이지 행 수 / /api/tables 페이지 최대 행 수
+TABLE_PAGE_SIZE = int(os.getenv("TABLE_PAGE_SIZE", "50"))
+TABLE_MAX_PAGE_SIZE = int(os.getenv("TABLE_MAX_PAGE_SIZE", "500"))
+# 스냅샷마다 재사용할 정렬된 테이블 행 수 합계 (넘으면 오래 쓰지 않은 테이블부터 버림, 스냅샷이 해제되면 함께 해제)
+TABLE_CACHE_MAX_ROWS = int(os.getenv("TABLE_CACHE_MAX_ROWS", "200000"))
+
+
+# ============================================================
+# 집계 통계 API (analytics/data/stats.py, /api/stats)
+# ============================================================
+# 통계 응답 Cache-Control max-age (초, 이후에는 ETag로 재검증 → 데이터가 같으면 304)
+STATS_MAX_AGE_SECONDS = int(os.getenv("STATS_MAX_AGE_SECONDS", "30"))
+
+
+# ============================================================
+# 실시간 대시보드 push (api/live.py, /api/live WebSocket)
+# ============================================================
+# 구독자가 있을 때 데이터 버전을 확인하는 주기 (초)
+LIVE_POLL_INTERVAL_SECONDS = float(os.getenv("LIVE_POLL_INTERVAL_SECONDS", "2"))
+# 구독자별 전송 대기열 크기 (가득 차면 밀린 delta를 버리고 전체 스냅샷으로 재동기화)
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "8"))
+# 워커당 최대 구독자 수
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "1000"))
+# 하이라이트 후보로 보내는 상위 엣지 수 (승차/하차 인원 기준)
+LIVE_TOP_EDGES = int(os.getenv("LIVE_TOP_EDGES", "5"))
+
+
+# ============================================================
+# 요청 프로파일링 / 관리자 API
+# ============================================================
+# 관리자 API 토큰 (X-Admin-Token 헤더, 미설정 시 관리자 API와 X-Profile 헤더 비활성화)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# 헤더 없이 무작위로 프로파일링할 요청 비율 (0.0 ~ 1.0)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+# 스택 샘플링 주기 (ms)
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+# 보관할 최근 프로파일 수
+PROFILE_MAX_RESULTS = int(os.getenv("PROFILE_MAX_RESULTS", "50"))
+# tracemalloc이 기록할 traceback 깊이
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
+
+
+# ============================================================
+# 멀티 테넌트 데이터셋
+# ============================================================
+# 테넌트별 데이터 디렉터리 (TENANTS_DIR/<tenant_id>/ 아래 reactflow_graph.json, 승하차정보.json, 통근수당.json)
+# 미설정 시 기본 테넌트(DEFAULT_TENANT)만 제공 (data/, frontend/public/ 경로 사용)
+TENANTS_DIR = os.getenv("TENANTS_DIR")
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")
+# 테넌트별 접근 토큰 ("테넌트:토큰" 콤마 구분, X-Tenant-Token 헤더로 검증)
+# 기본 테넌트 외의 테넌트는 토큰(또는 관리자 토큰)이 맞아야 접근 가능, 토큰이 없는 테넌트는 관리자만 접근
+TENANT_TOKENS = {
+    tenant.strip(): token.strip()
+    for tenant, token in (
+        entry.split(":", 1) for entry in os.getenv("TENANT_TOKENS", "").split(",") if entry.strip()
+    )
+}
+# 메모리에 유지할 테넌트 스냅샷의 추정 메모리 합계 상한 (MB)과 최대 테넌트 수
+# 초과 시 가장 오래 사용되지 않은 테넌트부터 해제 (기본 테넌트는 해제하지 않음)
+SNAPSHOT_CACHE_MAX_MB = float(os.getenv("SNAPSHOT_CACHE_MAX_MB", "512"))
+SNAPSHOT_CACHE_MAX_TENANTS = int(os.getenv("SNAPSHOT_CACHE_MAX_TENANTS", "32"))
+
+
+# ============================================================
+# 승하차 기록 저장소 (운행일별 파티션)
+# ============================================================
+# 파티션 파일(JSONL)과 파티션별 집계가 저장되는 디렉터리
+RIDE_STORE_DIR = os.getenv(
+    "RIDE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rides")
+)
+# 파티션 단위: "day" (YYYY-MM-DD) | "month" (YYYY-MM)
+RIDE_STORE_PARTITION = os.getenv("RIDE_STORE_PARTITION", "day")
+# 0보다 크면 스냅샷의 승하차 정보를 승하차정보.json 대신 저장소의 최근 N일 집계로 구성
+RIDE_STORE_SNAPSHOT_DAYS = int(os.getenv("RIDE_STORE_SNAPSHOT_DAYS", "0"))
+# 한 번에 적재할 수 있는 최대 레코드 수 (API)
+RIDE_INGEST_MAX_RECORDS = int(os.getenv("RIDE_INGEST_MAX_RECORDS", "50000"))
+
+
+# ============================================================
+# 승하차 이상 탐지 (detect_anomalies 노드)
+# ============================================================
+# 구간(노선, 출발시간, 정류장, 승/하차)별 운행일 인원의 지수 이동 평균/분산 반감기 (운행일 수)
+ANOMALY_HALFLIFE_DAYS = float(os.getenv("ANOMALY_HALFLIFE_DAYS", "14"))
+# 판정에 필요한 최소 이력 (운행일 수, 이보다 짧으면 해당 구간은 판정하지 않음)
+ANOMALY_MIN_HISTORY_DAYS = int(os.getenv("ANOMALY_MIN_HISTORY_DAYS", "5"))
+# |z| 임계값 (이력이 없을 때의 노선 내 비교는 robust z 기준)
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+# 표준편차 하한 (인원 변동이 거의 없는 구간에서 1~2명 차이로 판정되지 않도록)
+ANOMALY_MIN_STD = float(os.getenv("ANOMALY_MIN_STD", "1.0"))
+# 판정 결과를 보관하는 최근 운행일 수 / 응답에 포함하는 최대 구간 수
+ANOMALY_RECENT_DAYS = int(os.getenv("ANOMALY_RECENT_DAYS", "7"))
+ANOMALY_MAX_RESULTS = int(os.getenv("ANOMALY_MAX_RESULTS", "20"))
+
+
+# ============================================================
+# 분석용 SQL 저장소 (query_data 노드)
+# ============================================================
+# 분석 경로에서 LLM이 만든 읽기 전용 SQL을 로컬 SQLite에서 실행하고 결과만 프롬프트에 넣음
+SQL_QUERY_ENABLED = os.getenv("SQL_QUERY_ENABLED", "true").lower() == "true"
+# 데이터 버전별 SQLite 파일 디렉터리 (워커 간 공유, 버전당 한 번만 생성)
+SQL_STORE_DIR = os.getenv(
+    "SQL_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql_store")
+)
+# 쿼리 결과 최대 행 수 (초과분은 잘리고 truncated로 표시)
+SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "200"))
+# 쿼리 실행 제한 시간 (초)
+SQL_TIMEOUT_SECONDS = float(os.getenv("SQL_TIMEOUT_SECONDS", "2"))
+
+
+# ============================================================
+# 비동기 분석 작업 (/api/analytics/jobs)
+# ============================================================
+# 작업 상태/결과 저장소 (sqlite 파일, 재시작 후에도 유지되고 gunicorn 워커 간 공유)
+JOB_DB_PATH = os.getenv(
+    "JOB_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.sqlite3")
+)
+# 워커 프로세스당 동시에 실행하는 작업 수
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# 워커 프로세스당 대기 가능한 작업 수 (초과 시 429)
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "32"))
+# 작업 데드라인 (초, 요청의 deadline_seconds가 없을 때 / 최대값)
+JOB_DEADLINE_SECONDS = float(os.getenv("JOB_DEADLINE_SECONDS", "120"))
+JOB_MAX_DEADLINE_SECONDS = float(os.getenv("JOB_MAX_DEADLINE_SECONDS", "300"))
+# 끝난 작업의 결과 보관 시간 (초, 이후 조회 시 404)
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+# 다른 워커에서 요청된 취소를 확인하는 간격 (초)
+JOB_CANCEL_POLL_SECONDS = float(os.getenv("JOB_CANCEL_POLL_SECONDS", "1"))
+
+
+# ============================================================
+# 멀티턴 세션 (thread_id)
+# ============================================================
+# 세션 체크포인트 저장소: "sqlite" (파일, 워커 간 공유) | "memory" (프로세스 로컬)
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+SESSION_DB_PATH = os.getenv(
+    "SESSION_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.sqlite3")
+)
+
+# 프롬프트에 원문 그대로 남기는 최근 턴 수 (현재 질문 포함)
+# 이보다 오래된 턴은 요약(history_summary)으로 합쳐지고 메시지에서 제거됨
+HISTORY_WINDOW_TURNS = int(os.getenv("HISTORY_WINDOW_TURNS", "3"))
+# 누적 요약의 최대 길이 (문자)
+HISTORY_SUMMARY_MAX_CHARS = int(os.getenv("HISTORY_SUMMARY_MAX_CHARS", "1200"))
+
+
+def get_node_tiers(node_name: str):
+    """
+    노드에 설정된 (티어, 모델) 목록 반환
+
+    Args:
+        node_name (str): LangGraph 노드 이름
+
+    Returns:
+        list[tuple[str, str]]: [(tier, model), ...] 승격 순서대로
+    """
+    tiers = NODE_MODEL_TIERS.get(node_name, ["standard"])
+    return [(tier, MODEL_TIERS[tier]) for tier in tiers]
+
+
+# 업스트림 연결 풀 (모든 LLM 인스턴스가 공유하여 연결을 재사용)
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Upstage API 호출에 공유하는 HTTP 클라이언트 (keep-alive 연결 풀)
+
+    Returns:
+        httpx.Client: 공유 클라이언트
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                import httpx
+                _http_client = httpx.Client(
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+                )
+    return _http_client
+
+
+def build_chat_model(model: str = "solar-pro", temperature: float = 0.7, timeout: float = None):
     """
     LLM 인스턴스 생성
 
     Args:
-        model (str): 모델 이름 ("solar-pro" | "solar-pro2")
+        model (str): 모델 이름 (UPSTAGE_MODELS 중 하나)
         temperature (float): Temperature 설정 (0.0 ~ 1.0)
+        timeout (float): HTTP 요청 타임아웃 (초, 최대/기본 LLM_REQUEST_TIMEOUT_SECONDS)
 
     Returns:
         ChatOpenAI: LLM 인스턴스
+
+    Raises:
+        LookupError: UPSTAGE_MODELS에 없는 모델 (다른 모델로 대체하지 않음, 응답 파싱 오류와 구분되도록 ValueError가 아님)
     """
-    if model == "solar-pro2":
-        return ChatOpenAI(
-            model="solar-pro2",
-            api_key=UPSTAGE_API_KEY,
-            base_url="https://api.upstage.ai/v1/solar",
-            temperature=temperature
-        )
+    if model not in UPSTAGE_MODELS:
+        raise LookupError(f"Unknown model: {model} (available: {', '.join(UPSTAGE_MODELS)})")
+
+    # langchain_openai는 import 비용이 커서 첫 사용 시점에 로드 (서버 부팅 시 import하지 않음)
+    from langchain_openai import ChatOpenAI
 
     return ChatOpenAI(
-        model="solar-pro",
+        model=model,
         api_key=UPSTAGE_API_KEY,
-        base_url="https://api.upstage.ai/v1/solar",
-        temperature=temperature
+        base_url=UPSTAGE_BASE_URL,
+        temperature=temperature,
+        timeout=LLM_REQUEST_TIMEOUT_SECONDS if timeout is None else min(timeout, LLM_REQUEST_TIMEOUT_SECONDS),
+        max_retries=LLM_MAX_RETRIES,
+        http_client=get_http_client()
     )
@@ -0,0 +1,334 @@
+"""
+Offline Evaluation Runner
+
+골든셋 질문을 intent_analyzer / chart_type_selector / select_edge 노드에 직접 실행하여
+구성(모델 티어 정책)별 정확도와 지연시간, 토큰 사용량을 함께 비교
+
+- intent 정확도: 예상 intent와 일치하는 비율
+- 차트 타입 일치율: 허용 차트 타입 목록에 포함되는 비율 (chart_type이 있는 문항만)
+- 엣지 선택 정확도: 선택된 엣지 ID가 정답 엣지 목록에 포함되는 비율 (edge_ids가 있는 문항만)
+
+노드는 서로 독립적으로 평가됨 (intent가 틀려도 chart_type_selector / select_edge는 실행)
+→ 한 노드의 변경이 다른 노드 점수에 섞이지 않음
+
+Usage:
+    cd backend
+    python -m evals.runner                                  # default, local 구성
+    python -m evals.runner --configs default,fast,premium --concurrency 8 --output report.json
+    python -m evals.runner --config-file my_configs.json    # [{"name": ..., "tiers": {노드: [티어...]}}]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+import config
+from config import MODEL_TOKEN_PRICES, REQUEST_DEADLINE_SECONDS
+
+GOLDEN_SET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_set.json")
+
+EVALUATED_NODES = ("intent_analyzer", "chart_type_selector", "select_edge")
+
+# 기본 제공 구성 (tiers: 노드별 티어 순서 override, 지정하지 않은 노드는 config.NODE_MODEL_TIERS 사용)
+PRESETS = {
+    # 현재 운영 정책
+    "default": {"tiers": {}},
+    # 모든 노드를 단일 티어로 고정 (승격 없음)
+    "fast": {"tiers": {node: ["fast"] for node in EVALUATED_NODES}},
+    "standard": {"tiers": {node: ["standard"] for node in EVALUATED_NODES}},
+    "premium": {"tiers": {node: ["premium"] for node in EVALUATED_NODES}},
+    # LLM 없이 degraded 경로의 로컬 규칙만 사용 (토큰 0, 하한선 비교용)
+    "local": {"local": True},
+}
+
+
+def load_golden_set(path: str = GOLDEN_SET_PATH) -> list:
+    """
+    골든셋 로드
+
+    각 문항: {"id", "question", "intent", "chart_type": [허용 타입...] (선택), "edge_ids": [정답 엣지...] (선택)}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def override_node_tiers(tiers: dict):
+    """평가 구성의 노드별 티어 순서를 적용 (구성은 순서대로 실행되므로 전역 정책을 잠시 교체)"""
+    unknown = [tier for order in tiers.values() for tier in order if tier not in config.MODEL_TIERS]
+    if unknown:
+        raise ValueError(f"Unknown tiers: {unknown}")
+
+    previous = dict(config.NODE_MODEL_TIERS)
+    config.NODE_MODEL_TIERS.update(tiers)
+    try:
+        yield
+    finally:
+        config.NODE_MODEL_TIERS.clear()
+        config.NODE_MODEL_TIERS.update(previous)
+
+
+def _run_node(fn, state: dict):
+    """노드 실행 → (출력, 지연시간 ms)"""
+    started = time.perf_counter()
+    output = fn(state)
+    return output, (time.perf_counter() - started) * 1000
+
+
+def _node_result(node: str, output: dict, latency_ms: float, correct: bool, predicted) -> dict:
+    record = (output.get("model_tiers") or {}).get(node) or {}
+    return {
+        "correct": correct,
+        "predicted": predicted,
+        "latency_ms": round(latency_ms, 1),
+        "tier": record.get("tier"),
+        "model": record.get("model"),
+        "tokens": record.get("tokens"),
+    }
+
+
+def _evaluate_case_llm(case: dict) -> dict:
+    """문항 하나를 LLM 노드로 평가 (노드별 결과)"""
+    from analytics.nodes.analysis import chart_type_selector, get_bus_data
+    from analytics.nodes.find_highlight import get_graph_data, select_edge
+    from analytics.nodes.router import intent_analyzer
+    from analytics.types.state_types import new_turn_input
+
+    # 평가는 batch 우선순위로 실행 (같은 프로세스의 interactive 요청보다 뒤로)
+    state = new_turn_input(
+        case["question"],
+        deadline_at=time.time() + REQUEST_DEADLINE_SECONDS,
+        priority="batch",
+    )
+    results = {}
+
+    output, latency = _run_node(intent_analyzer, state)
+    intent = output.get("intent_type")
+    results["intent_analyzer"] = _node_result(
+        "intent_analyzer", output, latency, intent == case["intent"], intent
+    )
+
+    if case.get("chart_type"):
+        chart_state = {**state, **get_bus_data(state)}
+        output, latency = _run_node(chart_type_selector, chart_state)
+        chart_type = output.get("chart_type")
+        results["chart_type_selector"] = _node_result(
+            "chart_type_selector", output, latency, chart_type in case["chart_type"], chart_type
+        )
+
+    if case.get("edge_ids"):
+        edge_state = {**state, **get_graph_data(state)}
+        output, latency = _run_node(select_edge, edge_state)
+        edge_id = (output.get("highlight_edge") or {}).get("id")
+        results["select_edge"] = _node_result(
+            "select_edge", output, latency, edge_id in case["edge_ids"], edge_id
+        )
+
+    return results
+
+
+def _evaluate_case_local(case: dict) -> dict:
+    """문항 하나를 degraded 경로의 로컬 규칙으로 평가"""
+    from analytics.data.snapshot import get_snapshot
+    from analytics.nodes.degraded import (
+        DEGRADED_TIER,
+        classify_intent_locally,
+        select_chart_type_locally,
+        select_edge_locally,
+    )
+
+    def local(predict, expected):
+        started = time.perf_counter()
+        predicted = predict()
+        output = {"model_tiers": {"local": DEGRADED_TIER}}
+        return _node_result("local", output, (time.perf_counter() - started) * 1000, expected(predicted), predicted)
+
+    question = case["question"]
+    results = {
+        "intent_analyzer": local(lambda: classify_intent_locally(question), lambda p: p == case["intent"])
+    }
+    if case.get("chart_type"):
+        results["chart_type_selector"] = local(
+            lambda: select_chart_type_locally(question), lambda p: p in case["chart_type"]
+        )
+    if case.get("edge_ids"):
+        edges = list(get_snapshot().edges_by_id.values())
+        results["select_edge"] = local(
+            lambda: (select_edge_locally(edges).get("highlight") or {}).get("id"),
+            lambda p: p in case["edge_ids"],
+        )
+    return results
+
+
+def _evaluate_case(case: dict, local: bool) -> dict:
+    try:
+        return (_evaluate_case_local if local else _evaluate_case_llm)(case)
+    except Exception as e:
+        # AdmissionRejected 등 노드 밖으로 나온 오류는 문항 오류로 기록하고 계속 진행
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _percentile(values: list, q: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 1)
+
+
+def _token_cost(by_model: dict):
+    """토큰 비용 (USD, 단가가 설정되지 않은 모델이 있으면 None)"""
+    cost = 0.0
+    for model, tokens in by_model.items():
+        if model not in MODEL_TOKEN_PRICES:
+            return None
+        input_price, output_price = MODEL_TOKEN_PRICES[model]
+        cost += (tokens["input"] * input_price + tokens["output"] * output_price) / 1_000_000
+    return round(cost, 6)
+
+
+def summarize_node(results: list) -> dict:
+    """노드 하나의 문항별 결과 → 정확도 / 지연시간 / 토큰 요약"""
+    latencies = [result["latency_ms"] for result in results]
+    by_model = {}
+    estimated = False
+    for result in results:
+        tokens = result.get("tokens") or {}
+        estimated = estimated or bool(tokens.get("estimated"))
+        for model, counts in (tokens.get("by_model") or {}).items():
+            total = by_model.setdefault(model, {"input": 0, "output": 0})
+            total["input"] += counts["input"]
+            total["output"] += counts["output"]
+
+    return {
+        "cases": len(results),
+        "accuracy": round(sum(result["correct"] for result in results) / len(results), 3) if results else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+        },
+        "tiers": dict(Counter(result["tier"] for result in results)),
+        "tokens": {
+            "input": sum(tokens["input"] for tokens in by_model.values()),
+            "output": sum(tokens["output"] for tokens in by_model.values()),
+            "estimated": estimated,
+            "by_model": by_model,
+        },
+        "cost_usd": _token_cost(by_model),
+    }
+
+
+def run_config(name: str, spec: dict, cases: list, concurrency: int = 4) -> dict:
+    """
+    평가 구성 하나로 골든셋 전체 실행 (문항은 concurrency개씩 동시 실행)
+
+    Returns:
+        dict: {"name", "wall_seconds", "nodes": {노드: 요약}, "errors": [...], "misses": [...]}
+    """
+    local = bool(spec.get("local"))
+    started = time.perf_counter()
+    with override_node_tiers(spec.get("tiers") or {}):
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            outcomes = list(pool.map(lambda case: _evaluate_case(case, local), cases))
+    wall_seconds = time.perf_counter() - started
+
+    errors = []
+    misses = []
+    per_node = {node: [] for node in EVALUATED_NODES}
+    for case, outcome in zip(cases, outcomes):
+        if "error" in outcome:
+            errors.append({"id": case["id"], "error": outcome["error"]})
+            continue
+        for node, result in outcome.items():
+            per_node[node].append(result)
+            if not result["correct"]:
+                misses.append({"id": case["id"], "node": node, "question": case["question"], "predicted": result["predicted"]})
+
+    return {
+        "name": name,
+        "spec": spec,
+        "wall_seconds": round(wall_seconds, 2),
+        "nodes": {node: summarize_node(results) for node, results in per_node.items() if results},
+        "errors": errors,
+        "misses": misses,
+    }
+
+
+def format_report(reports: list) -> str:
+    """구성별 결과 비교 표"""
+    lines = [
+        f"{'config':<12}{'node':<22}{'acc':>7}{'p50 ms':>10}{'p95 ms':>10}{'tok in':>10}{'tok out':>10}{'cost $':>11}",
+        "-" * 92,
+    ]
+    for report in reports:
+        for node, summary in report["nodes"].items():
+            tokens = summary["tokens"]
+            marker = "~" if tokens["estimated"] else ""
+            cost = "-" if summary["cost_usd"] is None else f"{summary['cost_usd']:.4f}"
+            lines.append(
+                f"{report['name']:<12}{node:<22}{summary['accuracy']:>7.1%}"
+                f"{summary['latency_ms']['p50']:>10}{summary['latency_ms']['p95']:>10}"
+                f"{marker + str(tokens['input']):>10}{marker + str(tokens['output']):>10}{cost:>11}"
+            )
+        if report["errors"]:
+            lines.append(f"{'':<12}⚠️  {len(report['errors'])}개 문항 오류 (리포트 errors 참고)")
+        lines.append(f"{'':<12}wall {report['wall_seconds']}s")
+    lines.append("(~: 스트리밍 응답의 토큰 수는 근사값, cost는 MODEL_TOKEN_PRICES가 설정된 경우만 계산)")
+    return "\n".join(lines)
+
+
+def _load_configs(names: str, config_file: str = None) -> dict:
+    configs = {}
+    if config_file:
+        with open(config_file, "r", encoding="utf-8") as f:
+            for spec in json.load(f):
+                configs[spec["name"]] = spec
+    for name in filter(None, (name.strip() for name in (names or "").split(","))):
+        if name not in PRESETS:
+            raise SystemExit(f"Unknown preset: {name} (available: {', '.join(PRESETS)})")
+        configs[name] = PRESETS[name]
+    return configs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden set evaluation (accuracy vs latency/tokens)")
+    parser.add_argument("--configs", default=None,
+                        help=f"콤마로 구분한 기본 구성 ({', '.join(PRESETS)}), 기본값: default,local")
+    parser.add_argument("--config-file", default=None, help="추가 구성 JSON 파일")
+    parser.add_argument("--golden-set", default=GOLDEN_SET_PATH)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", default=None, help="JSON 리포트 저장 경로")
+    parser.add_argument("--verbose", action="store_true", help="노드 로그 출력")
+    args = parser.parse_args(argv)
+
+    configs = _load_configs(args.configs if args.configs or args.config_file else "default,local", args.config_file)
+    cases = load_golden_set(args.golden_set)
+    print(f"🧪 Golden set: {len(cases)}개 문항, 구성: {', '.join(configs)}")
+
+    reports = []
+    for name, spec in configs.items():
+        print(f"▶️  Running config: {name}")
+        if args.verbose:
+            reports.append(run_config(name, spec, cases, args.concurrency))
+        else:
+            # 노드 로그는 버리고 결과 표만 출력
+            with redirect_stdout(io.StringIO()):
+                reports.append(run_config(name, spec, cases, args.concurrency))
+
+    print(format_report(reports))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"golden_set": args.golden_set, "cases": len(cases), "reports": reports},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 Report saved: {args.output}")
+
+    return 0 if all(not report["errors"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Gunicorn Configuration (multi-worker deployment)
+
+마스터 프로세스에서 데이터 스냅샷과 LangGraph를 한 번만 만들고 워커를 fork하여
+모든 워커가 copy-on-write로 같은 메모리를 공유
+
+실행:
+    cd backend
+    gunicorn -c gunicorn.conf.py main:app
+
+데이터 파일이 바뀌면 마스터가 새 스냅샷을 만든 뒤 SIGHUP으로 워커를 교체
+(진행 중인 요청은 기존 워커에서 끝까지 처리됨)
+
+마스터가 미리 만들어 공유하는 것은 기본 테넌트 스냅샷뿐이며,
+다른 테넌트(X-Tenant-Id)는 워커마다 첫 요청 때 적재하고 LRU로 관리
+"""
+import gc
+import os
+import signal
+import threading
+import time
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 앱을 마스터에서 import하여 fork 전에 공유 상태를 준비
+preload_app = True
+graceful_timeout = 30
+
+# 마스터가 데이터 버전을 확인하는 주기 (초)
+SNAPSHOT_WATCH_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_WATCH_INTERVAL_SECONDS", "10"))
+
+
+def _prepare_shared_state():
+    """스냅샷과 그래프를 만들고 GC 대상에서 제외하여 fork 후 페이지 복사를 줄임"""
+    from analytics.data.snapshot import reload_snapshot, set_auto_reload
+    from analytics.graph.analytics_graph import get_analytics_graph
+
+    # 워커(와 마스터)는 요청 중에 스냅샷을 직접 다시 만들지 않음
+    # → 교체는 _watch_data_version이 마스터에서만 수행
+    set_auto_reload(False)
+    reload_snapshot()
+    get_analytics_graph()
+
+    # 이후 생성되는 객체만 GC가 추적하도록 하여 워커에서 공유 페이지를 건드리지 않게 함
+    gc.collect()
+    gc.freeze()
+
+
+def _watch_data_version(server):
+    """데이터 버전이 바뀌면 마스터 스냅샷을 교체하고 워커를 재생성"""
+    from analytics.data.snapshot import get_snapshot, reload_snapshot
+    from analytics.data.sources import data_version
+
+    while True:
+        time.sleep(SNAPSHOT_WATCH_INTERVAL_SECONDS)
+        try:
+            if data_version() == get_snapshot().version:
+                continue
+            server.log.info("Data version changed, rebuilding shared snapshot")
+            gc.unfreeze()
+            reload_snapshot()
+            gc.collect()
+            gc.freeze()
+            # 새 워커는 새 스냅샷을 가진 마스터에서 fork됨
+            os.kill(os.getpid(), signal.SIGHUP)
+        except Exception as e:
+            server.log.error(f"Snapshot reload failed: {str(e)}")
+
+
+def when_ready(server):
+    """워커 fork 전 마스터에서 공유 상태 준비"""
+    _prepare_shared_state()
+    server.log.info("Shared data snapshot and analytics graph ready")
+
+    watcher = threading.Thread(target=_watch_data_version, args=(server,), daemon=True)
+    watcher.start()
+
@@ -3,15 +3,45 @@ FastAPI Main Application
 
 Smartway Analytics API 서버
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import analytics
+from fastapi.responses import JSONResponse
+from api.live import live_hubs
+from api.routes import admin, analytics, economics, live, rides, stats, tables
+from api.startup import startup_status, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    애플리케이션 lifespan
+
+    부팅 직후 백그라운드에서 warm-up (import, 데이터 스냅샷, 그래프, 업스트림 연결)을 실행
+    - /health: 프로세스 생존 여부 (즉시 200)
+    - /ready: warm-up 완료 전에는 503
+
+    실시간 대시보드(/api/live) 구독자에게 데이터 변경을 push하는 watcher와
+    비동기 분석 작업(/api/analytics/jobs) 실행 슬롯도 함께 실행
+    """
+    warm_up_task = asyncio.create_task(run_in_threadpool(warm_up))
+    live_task = asyncio.create_task(live_hubs.watch())
+    await analytics.job_runner.start()
+    yield
+    analytics.job_runner.stop()
+    live_task.cancel()
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="Smartway Analytics API",
     description="버스 노선 분석 및 시각화 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정 (Next.js와 통신)
@@ -25,6 +55,12 @@ app.add_middleware(
 
 # Routes 등록
 app.include_router(analytics.router, prefix="/api", tags=["analytics"])
+app.include_router(economics.router, prefix="/api", tags=["economics"])
+app.include_router(tables.router, prefix="/api", tags=["tables"])
+app.include_router(stats.router, prefix="/api", tags=["stats"])
+app.include_router(rides.router, prefix="/api", tags=["rides"])
+app.include_router(live.router, prefix="/api", tags=["live"])
+app.include_router(admin.router, prefix="/api", tags=["admin"])
 
 
 @app.get("/")
@@ -43,6 +79,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint (warm-up 완료 여부와 단계별 소요 시간)"""
+    status = startup_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,64 @@
+"""RouteEconomics 기준 지표 / what-if 시나리오 테스트"""
+import pytest
+from analytics.data.route_economics import RouteEconomics
+from config import BUS_CAPACITY
+
+
+def _stop(route: str, order: int, name: str, direction: str, count: int) -> dict:
+    return {"노선명": route, "순번": order, "정류장명": name, "승/하차": direction, "인원": count}
+
+
+@pytest.fixture
+def economics():
+    # A: 30명 승차 → 30명 하차 → 다시 30명 승차 (누적 승차는 60명이지만 최대 재차 인원은 30명)
+    # B: 좌석 수보다 많이 승차하는 노선
+    transport = [
+        _stop("A노선", 1, "A1", "승차", 30),
+        _stop("A노선", 2, "A2", "하차", 30),
+        _stop("A노선", 3, "A3", "승차", 30),
+        _stop("A노선", 4, "A4", "하차", 30),
+        _stop("B노선", 1, "B1", "승차", BUS_CAPACITY + 5),
+        _stop("B노선", 2, "B2", "하차", BUS_CAPACITY + 5),
+    ]
+    commute = [
+        {"노선명": "A노선", "운행단가": 100000, "지급수당": 0, "출발시간": "07:00", "운행거리": "10KM"},
+        {"노선명": "B노선", "운행단가": 120000, "지급수당": 0, "출발시간": "07:10", "운행거리": "12KM"},
+    ]
+    return RouteEconomics(transport, commute)
+
+
+def test_peak_load_uses_onboard_count(economics):
+    metrics = {m["route"]: m for m in economics.route_metrics()}
+
+    assert metrics["A노선"]["riders"] == 60
+    assert metrics["A노선"]["peak_load"] == 30
+    assert metrics["B노선"]["peak_load"] == BUS_CAPACITY + 5
+
+
+def test_noop_scenario_matches_baseline(economics):
+    [result] = economics.evaluate([{"name": "noop"}])
+    baseline = {m["route"]: m for m in economics.route_metrics()}
+
+    assert result["delta_cost"] == 0
+    assert result["delta_riders"] == 0
+    assert result["overloaded_routes"] == ["B노선"]
+    for route in result["routes"]:
+        expected = baseline[route["route"]]
+        assert route["riders"] == expected["riders"]
+        assert route["peak_load"] == expected["peak_load"]
+        assert route["utilization"] == expected["utilization"]
+        assert route["cost_per_rider"] == expected["cost_per_rider"]
+
+
+def test_merge_adds_peak_loads(economics):
+    [result] = economics.evaluate([{"merge": [["A노선", "B노선"]]}])
+
+    [route] = result["routes"]
+    assert route["route"] == "A노선"
+    assert route["peak_load"] == 30 + BUS_CAPACITY + 5
+    assert result["active_routes"] == 1
+
+
+def test_empty_merge_group_rejected(economics):
+    with pytest.raises(ValueError, match="Empty merge group"):
+        economics.evaluate([{"name": "bad", "merge": [[]]}])
@@ -0,0 +1,44 @@
+"""StreamingJSONParser 테스트"""
+import pytest
+from analytics.llm.streaming_json import MalformedJSONError, StreamingJSONParser
+
+
+def _parse(chunks: list):
+    parser = StreamingJSONParser()
+    fields = []
+    for chunk in chunks:
+        fields.extend(parser.feed(chunk))
+        if parser.done:
+            break
+    return parser.close(), fields
+
+
+def test_plain_object_emits_fields():
+    result, fields = _parse(['{"a": 1, ', '"b": [1, 2]}'])
+
+    assert result == {"a": 1, "b": [1, 2]}
+    assert fields == [("a", 1), ("b", [1, 2])]
+
+
+def test_multiline_fence():
+    result, _ = _parse(["```json\n", '{"a": 1}\n', "```"])
+
+    assert result == {"a": 1}
+
+
+def test_single_line_fence():
+    result, fields = _parse(['```{"a":1}```'])
+
+    assert result == {"a": 1}
+    assert fields == [("a", 1)]
+
+
+def test_single_line_fence_with_language_split_across_chunks():
+    result, _ = _parse(["``", "`js", "on", ' {"a": ', '1}```'])
+
+    assert result == {"a": 1}
+
+
+def test_non_json_reply_rejected():
+    with pytest.raises(MalformedJSONError):
+        _parse(["```json\nhello"])
@@ -3,6 +3,7 @@
 import { useMemo, useState } from 'react';
 import { Message as MessageType } from '@/lib/types';
 import { DataTable } from '@/components/charts/DataTable';
+import { PagedTable } from '@/components/charts/PagedTable';
 import { Button } from '@/components/ui/button';
 
 interface TextWithTableRendererProps {
@@ -24,6 +25,8 @@ export function TextWithTableRenderer({
     return Math.max(1, Math.floor(hintValue));
   }, [renderHint?.preview_limit]);
 
+  // 서버 테이블 핸들 (첫 페이지 + 전체 행 수, 나머지는 /api/tables/{id}에서 페이지 단위로 조회)
+  const tablePage = message.chart_data?.table_id ? message.chart_data : null;
   const originalData = Array.isArray(message.chart_data) ? message.chart_data : [];
   const tableData = useMemo(() => {
     if (!originalData.length) {
@@ -48,6 +51,13 @@ export function TextWithTableRenderer({
   // output_type: text+table always renders data as a table (no charts)
   // Calculate table statistics
   const getTableStats = () => {
+    if (tablePage) {
+      return {
+        totalRows: tablePage.total_count,
+        totalColumns: tablePage.columns.length,
+        columns: tablePage.columns as string[],
+      };
+    }
     if (!originalData.length) return null;
     
     const columns = originalData.length > 0 ? Object.keys(originalData[0]) : [];
@@ -68,7 +78,13 @@ export function TextWithTableRenderer({
       <div className="grid grid-cols-1 xl:grid-cols-4 gap-6">
         {/* Data table - spans 3 columns on extra large screens */}
         <div className="xl:col-span-3">
-          {tableData.length > 0 ? (
+          {tablePage ? (
+            <PagedTable
+              firstPage={tablePage}
+              title={renderHint?.table_title || "Data"}
+              className="h-fit"
+            />
+          ) : tableData.length > 0 ? (
             <DataTable
               data={tableData}
               title={renderHint?.table_title || "Data"}
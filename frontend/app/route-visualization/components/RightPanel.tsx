@@ -1,8 +1,9 @@
 'use client';
 
 import { useState } from 'react';
-import { sendMessage } from '../utils/analytics-api';
+import { streamMessage } from '../utils/analytics-api';
 import { AnalyticsOutputRenderer } from './AnalyticsOutputRenderer';
+import { LiveAggregates, LiveTopEdge } from '../utils/live-api';
 
 interface Message {
   id: string;
@@ -17,9 +18,14 @@ interface Message {
 
 interface RightPanelProps {
   onHighlightEdge?: (edge: any) => void;
+  /** 실시간 업데이트로 받은 전체 집계와 최대 인원 구간 */
+  liveSummary?: {
+    aggregates: LiveAggregates;
+    topEdge?: LiveTopEdge;
+  };
 }
 
-export function RightPanel({ onHighlightEdge }: RightPanelProps) {
+export function RightPanel({ onHighlightEdge, liveSummary }: RightPanelProps) {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
@@ -36,16 +42,42 @@ export function RightPanel({ onHighlightEdge }: RightPanelProps) {
     setInput('');
     setLoading(true);
 
+    // 차트가 먼저 도착하면 같은 ID의 응답 메시지를 미리 그리고, 전체 응답이 오면 교체
+    const assistantId = (Date.now() + 1).toString();
+    const upsertAssistant = (message: Message) => {
+      setMessages(prev => prev.some(m => m.id === message.id)
+        ? prev.map(m => (m.id === message.id ? message : m))
+        : [...prev, message]);
+    };
+
     try {
-      const response = await sendMessage(input);
+      // 차트가 그려지는 폭(px)의 절반 정도면 라인 모양을 유지하기에 충분
+      const maxPoints = Math.max(100, Math.floor(window.innerWidth / 2));
+      const response = await streamMessage(input, (chart) => {
+        if (!chart.chart_type || chart.chart_data == null) return;
+        upsertAssistant({
+          id: assistantId,
+          role: 'assistant',
+          content: '인사이트를 작성하는 중입니다...',
+          chart_type: chart.chart_type,
+          chart_data: chart.chart_data,
+          intent_type: 'analysis',
+          insights: []
+        });
+      }, { maxPoints });
 
       // Find/Highlight: edge highlighting
       if (response.intent_type === 'find_highlight' && response.highlight_edge && onHighlightEdge) {
         onHighlightEdge(response.highlight_edge);
       }
 
+      // 이상 패턴: 가장 이상한 구간의 엣지 하이라이트
+      if (response.anomalies?.edges.length && onHighlightEdge) {
+        onHighlightEdge(response.anomalies.edges[0]);
+      }
+
       const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: assistantId,
         role: 'assistant',
         content: response.analysis_result || '분석 완료',
         chart_type: response.chart_type || undefined,
@@ -55,7 +87,7 @@ export function RightPanel({ onHighlightEdge }: RightPanelProps) {
         insights: response.insights
       };
 
-      setMessages(prev => [...prev, assistantMessage]);
+      upsertAssistant(assistantMessage);
     } catch (error) {
       console.error('Failed to send message:', error);
       setMessages(prev => [...prev, {
@@ -95,6 +127,21 @@ export function RightPanel({ onHighlightEdge }: RightPanelProps) {
         }}>
           Analytics Agent
         </h2>
+        {liveSummary && (
+          <p style={{ fontSize: '12px', color: '#94a3b8', margin: '4px 0 0 0' }}>
+            승차 {liveSummary.aggregates.total_riders.toLocaleString()}명
+            {liveSummary.aggregates.cost_per_rider != null &&
+              ` · 1인당 ${Math.round(liveSummary.aggregates.cost_per_rider).toLocaleString()}원`}
+            {liveSummary.topEdge && (
+              <span
+                onClick={() => onHighlightEdge?.(liveSummary.topEdge)}
+                style={{ cursor: 'pointer', textDecoration: 'underline' }}
+              >
+                {` · 최대 구간 ${liveSummary.topEdge.label}`}
+              </span>
+            )}
+          </p>
+        )}
       </div>
 
       {/* Messages */}
@@ -1,25 +1,31 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useMemo, useState } from 'react';
 import { RouteFlowWrapper } from './ocel-demo/route-flow-wrapper';
 import { RightPanel } from './components/RightPanel';
-import { loadRouteData, calculateCurrentPassengers } from './utils/dataTransform';
-import { RouteGraphData, EnrichedEdge } from './types/route.types';
+import { loadRouteData, calculateCurrentPassengers, applyGraphDelta } from './utils/dataTransform';
+import { subscribeLive, LiveAggregates, LiveTopEdge } from './utils/live-api';
+import { RouteGraphData } from './types/route.types';
 
 export default function RouteVisualizationPage() {
   const [routeData, setRouteData] = useState<RouteGraphData | null>(null);
-  const [enrichedEdges, setEnrichedEdges] = useState<EnrichedEdge[]>([]);
   const [loading, setLoading] = useState(true);
   const [highlightedEdge, setHighlightedEdge] = useState<any>(null);
+  const [aggregates, setAggregates] = useState<LiveAggregates | null>(null);
+  const [topEdges, setTopEdges] = useState<LiveTopEdge[]>([]);
+
+  const enrichedEdges = useMemo(
+    () => (routeData ? calculateCurrentPassengers(routeData.nodes, routeData.edges) : []),
+    [routeData]
+  );
 
   useEffect(() => {
     async function fetchData() {
       try {
         const data = await loadRouteData();
-        const edges = calculateCurrentPassengers(data.nodes, data.edges);
 
-        setRouteData(data);
-        setEnrichedEdges(edges);
+        // 실시간 스냅샷이 먼저 도착했으면 덮어쓰지 않음
+        setRouteData(prev => prev ?? data);
         setLoading(false);
       } catch (error) {
         console.error('Failed to load route data:', error);
@@ -30,6 +36,20 @@ export default function RouteVisualizationPage() {
     fetchData();
   }, []);
 
+  // 데이터 버전이 바뀌면 서버가 그래프 delta / 상위 엣지 / 집계를 push
+  useEffect(() => {
+    return subscribeLive((message) => {
+      if (message.type === 'snapshot') {
+        setRouteData(message.graph);
+        setLoading(false);
+      } else {
+        setRouteData(prev => (prev ? applyGraphDelta(prev, message.graph) : prev));
+      }
+      if (message.top_edges) setTopEdges(message.top_edges);
+      if (message.aggregates) setAggregates(message.aggregates);
+    });
+  }, []);
+
   const handleHighlightEdge = (edge: any) => {
     console.log('Highlighting edge:', edge);
     setHighlightedEdge(edge);
@@ -65,7 +85,10 @@ export default function RouteVisualizationPage() {
         background: '#1e293b',
         borderLeft: '1px solid #334155'
       }}>
-        <RightPanel onHighlightEdge={handleHighlightEdge} />
+        <RightPanel
+          onHighlightEdge={handleHighlightEdge}
+          liveSummary={aggregates ? { aggregates, topEdge: topEdges[0] } : undefined}
+        />
       </div>
     </main>
   );
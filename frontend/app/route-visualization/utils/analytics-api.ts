@@ -15,21 +15,54 @@ export interface AnalyticsResponse {
   chart_data?: any;
   analysis_result?: string | null;
   chart_type?: 'line_chart' | 'bar_chart' | 'table' | 'text_summary' | null;
+  /** 차트/인사이트 생성 중 하나가 실패해 나머지 결과만 담긴 응답 */
+  partial?: boolean;
+  chart_downsampling?: {
+    method: string;
+    original_points: number;
+    points: number;
+    envelope: boolean;
+  } | null;
+  /** 이상 패턴 질문의 이상 구간과 하이라이트할 엣지 (|z| 내림차순) */
+  anomalies?: {
+    method: 'history' | 'cross_section';
+    history_days: number;
+    segments: Array<Record<string, any> & { edge_ids: string[] }>;
+    edges: Array<{ id: string; source: string; target: string; label: string }>;
+  } | null;
+}
+
+export interface SendMessageOptions {
+  /** line_chart 최대 포인트 수 (서버에서 LTTB로 다운샘플링) */
+  maxPoints?: number;
+  /** UI가 이미 아는 intent (지정하면 서버의 intent 분류 LLM 호출을 건너뜀) */
+  intent?: 'find_highlight' | 'analysis' | 'fallback';
+  /** UI가 이미 아는 차트 타입 (지정하면 차트 타입 선택 LLM 호출을 건너뜀) */
+  chartType?: 'line_chart' | 'bar_chart' | 'table' | 'text_summary';
 }
 
 /**
  * Analytics Agent에 질문 전송
  *
  * @param question 사용자 질문
+ * @param options 요청 옵션 (line_chart 포인트 예산, intent/차트 타입 힌트 등)
  * @returns Analytics 응답
  */
-export async function sendMessage(question: string): Promise<AnalyticsResponse> {
+export async function sendMessage(
+  question: string,
+  options: SendMessageOptions = {}
+): Promise<AnalyticsResponse> {
   const response = await fetch('http://localhost:8000/api/analytics', {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
     },
-    body: JSON.stringify({ question }),
+    body: JSON.stringify({
+      question,
+      max_points: options.maxPoints,
+      intent: options.intent,
+      chart_type: options.chartType,
+    }),
   });
 
   if (!response.ok) {
@@ -38,3 +71,124 @@ export async function sendMessage(question: string): Promise<AnalyticsResponse>
 
   return response.json();
 }
+
+/** generate_chart 분기가 끝나는 즉시 받는 차트 (인사이트보다 먼저 도착) */
+export interface AnalyticsChartEvent {
+  chart_type?: AnalyticsResponse['chart_type'];
+  chart_data?: any;
+  chart_downsampling?: AnalyticsResponse['chart_downsampling'];
+  model_tiers?: Record<string, any> | null;
+}
+
+/**
+ * Analytics Agent에 질문 전송 (스트리밍, 차트를 먼저 수신)
+ *
+ * /api/analytics/stream의 Server-Sent Events를 읽어 chart 이벤트는 onChart로 바로 전달하고
+ * result 이벤트의 전체 응답을 반환
+ *
+ * @param question 사용자 질문
+ * @param onChart 차트가 준비되는 즉시 호출 (analysis 경로만)
+ * @param options 요청 옵션 (line_chart 포인트 예산, intent/차트 타입 힌트 등)
+ * @returns Analytics 응답
+ */
+export async function streamMessage(
+  question: string,
+  onChart: (chart: AnalyticsChartEvent) => void,
+  options: SendMessageOptions = {}
+): Promise<AnalyticsResponse> {
+  const response = await fetch('http://localhost:8000/api/analytics/stream', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify({
+      question,
+      max_points: options.maxPoints,
+      intent: options.intent,
+      chart_type: options.chartType,
+    }),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Analytics API error: ${response.statusText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // 이벤트는 빈 줄로 구분 ("event: ...\ndata: ...\n\n")
+    let boundary: number;
+    while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === 'chart') {
+        onChart(payload);
+      } else if (event === 'result') {
+        return payload;
+      } else if (event === 'error') {
+        throw new Error(`Analytics API error: ${payload.status_code} ${payload.detail}`);
+      }
+    }
+  }
+
+  throw new Error('Analytics API error: stream ended without a result');
+}
+
+export interface TablePage {
+  table_id: string;
+  source: string;
+  columns: string[];
+  rows: any[][];
+  total_count: number;
+  next_cursor: string | null;
+}
+
+/**
+ * 테이블 핸들의 다음 페이지 조회
+ *
+ * @param tableId 분석 응답 chart_data.table_id
+ * @param cursor 이전 페이지의 next_cursor (없으면 첫 페이지)
+ * @param limit 페이지 크기
+ * @returns 테이블 페이지
+ */
+export async function fetchTablePage(
+  tableId: string,
+  cursor?: string | null,
+  limit: number = 50
+): Promise<TablePage> {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+
+  const response = await fetch(`http://localhost:8000/api/tables/${tableId}?${params}`);
+  if (!response.ok) {
+    throw new Error(`Table API error: ${response.statusText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * 테이블 전체 CSV 다운로드 URL (서버에서 스트리밍)
+ */
+export function tableExportUrl(tableId: string): string {
+  return `http://localhost:8000/api/tables/${tableId}/export.csv`;
+}
@@ -9,6 +9,38 @@ export async function loadRouteData(): Promise<RouteGraphData> {
   return data;
 }
 
+/**
+ * 실시간 delta 적용 (ID 기준 upsert / remove, 기존 순서 유지)
+ */
+function applyItemsDelta<T extends { id: string }>(
+  items: T[],
+  delta: { upsert: T[]; remove: string[] }
+): T[] {
+  const removed = new Set(delta.remove);
+  const upserts = new Map(delta.upsert.map((item) => [item.id, item]));
+  const next = items
+    .filter((item) => !removed.has(item.id))
+    .map((item) => {
+      const updated = upserts.get(item.id);
+      if (updated) upserts.delete(item.id);
+      return updated ?? item;
+    });
+  return [...next, ...Array.from(upserts.values())];
+}
+
+export function applyGraphDelta(
+  data: RouteGraphData,
+  delta: {
+    nodes: { upsert: RouteNode[]; remove: string[] };
+    edges: { upsert: RouteEdge[]; remove: string[] };
+  }
+): RouteGraphData {
+  return {
+    nodes: applyItemsDelta(data.nodes, delta.nodes),
+    edges: applyItemsDelta(data.edges, delta.edges),
+  };
+}
+
 export function calculateCurrentPassengers(
   nodes: RouteNode[],
   edges: RouteEdge[]
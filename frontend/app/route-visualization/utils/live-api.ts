@@ -0,0 +1,117 @@
+/**
+ * Live Dashboard API Client
+ *
+ * 백엔드 /api/live WebSocket을 구독하여 데이터 버전이 바뀔 때 그래프 delta와 집계를 수신
+ * (정적 그래프 재요청 / 폴링 대체)
+ */
+
+import { RouteEdge, RouteNode } from '../types/route.types';
+
+export interface LiveTopEdge {
+  id: string;
+  source: string;
+  target: string;
+  label: string;
+  count: number;
+  route: string | null;
+}
+
+export interface LiveAggregates {
+  total_cost: number;
+  total_riders: number;
+  cost_per_rider: number | null;
+  active_routes: number;
+  rides: number;
+  routes: { route: string; riders: number; utilization: number | null }[];
+}
+
+export interface LiveItemsDelta<T> {
+  upsert: T[];
+  remove: string[];
+}
+
+export interface LiveSnapshotMessage {
+  type: 'snapshot';
+  version: string;
+  graph: { nodes: RouteNode[]; edges: RouteEdge[] };
+  top_edges: LiveTopEdge[];
+  aggregates: LiveAggregates;
+}
+
+export interface LiveDeltaMessage {
+  type: 'delta';
+  version: string;
+  previous_version: string;
+  graph: { nodes: LiveItemsDelta<RouteNode>; edges: LiveItemsDelta<RouteEdge> };
+  top_edges?: LiveTopEdge[];
+  aggregates?: LiveAggregates;
+}
+
+export type LiveMessage = LiveSnapshotMessage | LiveDeltaMessage;
+
+const LIVE_URL = 'ws://localhost:8000/api/live';
+const MAX_RECONNECT_DELAY_MS = 30000;
+
+export interface LiveTenant {
+  /** 테넌트 ID (미지정 시 기본 테넌트) */
+  id: string;
+  /** 테넌트 토큰 (기본 테넌트가 아니면 필요) */
+  token?: string;
+}
+
+/**
+ * 실시간 업데이트 구독 (연결이 끊기면 지수 백오프로 재연결)
+ *
+ * 재연결 시 마지막으로 받은 version을 보내서, 그 사이 데이터가 바뀌지 않았으면
+ * 전체 스냅샷을 다시 받지 않음
+ * (브라우저 WebSocket은 헤더를 지정할 수 없어 테넌트/토큰은 쿼리 파라미터로 전달)
+ *
+ * @param onMessage snapshot / delta 메시지 콜백
+ * @param tenant 구독할 테넌트 (미지정 시 기본 테넌트)
+ * @returns 구독 해제 함수
+ */
+export function subscribeLive(
+  onMessage: (message: LiveMessage) => void,
+  tenant?: LiveTenant
+): () => void {
+  let socket: WebSocket | null = null;
+  let version: string | null = null;
+  let retryDelay = 1000;
+  let retryTimer: ReturnType<typeof setTimeout> | null = null;
+  let closed = false;
+
+  const connect = () => {
+    const params = new URLSearchParams();
+    if (version) params.set('version', version);
+    if (tenant) {
+      params.set('tenant', tenant.id);
+      if (tenant.token) params.set('token', tenant.token);
+    }
+    const query = params.toString();
+    socket = new WebSocket(query ? `${LIVE_URL}?${query}` : LIVE_URL);
+
+    socket.onopen = () => {
+      retryDelay = 1000;
+    };
+
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data) as LiveMessage;
+      version = message.version;
+      onMessage(message);
+    };
+
+    socket.onclose = () => {
+      if (closed) return;
+      retryTimer = setTimeout(connect, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, MAX_RECONNECT_DELAY_MS);
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    if (retryTimer) clearTimeout(retryTimer);
+    socket?.close();
+  };
+}
@@ -11,6 +11,7 @@ import {
   Tooltip,
   Legend,
   ArcElement,
+  Filler,
 } from 'chart.js';
 import { Line, Bar } from 'react-chartjs-2';
 
@@ -24,7 +25,8 @@ ChartJS.register(
   Title,
   Tooltip,
   Legend,
-  ArcElement
+  ArcElement,
+  Filler // min/max envelope 음영 (fill: '-1')
 );
 
 interface ChartRendererProps {
@@ -47,17 +49,27 @@ export function ChartRenderer({
 
   const chartType = config.type || 'line';
 
+  // 서버에서 다운샘플링된 시계열은 포인트 마커 없이 선만 그림 (렌더링 비용 절감)
+  const pointCount = Array.isArray(data.labels) ? data.labels.length : 0;
+  const denseSeries = chartType === 'line' && pointCount > 100;
+
   const defaultOptions = {
     responsive: true,
     maintainAspectRatio: false,
     plugins: {
-      legend: {
-        position: 'top' as const,
-      },
       title: {
         display: false,
       },
+      legend: {
+        position: 'top' as const,
+        labels: {
+          // min/max envelope dataset은 범례에서 숨김
+          filter: (item: any, chartData: any) => !chartData.datasets?.[item.datasetIndex]?.envelope,
+        },
+      },
     },
+    elements: denseSeries ? { point: { radius: 0 } } : undefined,
+    animation: denseSeries ? (false as const) : undefined,
     scales: {
       y: {
         beginAtZero: true,
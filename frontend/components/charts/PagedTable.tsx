@@ -0,0 +1,127 @@
+'use client';
+
+import { useState } from 'react';
+import {
+  TablePage,
+  fetchTablePage,
+  tableExportUrl,
+} from '@/app/route-visualization/utils/analytics-api';
+
+interface PagedTableProps {
+  firstPage: TablePage;
+  title?: string;
+  className?: string;
+}
+
+/**
+ * 서버 테이블 핸들 기반 테이블
+ *
+ * 현재 페이지 행만 메모리에 유지하고, 다음 페이지는 커서로 서버에서 가져옴
+ * (이전 페이지로 돌아갈 때는 방문한 커서 목록을 사용)
+ */
+export function PagedTable({ firstPage, title, className = '' }: PagedTableProps) {
+  const [page, setPage] = useState<TablePage>(firstPage);
+  // cursors[i] = i번째 페이지를 가져온 커서 (첫 페이지는 null)
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const pageSize = firstPage.rows.length || 50;
+  const pageIndex = cursors.length - 1;
+  const totalPages = Math.max(1, Math.ceil(page.total_count / pageSize));
+
+  const load = async (cursor: string | null, nextCursors: (string | null)[]) => {
+    setLoading(true);
+    setError(null);
+    try {
+      const nextPage = await fetchTablePage(page.table_id, cursor, pageSize);
+      setPage(nextPage);
+      setCursors(nextCursors);
+    } catch (e) {
+      setError('페이지를 불러오지 못했습니다. 데이터가 갱신되었다면 질문을 다시 시도해주세요.');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const buttonStyle = (disabled: boolean) => ({
+    padding: '6px 12px',
+    border: '1px solid #e5e7eb',
+    borderRadius: '4px',
+    background: 'white',
+    cursor: disabled ? 'not-allowed' : 'pointer',
+    opacity: disabled ? 0.5 : 1,
+  });
+
+  return (
+    <div className={className}>
+      <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginBottom: '16px' }}>
+        {title && (
+          <h3 style={{ fontSize: '16px', fontWeight: '600' }}>{title}</h3>
+        )}
+        <a
+          href={tableExportUrl(page.table_id)}
+          style={{ fontSize: '14px', color: '#3b82f6' }}
+        >
+          CSV 다운로드 ({page.total_count}행)
+        </a>
+      </div>
+
+      <div style={{ overflowX: 'auto' }}>
+        <table style={{ width: '100%', borderCollapse: 'collapse' }}>
+          <thead>
+            <tr style={{ borderBottom: '2px solid #e5e7eb' }}>
+              {page.columns.map((column) => (
+                <th
+                  key={column}
+                  style={{ padding: '12px', textAlign: 'left', fontWeight: '600', fontSize: '14px' }}
+                >
+                  {column}
+                </th>
+              ))}
+            </tr>
+          </thead>
+          <tbody>
+            {page.rows.map((row, idx) => (
+              <tr key={idx} style={{ borderBottom: '1px solid #e5e7eb' }}>
+                {row.map((value, col) => (
+                  <td key={col} style={{ padding: '12px', fontSize: '14px' }}>
+                    {value === null ? '-' : String(value)}
+                  </td>
+                ))}
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+
+      {error && (
+        <p style={{ marginTop: '12px', fontSize: '13px', color: '#dc2626' }}>{error}</p>
+      )}
+
+      {totalPages > 1 && (
+        <div style={{ marginTop: '16px', display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
+          <div style={{ fontSize: '14px', color: '#64748b' }}>
+            Page {pageIndex + 1} of {totalPages}
+          </div>
+          <div style={{ display: 'flex', gap: '8px' }}>
+            <button
+              onClick={() => load(cursors[pageIndex - 1], cursors.slice(0, -1))}
+              disabled={loading || pageIndex === 0}
+              style={buttonStyle(loading || pageIndex === 0)}
+            >
+              Previous
+            </button>
+            <button
+              onClick={() => load(page.next_cursor, [...cursors, page.next_cursor])}
+              disabled={loading || !page.next_cursor}
+              style={buttonStyle(loading || !page.next_cursor)}
+            >
+              Next
+            </button>
+          </div>
+        </div>
+      )}
+    </div>
+  );
+}